@@ -0,0 +1,179 @@
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Set
+from engine.modules.embedder import OllamaEmbedder
+from engine.modules.vector_index import VectorIndex
+from engine.modules.token_counter import TokenCounter
+
+logger = logging.getLogger("domain.subconscious.recall")
+
+RECALL_TOKEN_BUDGET = 400   # Max prompt tokens spent on recalled snippets per turn
+RECALL_TOP_K = 4
+RECALL_MIN_SCORE = 0.3      # Cosine similarity below this is noise
+RECALL_QUERY_TIMEOUT = 3.0  # Seconds; a slow embedder must not hold up the reply
+MIN_ENTRY_CHARS = 24        # Skip "ok", "thanks", ... not worth a vector
+MAX_ENTRY_CHARS = 600       # Text kept (and embedded) per entry
+EMBED_CHUNK = 64            # Entries embedded per request during refresh
+RETRY_DELAY = 60.0          # Seconds before refreshing again after the embedder failed (doubles)
+MAX_RETRY_DELAY = 3600.0
+
+
+class RecallService:
+    """
+    Semantic long-term recall over past messages and reflections.
+
+    The vector index is built in the background from Memory's search index
+    (only new or changed entries are embedded) and queried once per turn to
+    surface the few most relevant moments within a fixed token budget.
+    A refresh reads only the entries written since the last one; all keys are
+    compared only when entries were replaced or removed in between. After the
+    embedder fails, refreshes back off until it has had time to come back
+    (or retry() is called, e.g. after the LLM settings changed).
+    """
+    def __init__(self, memory, router, embedder=None, token_counter: Optional[TokenCounter] = None,
+                 token_budget: int = RECALL_TOKEN_BUDGET, top_k: int = RECALL_TOP_K,
+                 min_score: float = RECALL_MIN_SCORE):
+        self.memory = memory
+        self.embedder = embedder or OllamaEmbedder(router)
+        self.token_counter = token_counter or TokenCounter()
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.min_score = min_score
+        self.index = VectorIndex(memory.base_path, self.embedder.name)
+        self._loaded = False
+        self._too_short: Set[str] = set()  # Keys skipped for length, so they are not re-read every refresh
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._last_row_id = 0            # Newest search entry already looked at
+        self._row_count: Optional[int] = None  # Search entries at that point (None: diff all keys)
+        self._retry_at = 0.0             # Monotonic time before which refreshes are skipped
+        self._retry_delay = RETRY_DELAY
+
+    @property
+    def ready(self) -> bool:
+        return len(self.index) > 0
+
+    def schedule_refresh(self):
+        """Starts a background refresh unless one is already running or the embedder is backing off."""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    def retry(self):
+        """Ends a back-off after an embedder failure (e.g. the embedding settings changed)."""
+        self._retry_at = 0.0
+        self._retry_delay = RETRY_DELAY
+
+    async def refresh(self) -> int:
+        """Embeds new/changed entries and drops stale ones. Returns the number embedded."""
+        async with self._refresh_lock:
+            try:
+                if not self._loaded:
+                    await asyncio.to_thread(self.index.load)
+                    self._loaded = True
+
+                # Only entries written since the last refresh; text is fetched for those that need a vector
+                listing, count = await asyncio.to_thread(self.memory.search_changes, self._last_row_id)
+                known = self.index.keys()
+                if self._row_count is not None and count == self._row_count + len(listing):
+                    stale = set()
+                    current = {e["key"]: e["id"] for e in listing}
+                else:
+                    # Entries were replaced or removed since (edits, regenerations, deletes): diff all keys
+                    listing = await asyncio.to_thread(self.memory.search_entries, None, False)
+                    count = len(listing)
+                    current = {e["key"]: e["id"] for e in listing}
+                    stale = known - current.keys()
+                    self._too_short &= current.keys()
+                new_ids = [row_id for key, row_id in current.items() if key not in known and key not in self._too_short]
+
+                self.index.remove(stale)
+                embedded = 0
+                for start in range(0, len(new_ids), EMBED_CHUNK):
+                    rows = await asyncio.to_thread(self.memory.search_entries, new_ids[start:start + EMBED_CHUNK])
+                    chunk = []
+                    for e in rows:
+                        if len((e["content"] or "").strip()) < MIN_ENTRY_CHARS:
+                            self._too_short.add(e["key"])
+                        else:
+                            chunk.append(e)
+                    if not chunk:
+                        continue
+                    texts = [e["content"].strip()[:MAX_ENTRY_CHARS] for e in chunk]
+                    try:
+                        vectors = await self.embedder.embed(texts)
+                    except Exception as e:
+                        self._back_off(e)
+                        if stale or embedded:
+                            await asyncio.to_thread(self.index.save)
+                        return embedded
+                    items = [
+                        {"key": e["key"], "kind": e["kind"], "source": e["source"], "date": e["date"],
+                         "role": e["role"], "ref": e["ref"], "text": text}
+                        for e, text in zip(chunk, texts)
+                    ]
+                    self.index.add(items, vectors)
+                    embedded += len(items)
+
+                if stale or embedded:
+                    await asyncio.to_thread(self.index.save)
+                    logger.info(f"RecallService: Embedded {embedded} entries, dropped {len(stale)} ({len(self.index)} total).")
+                self._last_row_id = max([self._last_row_id] + [e["id"] for e in listing])
+                self._row_count = count
+                self._retry_delay = RETRY_DELAY
+                return embedded
+            except Exception as e:
+                logger.error(f"RecallService: Refresh failed: {e}")
+                return 0
+
+    def _back_off(self, error: Exception):
+        """Skips refreshes for a while after the embedder failed (logged once per outage)."""
+        if self._retry_delay == RETRY_DELAY:
+            logger.error(f"RecallService: Embedding failed, retrying in {self._retry_delay:.0f}s: {error}")
+        else:
+            logger.debug(f"RecallService: Embedding still failing, retrying in {self._retry_delay:.0f}s: {error}")
+        self._retry_at = time.monotonic() + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_DELAY)
+
+    async def recall(self, query: str, exclude_refs: Optional[Set[str]] = None,
+                     token_budget: Optional[int] = None) -> str:
+        """
+        Returns a prompt block with the most relevant past snippets (or "").
+        `exclude_refs` holds message ids already present in the prompt; `token_budget`
+        overrides the instance budget for this call.
+        """
+        if not query or not self.ready:
+            return ""
+        try:
+            query_vec = await asyncio.wait_for(self.embedder.embed([query[:MAX_ENTRY_CHARS * 2]]), RECALL_QUERY_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"RecallService: Query embedding failed: {e}")
+            return ""
+
+        hits = self.index.top_k(query_vec[0], self.top_k, exclude=exclude_refs, min_score=self.min_score)
+        return self._format_block(hits, self.token_budget if token_budget is None else token_budget)
+
+    def _format_block(self, hits: List[Dict[str, Any]], token_budget: int) -> str:
+        header = "\n### LONG-TERM MEMORY: RELATED MOMENTS ###\n"
+        footer = "### END MEMORY ###\n"
+        used = self.token_counter.count(header + footer)
+        lines = []
+        for hit in hits:
+            speaker = hit.get("role") or hit.get("kind")
+            line = f"- [{hit.get('date') or 'undated'}] {speaker}: {hit['text']}\n"
+            cost = self.token_counter.count(line)
+            if used + cost > token_budget:
+                continue
+            lines.append(line)
+            used += cost
+        if not lines:
+            return ""
+        return header + "".join(lines) + footer
+
+    async def close(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        await self.embedder.aclose()
@@ -1,18 +1,22 @@
 import os
+import asyncio
 import datetime
 import logging
-import logging
+from engine.modules.prompt_cache import PromptSegmentCache, file_signature
 
 logger = logging.getLogger("domain.subconscious.reflection")
 
 class ReflectionService:
-    def __init__(self, brain, memory, router):
+    def __init__(self, brain, memory, router, segment_cache: PromptSegmentCache = None):
         self.brain = brain
         self.memory = memory
         self.router = router
         self.output_dir = os.path.join("erika_home", "reflections")
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
+        self.segment_cache = segment_cache or PromptSegmentCache()
+        # (directory mtime, latest reflection filename): the listing is only redone when files come or go
+        self._latest = (None, None)
 
     def _generate_prompt(self, transcript: str) -> str:
         return (
@@ -51,7 +55,8 @@ class ReflectionService:
         logger.info(f"ReflectionService: Dreaming via {'Remote' if remote_online else 'Local (Erika Core)'} [{target_model}]")
 
         # 2. Get Data
-        chats = self.memory.get_chats_by_date(date_obj)
+        # Disk-bound: keep it off the event loop
+        chats = await asyncio.to_thread(self.memory.get_chats_by_date, date_obj)
         if not chats:
             logger.info("ReflectionService: No chats found for this date. Skipping.")
             return "No Data", None
@@ -114,21 +119,17 @@ class ReflectionService:
                 lines.append(f"{role}: {content}")
         return "\n".join(lines)
 
-    def get_latest_reflection(self) -> str:
-        """Retrieves the most recent reflection content."""
-        if not os.path.exists(self.output_dir):
-            return ""
-            
-        try:
-            files = [f for f in os.listdir(self.output_dir) if f.endswith(".md")]
-            if not files:
-                return ""
-            
-            # Sort by name (day_DD-MM-YYYY.md)
+    def latest_reflection_path(self):
+        """Path of the newest day_DD-MM-YYYY.md reflection, or None."""
+        signature = file_signature(self.output_dir)
+        if signature is None:
+            return None
+        if self._latest[0] != signature[0]:
             latest_file = None
             latest_date = None
-            
-            for f in files:
+            for f in os.listdir(self.output_dir):
+                if not f.endswith(".md"):
+                    continue
                 try:
                     # Remove 'day_' and '.md'
                     date_part = f[4:-3]
@@ -138,13 +139,14 @@ class ReflectionService:
                         latest_file = f
                 except ValueError:
                     continue
-            
-            if latest_file:
-                path = os.path.join(self.output_dir, latest_file)
-                with open(path, 'r', encoding='utf-8') as f:
-                    return f.read()
-                    
-            return ""
+            self._latest = (signature[0], latest_file)
+        return os.path.join(self.output_dir, self._latest[1]) if self._latest[1] else None
+
+    def get_latest_reflection(self) -> str:
+        """Retrieves the most recent reflection content (cached until the file or folder changes)."""
+        try:
+            path = self.latest_reflection_path()
+            return self.segment_cache.read(path) if path else ""
         except Exception as e:
             logger.error(f"ReflectionService: Failed to read latest reflection: {e}")
             return ""
@@ -0,0 +1,201 @@
+import asyncio
+import datetime
+import logging
+from typing import List, Dict, Any, Optional
+from engine.modules.token_counter import TokenCounter
+
+logger = logging.getLogger("domain.subconscious.summary")
+
+SUMMARY_TOKEN_BUDGET = 350   # Max tokens of a stored summary (and of its prompt block)
+SUMMARY_CHUNK_TOKENS = 3000  # Transcript tokens folded into the summary per request
+SUMMARY_TIMEOUT = 120.0      # Seconds per summarization request
+
+
+class SummaryService:
+    """
+    Rolling summary of the part of a chat that no longer fits the context window.
+
+    When trimming evicts old turns, the controller schedules an update; the service
+    folds the newly evicted messages into the chat's running summary on the
+    subconscious node (only while it is online) and stores it next to the chat.
+    The next prompts carry the summary in place of the dropped turns.
+
+    A summary records how many leading messages it covers and the id of the last
+    one, so it is discarded if that part of the chat is edited or regenerated.
+    Callers that hold only the tail of a long chat pass its offset; evicted messages
+    before it are read from memory when the summary has to catch up on them.
+    """
+    def __init__(self, brain, memory, router, token_counter: Optional[TokenCounter] = None,
+                 max_tokens: int = SUMMARY_TOKEN_BUDGET):
+        self.brain = brain
+        self.memory = memory
+        self.router = router
+        self.token_counter = token_counter or TokenCounter()
+        self.max_tokens = max_tokens
+        self._summaries: Dict[str, Optional[Dict[str, Any]]] = {}  # chat_id -> summary (None: none on disk)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, tuple] = {}  # Newest (evicted, offset) requested while a task runs
+
+    async def load(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored summary of a chat (read from disk once per chat)."""
+        if chat_id not in self._summaries:
+            self._summaries[chat_id] = await asyncio.to_thread(self.memory.get_chat_summary, chat_id)
+        return self._summaries[chat_id]
+
+    @staticmethod
+    def is_valid(summary: Optional[Dict[str, Any]], history: List[Dict[str, Any]], offset: int = 0) -> bool:
+        """
+        True if the summary still describes the start of a chat whose messages from
+        position `offset` on are `history` (messages before it are not in view, so
+        they are taken to be unchanged).
+        """
+        if not summary or not summary.get("text"):
+            return False
+        count = summary.get("count", 0)
+        if not 0 < count <= offset + len(history):
+            return False
+        return count <= offset or history[count - offset - 1].get("id") == summary.get("covers")
+
+    def block(self, summary: Dict[str, Any]) -> str:
+        """Prompt block standing in for the evicted turns."""
+        return (
+            "### EARLIER IN THIS CONVERSATION (SUMMARY) ###\n"
+            f"{summary['text']}\n"
+            "### END SUMMARY ###"
+        )
+
+    def schedule_update(self, chat_id: str, evicted: List[Dict[str, Any]], offset: int = 0):
+        """
+        Folds the chat's leading messages that no longer fit into the summary in the
+        background: those before `offset` and then `evicted`.
+        """
+        if not chat_id or not (evicted or offset):
+            return
+        if not self.router.status.get('remote'):
+            logger.debug("SummaryService: Subconscious offline, not summarizing evicted history.")
+            return
+        snapshot = [{"id": m.get("id"), "role": m.get("role"), "content": m.get("content", "")} for m in evicted]
+        task = self._tasks.get(chat_id)
+        if task and not task.done():
+            self._pending[chat_id] = (snapshot, offset)
+            return
+        self._tasks[chat_id] = asyncio.create_task(self._run(chat_id, snapshot, offset))
+
+    async def _run(self, chat_id: str, evicted: List[Dict[str, Any]], offset: int):
+        while evicted is not None:
+            try:
+                await self.update(chat_id, evicted, offset)
+            except Exception as e:
+                logger.error(f"SummaryService: Update for {chat_id} failed: {e}")
+            evicted, offset = self._pending.pop(chat_id, (None, 0))
+
+    async def update(self, chat_id: str, evicted: List[Dict[str, Any]], offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Extends the chat's summary to cover its messages before `offset` and `evicted`
+        (those from `offset` on). Returns the stored summary.
+        """
+        summary = await self.load(chat_id)
+        if not self.is_valid(summary, evicted, offset):
+            summary = None
+        start = summary["count"] if summary else 0
+        if start >= offset + len(evicted):
+            return summary
+
+        todo = evicted[max(0, start - offset):]
+        if start < offset:
+            older = await asyncio.to_thread(self.memory.get_messages, chat_id, list(range(start, offset)))
+            if len(older) != offset - start:
+                logger.warning(f"SummaryService: Messages {start}-{offset} of {chat_id} are missing; not summarizing.")
+                return summary
+            todo = older + todo
+
+        host = self.router.REMOTE_BRAIN
+        model = self.router.REMOTE_MODEL
+        text = summary["text"] if summary else ""
+        for chunk in self._chunks(todo):
+            folded = await asyncio.wait_for(self._summarize(text, chunk, model, host), SUMMARY_TIMEOUT)
+            if not folded:
+                break
+            text = folded
+            start += len(chunk)
+            summary = {
+                "text": text,
+                "tokens": self.token_counter.count(text),
+                "count": start,
+                "covers": chunk[-1].get("id"),
+                "model": model,
+                "updated_at": datetime.datetime.now().astimezone().isoformat(),
+            }
+
+        if summary and summary["count"] > 0:
+            self._summaries[chat_id] = summary
+            saved = await asyncio.to_thread(self.memory.save_chat_summary, chat_id, summary)
+            logger.info(f"SummaryService: Summary of {chat_id} covers {summary['count']} messages "
+                        f"({summary['tokens']} tokens, {'saved' if saved else 'not saved'}).")
+        return summary
+
+    def _chunks(self, messages: List[Dict[str, Any]]):
+        """Splits messages into transcript chunks of about SUMMARY_CHUNK_TOKENS."""
+        chunk, used = [], 0
+        for msg in messages:
+            tokens = self.token_counter.count_cached(msg.get("content") or "")
+            if chunk and used + tokens > SUMMARY_CHUNK_TOKENS:
+                yield chunk
+                chunk, used = [], 0
+            chunk.append(msg)
+            used += tokens
+        if chunk:
+            yield chunk
+
+    async def _summarize(self, previous: str, messages: List[Dict[str, Any]], model: str, host: str) -> str:
+        transcript = "\n".join(
+            f"{'Tim' if m.get('role') == 'user' else 'Erika'}: {m.get('content', '')}" for m in messages
+        )
+        max_words = int(self.max_tokens * 0.6)
+        prompt = (
+            "You are the subconscious of Erika, keeping track of a long conversation with Tim.\n\n"
+            f"SUMMARY SO FAR:\n{previous or '(none yet)'}\n\n"
+            f"NEXT PART OF THE CONVERSATION:\n{transcript}\n\n"
+            "TASK:\n"
+            f"Rewrite the summary so it covers everything so far (max {max_words} words). "
+            "Keep concrete facts, names, decisions, open questions and promises; drop small talk. "
+            "Write plain sentences in the past tense, no headers."
+        )
+
+        response = ""
+        async for chunk in self.brain.generate_response(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            host=host
+        ):
+            if "error" in chunk:
+                logger.error(f"SummaryService: Brain returned error: {chunk['error']}")
+                return ""
+            if "message" in chunk:
+                response += chunk['message'].get('content', '')
+        return self._fit(response.strip())
+
+    def _fit(self, text: str) -> str:
+        """Hard-caps a summary at max_tokens (the model does not always respect the word limit)."""
+        if self.token_counter.count(text) <= self.max_tokens:
+            return text
+        offsets = self.token_counter.token_offsets(text)
+        lo, hi = 0, len(offsets)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.token_counter.count(text[:offsets[mid]]) <= self.max_tokens:
+                lo = mid
+            else:
+                hi = mid
+        return text[:offsets[lo]].rstrip()
+
+    def forget(self, chat_id: str):
+        """Drops the cached summary (e.g. after the chat was deleted)."""
+        self._summaries.pop(chat_id, None)
+        self._pending.pop(chat_id, None)
+
+    async def close(self):
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from engine.memory import Memory, CHAT_PAGE_SIZE
+
+logger = logging.getLogger("domain.memory.async")
+
+DEFAULT_IO_WORKERS = 4
+
+
+class AsyncMemory:
+    """
+    Async facade over Memory for code running on the NiceGUI event loop.
+
+    Every call is offloaded to a small dedicated thread pool, and a semaphore
+    bounds how many disk operations are in flight at once, so a slow or
+    cloud-synced chats folder never stalls token streaming or other clients.
+    """
+    def __init__(self, memory: Memory, max_workers: int = DEFAULT_IO_WORKERS, max_concurrency: Optional[int] = None):
+        self.memory = memory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-io")
+        self._semaphore = asyncio.Semaphore(max_concurrency or max_workers)
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def create_chat(self) -> Dict[str, Any]:
+        """Creates chat metadata (pure CPU, no I/O, so it stays synchronous)."""
+        return self.memory.create_chat()
+
+    async def save_chat(self, chat_id: str, data: Dict[str, Any]):
+        # Snapshot on the loop thread: the controller keeps mutating its history while the worker writes
+        snapshot = {**data, "messages": [dict(m) for m in data.get("messages") or []]}
+        return await self._run(self.memory.save_chat, chat_id, snapshot)
+
+    async def get_chat(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.memory.get_chat, chat_id)
+
+    async def get_chat_page(self, chat_id: str, limit: Optional[int] = CHAT_PAGE_SIZE,
+                            before: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.memory.get_chat_page, chat_id, limit, before)
+
+    async def get_messages(self, chat_id: str, positions: List[int]) -> List[Dict[str, Any]]:
+        return await self._run(self.memory.get_messages, chat_id, positions)
+
+    async def get_chat_stats(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.memory.get_chat_stats, chat_id)
+
+    async def delete_chat(self, chat_id: str) -> bool:
+        return await self._run(self.memory.delete_chat, chat_id)
+
+    async def list_chats(self, limit: Optional[int] = None, before_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.memory.list_chats, limit, before_cursor)
+
+    async def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.memory.search, query, limit, kind)
+
+    async def get_chats_by_date(self, date_obj: datetime.date) -> List[Dict[str, Any]]:
+        return await self._run(self.memory.get_chats_by_date, date_obj)
+
+    async def archive_old_days(self, older_than_days: int) -> int:
+        return await self._run(self.memory.archive_old_days, older_than_days)
+
+    async def rebuild_index(self) -> int:
+        return await self._run(self.memory.rebuild_index)
+
+    async def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        return await self._run(self.memory.flush, timeout)
+
+    def close(self):
+        """Stops accepting work; queued calls still finish."""
+        self._executor.shutdown(wait=False)
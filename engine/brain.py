@@ -27,8 +27,9 @@ class Brain:
         except Exception as e:
             logger.warning(f"Brain: Error closing client: {e}")
 
-    async def generate_response(self, model: str, messages: list, host: str = None, options: dict = None):
-        """Generates a streamed response."""
+    async def generate_response(self, model: str, messages: list, host: str = None, options: dict = None,
+                                keep_alive=None):
+        """Generates a streamed response. `keep_alive` (e.g. "30m") keeps the model and its prompt cache loaded."""
         
         # Determine client to use
         should_close = False
@@ -39,8 +40,11 @@ class Brain:
         else:
              target_client = self.client
 
+        stream = None
         try:
-            async for chunk in await target_client.chat(model=model, messages=messages, stream=True, options=options):
+            extra = {"keep_alive": keep_alive} if keep_alive is not None else {}
+            stream = await target_client.chat(model=model, messages=messages, stream=True, options=options, **extra)
+            async for chunk in stream:
                 # Ensure we yield a dict, not a Pydantic object
                 if hasattr(chunk, 'model_dump'):
                     yield chunk.model_dump()
@@ -52,5 +56,11 @@ class Brain:
             logger.error(f"Generation error (Host: {host or self.host}): {e}")
             yield {"error": str(e)}
         finally:
+            # Closing the stream ends the HTTP response, so an abandoned reply stops generating on the node
+            if stream is not None:
+                try:
+                    await stream.aclose()
+                except Exception as e:
+                    logger.warning(f"Brain: Error closing response stream: {e}")
             if should_close:
                 await target_client.aclose()
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import os
 import sys
 import logging
@@ -7,6 +6,7 @@ from contextlib import AsyncExitStack
 from typing import Dict, Optional, Any
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from engine.modules import codec
 
 logger = logging.getLogger("ENGINE.McpManager")
 
@@ -22,8 +22,7 @@ class McpManager:
         """Loads server configuration from JSON."""
         if os.path.exists(self.config_path):
             try:
-                with open(self.config_path, 'r') as f:
-                    self.config = json.load(f)
+                self.config = codec.read_json(self.config_path)
                 logger.info(f"McpManager: Loaded config from {self.config_path}")
             except Exception as e:
                 logger.error(f"McpManager: Failed to load config: {e}")
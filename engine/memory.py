@@ -1,14 +1,30 @@
 import os
-import json
+import heapq
 import uuid
 import datetime
 import re
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from engine.modules.time_keeper import TimeKeeper
+from engine.modules.chat_index import ChatIndex, build_preview
+from engine.modules.chat_log import (
+    CHAT_LOG_EXT, LEGACY_CHAT_EXT, read_chat_file, read_chat_log, diff_records,
+    append_records, write_snapshot, needs_compaction, count_records, TailReader
+)
+from engine.modules.chat_writer import ChatWriter, DEFAULT_WRITE_DELAY
+from engine.modules.search_index import SearchIndex, SEARCH_DB_FILENAME, MAX_RESULTS
+from engine.modules.chat_archive import ChatArchive, ARCHIVE_DIR, parse_day_folder, pack_name
+from engine.modules.token_counter import stored_tokens
+from engine.modules import codec
 
 logger = logging.getLogger("domain.memory")
 
+CHAT_PAGE_SIZE = 50  # Messages per get_chat_page window
+PERSISTED_CACHE_SIZE = 8  # Chat logs whose on-disk state is kept in memory (least recently used go first)
+SUMMARY_EXT = ".summary.json"  # Rolling summary stored next to a chat's log
+
 # UUID validation pattern
 UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
 
@@ -18,17 +34,243 @@ def _is_valid_uuid(value: str) -> bool:
         return False
     return bool(UUID_PATTERN.match(value))
 
+def _search_changes(records: List[Dict[str, Any]], messages: List[Dict[str, Any]],
+                    offset: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Messages whose search rows a save can have changed (position -> message), from its
+    log records; `messages` is the chat from `offset` on. Pins and token counts are not searched.
+    """
+    changed = {}
+    for record in records:
+        if record["op"] == "add":
+            changed[record["seq"]] = record["msg"]
+        elif record["op"] == "edit" and {"content", "role"} & (set(record["set"]) | set(record.get("unset", []))):
+            changed[record["index"]] = messages[record["index"] - offset]
+    return changed
+
+def _chat_id_from_filename(filename: str) -> Optional[str]:
+    """Returns the chat id for a chat file name (.jsonl log or legacy .json), else None."""
+    for ext in (CHAT_LOG_EXT, LEGACY_CHAT_EXT):
+        if filename.endswith(ext):
+            stem = filename[:-len(ext)]
+            return stem if _is_valid_uuid(stem) else None
+    return None
+
 class Memory:
-    def __init__(self, base_path="chats"):
+    def __init__(self, base_path="chats", background_writes: bool = False, write_delay: float = DEFAULT_WRITE_DELAY):
+        """
+        Args:
+            base_path: Root folder of the chat archive.
+            background_writes: Queue saves on a writer thread that coalesces repeated
+                saves of the same chat within `write_delay` seconds. Call flush() before exit.
+        """
         self.base_path = base_path
         if not os.path.exists(self.base_path):
             os.makedirs(self.base_path)
-            
+        self._lock = threading.RLock()  # Guards files, index and caches across the writer thread
+        self.index = ChatIndex(self.base_path)
+        self.archive = ChatArchive(self.base_path)
+        self._index_ready = False
+        self._paths: Optional[Dict[str, str]] = None  # chat_id -> file path, built lazily
+        # chat_id -> what a log on disk holds, for append-only diffs and paged reads (LRU):
+        # {"meta", "total", "records", "offset", "messages" (from offset on), "reader"}
+        self._persisted: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.search_index = self._open_search_index()
+        self._search_folders: Dict[str, str] = {}  # kind -> folder of plain-text sources (e.g. reflections)
+        self._writer = (ChatWriter(self._write_chat, self._lock, write_delay, self._merge_saves)
+                        if background_writes else None)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Blocks until all queued background saves are on disk. Returns False on timeout."""
+        if not self._writer:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flushes queued saves and stops the writer thread."""
+        flushed = self._writer.stop(timeout) if self._writer else True
+        self.archive.close()
+        if self.search_index:
+            with self._lock:
+                self.search_index.close()
+                self.search_index = None
+        return flushed
+
+    def _open_search_index(self) -> Optional[SearchIndex]:
+        try:
+            return SearchIndex(os.path.join(self.base_path, SEARCH_DB_FILENAME))
+        except Exception as e:
+            # e.g. a Python build whose SQLite lacks FTS5: chats still work, search does not
+            logger.warning(f"Full-text search unavailable: {e}")
+            return None
+
+    def add_search_folder(self, kind: str, folder: str):
+        """Includes the text files of `folder` (e.g. reflections) in search results as `kind`."""
+        self._search_folders[kind] = folder
+
+    def search(self, query: str, limit: int = MAX_RESULTS, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search over chat messages and registered folders.
+        Hits carry a snippet, the date and either chat_id or source file.
+        """
+        if not self._prepare_search():
+            return []
+        return self.search_index.search(query, limit, kind)
+
+    def search_entries(self, ids: Optional[List[int]] = None, include_content: bool = True,
+                       after_id: int = 0) -> List[Dict[str, Any]]:
+        """Searchable messages / paragraphs (e.g. for building embeddings); see SearchIndex.entries."""
+        if not self.search_index:
+            return []
+        if ids is None and not self._prepare_search():
+            return []
+        return self.search_index.entries(ids, include_content, after_id)
+
+    def search_changes(self, after_id: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Searchable entries written after row id `after_id` (no content) and the entry count; see SearchIndex.changes."""
+        if not self._prepare_search():
+            return [], 0
+        return self.search_index.changes(after_id)
+
+    def _prepare_search(self) -> bool:
+        """Brings the search index up to date with queued saves and registered folders."""
+        if not self.search_index:
+            return False
+        self.flush()
+        with self._lock:
+            self._ensure_index()
+            if self.search_index.get_meta("chats_indexed") is None:
+                # Index predates the search database: backfill once
+                self._rebuild_index()
+        for folder_kind, folder in self._search_folders.items():
+            self.search_index.sync_folder(folder_kind, folder)
+        return True
+
+    @staticmethod
+    def _detach(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shallow-copies a chat so later in-place edits by the caller don't leak into a queued save."""
+        return {**data, "messages": [dict(m) for m in data.get("messages") or []]}
+
+    @staticmethod
+    def _meta(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in data.items() if k not in ("messages", "offset")}
+
+    @staticmethod
+    def _merge_saves(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+        """Combines two queued saves: a save from some position on keeps what the older one holds before it."""
+        start, base = newer.get("offset") or 0, older.get("offset") or 0
+        earlier = older.get("messages") or []
+        if start <= base or base + len(earlier) < start:
+            return newer
+        return {**newer, "offset": base, "messages": earlier[:start - base] + (newer.get("messages") or [])}
+
+    def _ensure_index(self):
+        """Loads the chat index, rebuilding it once if it has never been written."""
+        if self._index_ready:
+            return
+        self._index_ready = True
+        if not self.index.exists or not self.index.load():
+            self._rebuild_index()
+
+    def _index_entry(self, chat_id: str, data: Dict[str, Any], file_path: str, records: Optional[int] = None,
+                     previous: Optional[Dict[str, Any]] = None,
+                     replaced: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Builds the index record for a chat file. Besides the listing fields it keeps the
+        chat's stored token total and pinned positions, so opening a long chat needs
+        neither. For a save of the chat from data["offset"] on, `previous` is the current
+        entry and `replaced` what was on disk from that offset; the totals are updated
+        from them instead of from the whole chat.
+        """
+        messages = data.get("messages") or []
+        offset = data.get("offset") or 0
+        pinned = [offset + i for i, m in enumerate(messages) if m.get("pinned")]
+        if not offset:
+            tokens, preview = stored_tokens(messages), build_preview(messages)
+        else:
+            previous = previous or {}
+            preview = previous.get("preview")
+            tokens = previous.get("tokens")
+            if tokens is not None:
+                tokens += stored_tokens(messages) - stored_tokens(replaced or [])
+            if previous.get("pinned") is None:
+                pinned = None
+            else:
+                pinned = [i for i in previous["pinned"] if i < offset] + pinned
+        if self.archive.split(file_path):
+            mtime = self.archive.mtime(file_path)
+        else:
+            try:
+                mtime = os.path.getmtime(file_path)
+            except OSError:
+                mtime = None
+        rel_path = os.path.relpath(file_path, self.base_path)
+        return {
+            "id": chat_id,
+            "created_at": data.get("created_at"),
+            "date": os.path.basename(os.path.dirname(rel_path)) or None,  # Circadian folder (None for legacy root files)
+            "preview": preview,
+            "message_count": offset + len(messages),
+            "path": rel_path,
+            "mtime": mtime,
+            "tokens": tokens,
+            "pinned": pinned,
+            "records": records
+        }
+
+    def rebuild_index(self) -> int:
+        """Rebuilds the chat index from the files on disk (e.g. after out-of-band edits)."""
+        self.flush()
+        with self._lock:
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> int:
+        found: Dict[str, str] = {}
+        for root, dirs, files in os.walk(self.base_path):
+            if root == self.base_path and ARCHIVE_DIR in dirs:
+                dirs.remove(ARCHIVE_DIR)
+            for filename in files:
+                chat_id = _chat_id_from_filename(filename)
+                if not chat_id:
+                    continue
+                # Prefer the append-only log if a legacy copy was left behind
+                if chat_id in found and found[chat_id].endswith(CHAT_LOG_EXT):
+                    continue
+                found[chat_id] = os.path.join(root, filename)
+
+        # Archived chats (a live copy in a day folder wins)
+        for member_path in self.archive.members():
+            chat_id = _chat_id_from_filename(os.path.basename(member_path))
+            if chat_id and chat_id not in found:
+                found[chat_id] = member_path
+
+        entries = []
+        for chat_id, file_path in found.items():
+            try:
+                data, records = self._read_chat_file(file_path)
+                entry = self._index_entry(data.get("id") or chat_id, data, file_path, records or None)
+                entries.append(entry)
+                if self.search_index:
+                    self.search_index.index_chat(entry["id"], entry["date"], data.get("messages") or [])
+            except Exception as e:
+                logger.error(f"Failed to index chat {os.path.basename(file_path)}: {e}")
+
+        self.index.replace_all(entries)
+        if self.search_index:
+            for chat_id in self.search_index.sources("chat") - {e["id"] for e in entries}:
+                self.search_index.remove_source(chat_id)
+            self.search_index.set_meta("chats_indexed", "1")
+        self._index_ready = True
+        self._paths = None
+        self._persisted.clear()
+        logger.info(f"Rebuilt chat index ({len(entries)} chats).")
+        return len(entries)
+
     def create_chat(self) -> Dict[str, Any]:
         """Creates a new chat session metadata (does not save to disk)."""
         chat_id = str(uuid.uuid4())
         timestamp = datetime.datetime.now(datetime.timezone.utc).astimezone().isoformat()
-        
+
         logger.info(f"Created new chat session: {chat_id}")
         return {
             "id": chat_id,
@@ -36,140 +278,632 @@ class Memory:
             "messages": []
         }
 
+    def _path_map(self) -> Dict[str, str]:
+        """Returns the id -> path map, seeding it from the chat index on first use."""
+        if self._paths is None:
+            self._ensure_index()
+            self._paths = {
+                entry["id"]: os.path.join(self.base_path, entry["path"])
+                for entry in self.index.entries() if entry.get("path")
+            }
+        return self._paths
+
     def _find_chat_path(self, chat_id: str) -> Optional[str]:
-        """Recursively searches for a chat file."""
+        """Resolves a chat file via the in-memory map, falling back to a disk search on a miss."""
         # Security: Validate UUID format to prevent path traversal
         if not _is_valid_uuid(chat_id):
             logger.warning(f"Invalid chat_id format rejected: {chat_id[:50]}")
             return None
 
+        paths = self._path_map()
+        cached = paths.get(chat_id)
+        if cached:
+            if self._exists(cached):
+                return cached
+            # Moved or removed out-of-band
+            paths.pop(chat_id, None)
+            self._persisted.pop(chat_id, None)
+
+        found = self._search_chat_path(chat_id) or self.archive.find(chat_id)
+        if found:
+            paths[chat_id] = found
+        return found
+
+    def _exists(self, path: str) -> bool:
+        """os.path.exists that also understands archive paths."""
+        if self.archive.split(path):
+            return self.archive.exists(path)
+        return os.path.exists(path)
+
+    def _read_chat_file(self, path: str):
+        """Reads a chat from a day folder, the root (legacy) or a monthly pack."""
+        if self.archive.split(path):
+            return self.archive.read(path)
+        return read_chat_file(path)
+
+    def _remove_chat_file(self, path: str):
+        """Deletes a chat file, or drops it from its monthly pack."""
+        parts = self.archive.split(path)
+        if parts:
+            if not self.archive.write_pack(parts[0], {}, remove={parts[1]}):
+                raise OSError(f"could not rewrite {os.path.basename(parts[0])}")
+        else:
+            os.remove(path)
+
+    def _search_chat_path(self, chat_id: str) -> Optional[str]:
+        """Recursively searches for a chat file (append-only log first, then legacy JSON)."""
+        names = [f"{chat_id}{CHAT_LOG_EXT}", f"{chat_id}{LEGACY_CHAT_EXT}"]
+
         # 1. Check root (legacy/flat)
-        root_path = os.path.join(self.base_path, f"{chat_id}.json")
-        if os.path.exists(root_path): return root_path
+        for name in names:
+            root_path = os.path.join(self.base_path, name)
+            if os.path.exists(root_path): return root_path
 
         # 2. Check subfolders
         for root, dirs, files in os.walk(self.base_path):
-            if f"{chat_id}.json" in files:
-                return os.path.join(root, f"{chat_id}.json")
+            if root == self.base_path and ARCHIVE_DIR in dirs:
+                dirs.remove(ARCHIVE_DIR)
+            for name in names:
+                if name in files:
+                    return os.path.join(root, name)
         return None
 
-    def save_chat(self, chat_id: str, data: Dict[str, Any]):
-        """Saves chat data to file in date-based subfolder (Circadian)."""
-        # Security: Validate UUID format to prevent path traversal
-        if not _is_valid_uuid(chat_id):
-            logger.warning(f"Invalid chat_id format rejected in save_chat: {chat_id[:50]}")
-            return
+    def _known_chat_path(self, chat_id: str, file_path: str) -> Optional[str]:
+        """Locates an existing chat without a directory crawl (map, target and legacy spots)."""
+        cached = self._path_map().get(chat_id)
+        if cached and self._exists(cached):
+            return cached
+        folder_path = os.path.dirname(file_path)
+        candidates = [
+            file_path,
+            os.path.join(folder_path, f"{chat_id}{LEGACY_CHAT_EXT}"),
+            os.path.join(self.base_path, f"{chat_id}{CHAT_LOG_EXT}"),
+            os.path.join(self.base_path, f"{chat_id}{LEGACY_CHAT_EXT}"),
+        ]
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                return candidate
+        return None
 
-        # Determine folder DD-MM-YYYY
+    def _chat_folder(self, data: Dict[str, Any]) -> str:
+        """Returns the circadian DD-MM-YYYY folder name for a chat."""
         created_at = data.get('created_at')
         if created_at:
             try:
                 dt = datetime.datetime.fromisoformat(created_at)
                 # Use TimeKeeper logic on the specific timestamp
-                date_obj = TimeKeeper.get_date_from_datetime(dt)
-                date_str = date_obj.strftime('%d-%m-%Y')
+                return TimeKeeper.get_date_from_datetime(dt).strftime('%d-%m-%Y')
             except ValueError:
-                date_str = TimeKeeper.get_logical_date().strftime('%d-%m-%Y')
+                pass
+        return TimeKeeper.get_logical_date().strftime('%d-%m-%Y')
+
+    def _load_persisted(self, chat_id: str, file_path: str, start: Optional[int] = None,
+                        tail: Optional[int] = CHAT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Returns the on-disk state of a chat log holding at least its messages from
+        position `start` on (default: the last `tail`, None: all). The log is read from
+        its end and older messages only when asked for, so opening a long chat costs
+        its last page rather than a replay of the whole log.
+        """
+        state = self._persisted.get(chat_id)
+        if state is not None:
+            self._persisted.move_to_end(chat_id)
         else:
-            date_str = TimeKeeper.get_logical_date().strftime('%d-%m-%Y')
-            
-        folder_path = os.path.join(self.base_path, date_str)
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-            
-        file_path = os.path.join(folder_path, f"{chat_id}.json")
+            reader = TailReader(file_path)
+            messages = reader.read_back(tail) if start is None else reader.read_from(start)
+            if messages is None:
+                # Written before adds carried their position: replay it; the next save compacts it
+                data, records = read_chat_log(file_path)
+                state = self._cache_persisted(chat_id, data, records)
+                state["legacy"] = True
+                return state
+            entry = self.index.get(chat_id) or {}
+            records = entry.get("records")
+            state = {
+                "meta": reader.meta, "total": reader.total, "offset": reader.offset, "messages": messages,
+                "records": records if isinstance(records, int) else count_records(file_path), "reader": reader
+            }
+            self._remember_persisted(chat_id, state)
+
+        if start is None:
+            start = 0 if tail is None else max(0, state["total"] - tail)
+        if start < state["offset"]:
+            reader = state.get("reader")
+            if reader is None:
+                # The log was rewritten since: skip what is already held
+                reader = state["reader"] = TailReader(file_path)
+                reader.read_from(state["offset"])
+            older = reader.read_from(start)
+            if older is None:
+                data, records = read_chat_log(file_path)
+                return self._cache_persisted(chat_id, data, records)
+            state["messages"][:0] = older
+            state["offset"] = reader.offset
+        return state
+
+    def _cache_persisted(self, chat_id: str, data: Dict[str, Any], records: int) -> Dict[str, Any]:
+        """Remembers what a freshly written or replayed chat log on disk contains."""
+        messages = [dict(m) for m in data.get("messages") or []]
+        state = {
+            "meta": self._meta(data), "total": len(messages), "offset": 0, "messages": messages,
+            "records": records, "reader": None
+        }
+        self._remember_persisted(chat_id, state)
+        return state
+
+    def _remember_persisted(self, chat_id: str, state: Dict[str, Any]):
+        self._persisted[chat_id] = state
+        self._persisted.move_to_end(chat_id)
+        while len(self._persisted) > PERSISTED_CACHE_SIZE:
+            self._persisted.popitem(last=False)
+
+    def save_chat(self, chat_id: str, data: Dict[str, Any]):
+        """
+        Saves chat data as an append-only log in the date-based subfolder (Circadian).
+        Only the difference to what is already on disk is written; the log is
+        compacted once edits make it noticeably larger than a plain snapshot.
+        With "offset" in `data`, its messages are the chat from that position on
+        (e.g. the loaded tail of a long chat) and earlier messages stay as they are.
+        With background writes enabled the save is queued and returns immediately.
+        """
+        # Security: Validate UUID format to prevent path traversal
+        if not _is_valid_uuid(chat_id):
+            logger.warning(f"Invalid chat_id format rejected in save_chat: {chat_id[:50]}")
+            return
+
+        if self._writer:
+            self._writer.submit(chat_id, self._detach(data))
+            return
+
+        with self._lock:
+            self._write_chat(chat_id, data)
+
+    def _write_chat(self, chat_id: str, data: Dict[str, Any]):
+        """Writes a chat to disk (caller holds the lock)."""
+        # Determine folder DD-MM-YYYY
+        folder_path = os.path.join(self.base_path, self._chat_folder(data))
+        file_path = os.path.join(folder_path, f"{chat_id}{CHAT_LOG_EXT}")
+        existing_path = self._known_chat_path(chat_id, file_path)
+        offset = data.get("offset") or 0
+        messages = data.get("messages") or []
 
         # Check for empty conversation
-        if not data.get("messages"):
+        if not messages and not offset:
             # Try to find existing file to delete
-            existing_path = self._find_chat_path(chat_id)
-            if existing_path and os.path.exists(existing_path):
+            if existing_path and self._exists(existing_path):
                 try:
-                    os.remove(existing_path)
+                    self._remove_chat_file(existing_path)
                     logger.info(f"Deleted empty chat: {chat_id}")
                 except Exception as e:
                     logger.warning(f"Failed to clean up empty chat {chat_id}: {e}")
+            self._forget(chat_id)
             return
-            
-        # Clean up legacy location
-        legacy_path = os.path.join(self.base_path, f"{chat_id}.json")
-        if os.path.exists(legacy_path) and os.path.abspath(legacy_path) != os.path.abspath(file_path):
-            try:
-                os.remove(legacy_path)
-            except OSError as e:
-                logger.warning(f"Failed to remove legacy chat file: {e}")
 
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+
+        meta = self._meta(data)
+        total = offset + len(messages)
+        previous_entry = self.index.get(chat_id)
+        replaced: List[Dict[str, Any]] = []
+        search_changes = None  # None: index every message from offset on
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            state = None
+            if existing_path and os.path.abspath(existing_path) == os.path.abspath(file_path):
+                state = self._load_persisted(chat_id, file_path, offset)
+                if offset > state["total"]:
+                    logger.error(f"Not saving chat {chat_id}: it starts at message {offset}, "
+                                 f"but only {state['total']} are on disk.")
+                    return
+
+            if state is None or state.get("legacy"):
+                # New chat, legacy .json, relocated or pre-position log: start a fresh compacted log
+                if offset:
+                    older = (state or {}).get("messages")
+                    if older is None:
+                        older = self._read_chat_file(existing_path)[0].get("messages") or [] if existing_path else []
+                    if len(older) < offset:
+                        logger.error(f"Not saving chat {chat_id}: messages before {offset} are missing on disk.")
+                        return
+                    messages, offset = older[:offset] + messages, 0
+                records = write_snapshot(file_path, {**meta, "messages": messages})
+                state = self._cache_persisted(chat_id, {**meta, "messages": messages}, records)
+            else:
+                replaced = state["messages"][offset - state["offset"]:]
+                new_records = diff_records(replaced, messages, offset)
+                if not new_records:
+                    return
+                records = state["records"] + len(new_records)
+                search_changes = _search_changes(new_records, messages, offset)
+                if needs_compaction(records, total) and not offset:
+                    records = write_snapshot(file_path, {**meta, "messages": messages})
+                    state["reader"] = None
+                    logger.debug(f"Compacted chat log {chat_id} ({records} records)")
+                else:
+                    append_records(file_path, new_records)
+                    if needs_compaction(records, total):
+                        # Only the tail is held: rebuild the rest from the log itself
+                        records = write_snapshot(file_path, read_chat_log(file_path)[0])
+                        state["reader"] = None
+                        logger.debug(f"Compacted chat log {chat_id} ({records} records)")
+                state["messages"][offset - state["offset"]:] = [dict(m) for m in messages]
+                state.update(meta=meta, total=total, records=records)
         except Exception as e:
             logger.error(f"Failed to save chat {chat_id}: {e}")
+            self._persisted.pop(chat_id, None)
+            return
+
+        # Clean up the previous location (legacy .json / root files / archived copy)
+        if existing_path and os.path.abspath(existing_path) != os.path.abspath(file_path):
+            try:
+                self._remove_chat_file(existing_path)
+            except OSError as e:
+                logger.warning(f"Failed to remove legacy chat file: {e}")
+
+        self._path_map()[chat_id] = file_path
+        entry = self._index_entry(chat_id, {**meta, "messages": messages, "offset": offset}, file_path,
+                                  records, previous_entry, replaced)
+        self.index.put(entry)
+        if self.search_index:
+            if search_changes is None:
+                self.search_index.index_chat(chat_id, entry["date"], messages, offset)
+            else:
+                self.search_index.update_chat(chat_id, entry["date"], search_changes, total)
+
+    def _forget(self, chat_id: str):
+        """Drops all cached state for a chat."""
+        self._persisted.pop(chat_id, None)
+        self._path_map().pop(chat_id, None)
+        self.index.remove(chat_id)
+        if self.search_index:
+            self.search_index.remove_source(chat_id)
 
     def delete_chat(self, chat_id: str) -> bool:
         """Deletes a chat file by ID."""
-        file_path = self._find_chat_path(chat_id)
-        if not file_path:
-             logger.warning(f"Attempted to delete non-existent chat: {chat_id}")
-             return False
-             
-        try:
-            os.remove(file_path)
-            logger.info(f"Deleted chat: {chat_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to delete chat {chat_id}: {e}")
-            return False
+        with self._lock:
+            # Holding the lock means no queued write for this chat can land afterwards
+            was_queued = self._writer.discard(chat_id) if self._writer else False
+            file_path = self._find_chat_path(chat_id)
+            if not file_path:
+                if was_queued:
+                    self._forget(chat_id)
+                    logger.info(f"Deleted unsaved chat: {chat_id}")
+                    return True
+                logger.warning(f"Attempted to delete non-existent chat: {chat_id}")
+                return False
+
+            try:
+                self._remove_chat_file(file_path)
+                self._remove_summary(file_path, chat_id)
+                logger.info(f"Deleted chat: {chat_id}")
+                self._forget(chat_id)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to delete chat {chat_id}: {e}")
+                return False
 
     def get_chat(self, chat_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieves chat data."""
+        """Retrieves chat data (append-only log or legacy JSON), including queued saves."""
+        queued = self._writer.pending(chat_id) if self._writer else None
+        if queued is not None and not queued.get("offset"):
+            return self._detach(queued)
+
+        with self._lock:
+            file_path = self._find_chat_path(chat_id)
+            if not file_path:
+                return None
+            try:
+                data, _ = self._read_chat_file(file_path)
+            except Exception as e:
+                logger.error(f"Failed to load chat {chat_id}: {e}")
+                return None
+
+        if queued is not None:
+            # A queued save of the chat's tail
+            older = (data.get("messages") or [])[:queued["offset"]]
+            data = {**self._meta(queued), "messages": older + self._detach(queued)["messages"]}
+        return data
+
+    def _disk_window(self, chat_id: str, start: Optional[int] = None,
+                     tail: Optional[int] = CHAT_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        A chat as on disk from position `start` on (default: its last `tail` messages):
+        {"meta", "offset", "messages", "total"}. Logs are read from their end (see
+        _load_persisted); other files are read whole. Caller holds the lock.
+        """
         file_path = self._find_chat_path(chat_id)
         if not file_path:
             return None
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            if file_path.endswith(CHAT_LOG_EXT) and not self.archive.split(file_path):
+                state = self._load_persisted(chat_id, file_path, start, tail)
+                return {k: state[k] for k in ("meta", "offset", "messages", "total")}
+            data, _ = self._read_chat_file(file_path)
         except Exception as e:
             logger.error(f"Failed to load chat {chat_id}: {e}")
             return None
+        messages = data.get("messages") or []
+        return {"meta": self._meta(data), "offset": 0, "messages": messages, "total": len(messages)}
+
+    def _window(self, chat_id: str, start: Optional[int] = None,
+                tail: Optional[int] = CHAT_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """_disk_window with a queued save laid over it (caller holds the lock)."""
+        queued = self._writer.pending(chat_id) if self._writer else None
+        if queued is None:
+            return self._disk_window(chat_id, start, tail)
+
+        base = queued.get("offset") or 0
+        window = {"meta": self._meta(queued), "offset": base, "messages": queued.get("messages") or []}
+        window["total"] = base + len(window["messages"])
+        if start is None:
+            start = 0 if tail is None else max(0, window["total"] - tail)
+        if start < base:
+            disk = self._disk_window(chat_id, start)
+            if disk is None:
+                return None
+            window["messages"] = disk["messages"][max(0, start - disk["offset"]):base - disk["offset"]] + window["messages"]
+            window["offset"] = max(start, disk["offset"])
+        return window
+
+    def get_chat_page(self, chat_id: str, limit: Optional[int] = CHAT_PAGE_SIZE,
+                      before: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns a window of a chat: its metadata plus "messages", "offset" (index of the
+        first returned message) and "total". Without `before` this is the tail; pass the
+        returned offset as `before` to page towards the start (limit=None: everything).
+        Logs are read from their end, so a page costs only the records it needs.
+        "tokens" (stored token counts of the whole chat) and "pinned" (positions of pinned
+        messages) come from the chat index; either is None if not known yet (see get_chat_stats).
+        """
+        with self._lock:
+            start = None
+            if before is not None:
+                start = 0 if limit is None else max(0, before - limit)
+            window = self._window(chat_id, start, limit)
+            if window is None:
+                return None
+            entry = self.index.get(chat_id) or {}
+
+        total = window["total"]
+        end = total if before is None else max(0, min(before, total))
+        start = max(window["offset"], 0 if limit is None else end - limit)
+        messages = window["messages"][start - window["offset"]:end - window["offset"]]
+        return {**window["meta"], "messages": [dict(m) for m in messages], "offset": start, "total": total,
+                "tokens": entry.get("tokens"), "pinned": entry.get("pinned")}
+
+    def get_messages(self, chat_id: str, positions: List[int]) -> List[Dict[str, Any]]:
+        """The messages at the given positions of a chat (e.g. pinned ones above the loaded tail)."""
+        positions = sorted(set(p for p in positions if p >= 0))
+        if not positions:
+            return []
+        with self._lock:
+            window = self._window(chat_id, positions[0])
+        if window is None:
+            return []
+        held = window["messages"]
+        return [dict(held[p - window["offset"]]) for p in positions if 0 <= p - window["offset"] < len(held)]
+
+    def get_chat_stats(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """
+        {"tokens", "pinned"} of a chat as on disk (see get_chat_page). Chats indexed before
+        these were kept are read once and their index entry completed.
+        """
+        self.flush()
+        with self._lock:
+            self._ensure_index()
+            entry = self.index.get(chat_id)
+            if entry and entry.get("tokens") is not None and entry.get("pinned") is not None:
+                return {"tokens": entry["tokens"], "pinned": entry["pinned"]}
+            file_path = self._find_chat_path(chat_id)
+            if not file_path:
+                return None
+            try:
+                data, records = self._read_chat_file(file_path)
+            except Exception as e:
+                logger.error(f"Failed to load chat {chat_id}: {e}")
+                return None
+            entry = self._index_entry(chat_id, data, file_path, records or None)
+            self.index.put(entry)
+            return {"tokens": entry["tokens"], "pinned": entry["pinned"]}
+
+    @staticmethod
+    def _summary_file(chat_path: str, chat_id: str) -> str:
+        return os.path.join(os.path.dirname(chat_path), f"{chat_id}{SUMMARY_EXT}")
+
+    def _remove_summary(self, chat_path: str, chat_id: str):
+        if self.archive.split(chat_path):
+            return
+        try:
+            os.remove(self._summary_file(chat_path, chat_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove chat summary for {chat_id}: {e}")
+
+    def get_chat_summary(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the rolling summary stored next to a chat (None if there is none)."""
+        if not _is_valid_uuid(chat_id):
+            return None
+        with self._lock:
+            file_path = self._find_chat_path(chat_id)
+        if not file_path or self.archive.split(file_path):
+            return None
+        try:
+            return codec.read_json(self._summary_file(file_path, chat_id))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable summary for {chat_id}: {e}")
+            return None
+
+    def save_chat_summary(self, chat_id: str, summary: Dict[str, Any]) -> bool:
+        """Stores a chat's rolling summary next to its log. False if the chat is not on disk."""
+        if not _is_valid_uuid(chat_id):
+            return False
+        with self._lock:
+            file_path = self._find_chat_path(chat_id)
+            if not file_path or self.archive.split(file_path):
+                return False
+            try:
+                codec.write_json(self._summary_file(file_path, chat_id), summary)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to save summary for {chat_id}: {e}")
+                return False
 
     def get_chats_by_date(self, date_obj: datetime.date) -> List[Dict[str, Any]]:
-        """Retrieves all chats for a specific circadian date."""
+        """Retrieves all chats for a specific circadian date (day folder or monthly pack)."""
+        self.flush()
         date_str = date_obj.strftime('%d-%m-%Y')
         folder_path = os.path.join(self.base_path, date_str)
-        
+
+        files = {}
+        if os.path.exists(folder_path):
+            for filename in os.listdir(folder_path):
+                chat_id = _chat_id_from_filename(filename)
+                if chat_id and not files.get(chat_id, "").endswith(CHAT_LOG_EXT):
+                    files[chat_id] = os.path.join(folder_path, filename)
+
+        for member_path in self.archive.members(day=date_str):
+            chat_id = _chat_id_from_filename(os.path.basename(member_path))
+            if chat_id and chat_id not in files:
+                files[chat_id] = member_path
+
         results = []
-        if not os.path.exists(folder_path):
-            return results
-            
-        for filename in os.listdir(folder_path):
-            if filename.endswith(".json"):
+        for file_path in files.values():
+            try:
+                data, _ = self._read_chat_file(file_path)
+                results.append(data)
+            except Exception as e:
+                logger.error(f"Failed to load chat {os.path.basename(file_path)}: {e}")
+
+        return results
+
+    def archive_old_days(self, older_than_days: int) -> int:
+        """
+        Packs day folders older than `older_than_days` (circadian days) into one
+        compressed pack per month under archive/. Archived chats stay readable
+        through get_chat, get_chats_by_date and list_chats; saving one moves it
+        back into a day folder. Returns the number of chats archived.
+        """
+        if older_than_days < 1:
+            return 0
+        self.flush()
+        cutoff = TimeKeeper.get_logical_date() - datetime.timedelta(days=older_than_days)
+
+        with self._lock:
+            self._ensure_index()
+            months: Dict[str, List[str]] = {}
+            for name in os.listdir(self.base_path):
+                day = parse_day_folder(name)
+                if day and day < cutoff and os.path.isdir(os.path.join(self.base_path, name)):
+                    months.setdefault(pack_name(day), []).append(name)
+
+            archived = 0
+            for month, days in sorted(months.items()):
+                archived += self._archive_month(os.path.join(self.archive.folder, month), days)
+            if archived:
+                logger.info(f"Archived {archived} chats from {sum(len(d) for d in months.values())} day folders.")
+            return archived
+
+    def _archive_month(self, pack_path: str, days: List[str]) -> int:
+        """Moves the chats of some day folders into one monthly pack (caller holds the lock)."""
+        add: Dict[str, Dict[str, Any]] = {}
+        sources: Dict[str, List[str]] = {}  # member -> files it replaces
+        derived: List[str] = []
+        for day in days:
+            folder_path = os.path.join(self.base_path, day)
+            chosen: Dict[str, str] = {}
+            for filename in os.listdir(folder_path):
+                if filename.endswith(SUMMARY_EXT):
+                    # Summaries are derived data; an archived chat gets a fresh one if it is reopened
+                    derived.append(os.path.join(folder_path, filename))
+                    continue
+                chat_id = _chat_id_from_filename(filename)
+                if not chat_id:
+                    continue
+                sources.setdefault(f"{day}/{chat_id}{CHAT_LOG_EXT}", []).append(os.path.join(folder_path, filename))
+                if not chosen.get(chat_id, "").endswith(CHAT_LOG_EXT):
+                    chosen[chat_id] = os.path.join(folder_path, filename)
+            for chat_id, file_path in chosen.items():
                 try:
-                    filepath = os.path.join(folder_path, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        results.append(data)
+                    data, _ = read_chat_file(file_path)
                 except Exception as e:
-                    logger.error(f"Failed to load chat {filename}: {e}")
-                    
-        return results
+                    logger.error(f"Skipping unreadable chat {os.path.basename(file_path)} during archival: {e}")
+                    sources.pop(f"{day}/{chat_id}{CHAT_LOG_EXT}", None)
+                    continue
+                if data.get("messages"):
+                    add[f"{day}/{chat_id}{CHAT_LOG_EXT}"] = data
 
-    def list_chats(self) -> List[Dict[str, Any]]:
-        """Lists all chats recursively."""
-        chats = []
-        for root, dirs, files in os.walk(self.base_path):
-            for filename in files:
-                if filename.endswith(".json"):
-                    try:
-                        file_path = os.path.join(root, filename)
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            
-                        chats.append({
-                            "id": data.get("id"),
-                            "created_at": data.get("created_at"),
-                            "preview": (data.get("messages", []) or [{"content": "Empty"}])[0].get("content")[:50]
-                        })
-                    except Exception as e:
-                        logger.error(f"Failed to list chat {filename}: {e}")
-                        
-        return sorted(chats, key=lambda x: x.get("created_at", ""), reverse=True)
+        if add and not self.archive.write_pack(pack_path, add):
+            return 0  # Originals are untouched
+
+        for member, files in sources.items():
+            for file_path in files:
+                try:
+                    os.remove(file_path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove archived chat file: {e}")
+            chat_id = _chat_id_from_filename(os.path.basename(files[0]))
+            self._persisted.pop(chat_id, None)
+            if member in add:
+                member_path = self.archive.member_path(pack_path, member)
+                self._path_map()[chat_id] = member_path
+                self.index.put(self._index_entry(chat_id, add[member], member_path))
+            else:
+                self._forget(chat_id)  # Empty chat: nothing worth keeping
+
+        for file_path in derived:
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                logger.warning(f"Failed to remove chat summary: {e}")
+
+        for day in days:
+            try:
+                os.rmdir(os.path.join(self.base_path, day))
+            except OSError:
+                pass  # Something else lives there; leave it
+        return len(add)
+
+    @staticmethod
+    def chat_cursor(chat: Dict[str, Any]) -> str:
+        """Opaque pagination cursor for a list_chats entry ("created_at|id")."""
+        return f"{chat.get('created_at') or ''}|{chat.get('id')}"
+
+    def list_chats(self, limit: Optional[int] = None, before_cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lists chats from the persistent index (newest first), including queued saves.
+        With `limit`, returns one page; pass chat_cursor() of the last entry as
+        `before_cursor` to fetch the next one.
+        """
+        with self._lock:
+            self._ensure_index()
+            chats = {entry["id"]: entry for entry in self.index.entries()}
+
+        if self._writer:
+            for chat_id, data in self._writer.pending_items().items():
+                offset = data.get("offset") or 0
+                if data.get("messages") or offset:
+                    entry = dict(chats.get(chat_id) or {"id": chat_id, "path": None, "mtime": None, "date": None})
+                    entry.update({
+                        "created_at": data.get("created_at"),
+                        "message_count": offset + len(data.get("messages") or [])
+                    })
+                    if not offset:
+                        entry["preview"] = build_preview(data["messages"])
+                    chats[chat_id] = entry
+                else:
+                    chats.pop(chat_id, None)
+
+        sort_key = lambda x: (x.get("created_at") or "", x.get("id") or "")
+        chats = chats.values()
+        if before_cursor:
+            created_at, _, chat_id = before_cursor.rpartition("|")
+            boundary = (created_at, chat_id)
+            chats = [c for c in chats if sort_key(c) < boundary]
+
+        if limit is None:
+            return sorted(chats, key=sort_key, reverse=True)
+        # Partial sort: only the requested page is ordered
+        return heapq.nlargest(max(0, limit), chats, key=sort_key)
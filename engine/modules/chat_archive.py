@@ -0,0 +1,197 @@
+import os
+import io
+import re
+import zipfile
+import logging
+import datetime
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from engine.modules.chat_log import CHAT_LOG_EXT, replay_chat_log, dumps_snapshot
+
+logger = logging.getLogger("domain.memory.archive")
+
+ARCHIVE_DIR = "archive"
+PACK_EXT = ".zip"
+DAY_FOLDER_PATTERN = re.compile(r'^\d{2}-\d{2}-\d{4}$')
+
+# Archived chats are addressed with a path *through* the pack, e.g.
+#   chats/archive/2026-01.zip/18-01-2026/<uuid>.jsonl
+# so index entries, the path map and relpath() work unchanged.
+
+
+def parse_day_folder(name: str) -> Optional[datetime.date]:
+    """Returns the date of a DD-MM-YYYY folder name (None for anything else)."""
+    if not DAY_FOLDER_PATTERN.match(name):
+        return None
+    try:
+        return datetime.datetime.strptime(name, '%d-%m-%Y').date()
+    except ValueError:
+        return None
+
+
+def pack_name(day: datetime.date) -> str:
+    """Monthly pack file name, e.g. 2026-01.zip (sorts chronologically)."""
+    return f"{day.strftime('%Y-%m')}{PACK_EXT}"
+
+
+class ChatArchive:
+    """
+    Cold storage for old circadian day folders: one deflate-compressed zip
+    pack per month under <base>/archive. The zip central directory is the
+    random-access index, so a single chat is read without unpacking the pack.
+    """
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.folder = os.path.join(base_path, ARCHIVE_DIR)
+        self._lock = threading.Lock()
+        self._open: Dict[str, Tuple[float, zipfile.ZipFile]] = {}  # pack path -> (mtime, handle)
+
+    def split(self, path: str) -> Optional[Tuple[str, str]]:
+        """Splits an archive path into (pack path, member name); None for regular files."""
+        marker = PACK_EXT + os.sep
+        rel = os.path.relpath(path, self.folder)
+        if rel.startswith(os.pardir) or marker not in rel:
+            return None
+        pack, member = rel.split(marker, 1)
+        return os.path.join(self.folder, pack + PACK_EXT), member.replace(os.sep, '/')
+
+    def member_path(self, pack_path: str, member: str) -> str:
+        return os.path.join(pack_path, *member.split('/'))
+
+    def packs(self) -> List[str]:
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(os.path.join(self.folder, f) for f in os.listdir(self.folder) if f.endswith(PACK_EXT))
+
+    def _zip(self, pack_path: str) -> Optional[zipfile.ZipFile]:
+        """Cached read handle, reopened when the pack changed on disk (caller holds the lock)."""
+        try:
+            mtime = os.path.getmtime(pack_path)
+        except OSError:
+            self._drop(pack_path)
+            return None
+        cached = self._open.get(pack_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        self._drop(pack_path)
+        handle = zipfile.ZipFile(pack_path, 'r')
+        self._open[pack_path] = (mtime, handle)
+        return handle
+
+    def _drop(self, pack_path: str):
+        cached = self._open.pop(pack_path, None)
+        if cached:
+            cached[1].close()
+
+    def close(self):
+        with self._lock:
+            for pack_path in list(self._open):
+                self._drop(pack_path)
+
+    def exists(self, path: str) -> bool:
+        parts = self.split(path)
+        if not parts:
+            return False
+        with self._lock:
+            zf = self._zip(parts[0])
+            if not zf:
+                return False
+            try:
+                zf.getinfo(parts[1])
+                return True
+            except KeyError:
+                return False
+
+    def mtime(self, path: str) -> Optional[float]:
+        parts = self.split(path)
+        try:
+            return os.path.getmtime(parts[0]) if parts else None
+        except OSError:
+            return None
+
+    def read(self, path: str) -> Tuple[Dict[str, Any], int]:
+        """Reads one archived chat. Raises FileNotFoundError if it is not in the pack."""
+        parts = self.split(path)
+        if not parts:
+            raise FileNotFoundError(path)
+        with self._lock:
+            zf = self._zip(parts[0])
+            if not zf:
+                raise FileNotFoundError(path)
+            try:
+                raw = zf.read(parts[1]).decode('utf-8')
+            except KeyError:
+                raise FileNotFoundError(path)
+        return replay_chat_log(io.StringIO(raw), parts[1])
+
+    def members(self, pack_path: Optional[str] = None, day: Optional[str] = None) -> List[str]:
+        """Archive paths of all chats (optionally of one pack and/or one DD-MM-YYYY day)."""
+        packs = [pack_path] if pack_path else self.packs()
+        if day and not pack_path:
+            date_obj = parse_day_folder(day)
+            packs = [os.path.join(self.folder, pack_name(date_obj))] if date_obj else []
+        paths = []
+        with self._lock:
+            for pack in packs:
+                zf = self._zip(pack)
+                if not zf:
+                    continue
+                for name in zf.namelist():
+                    if day and not name.startswith(day + '/'):
+                        continue
+                    paths.append(self.member_path(pack, name))
+        return paths
+
+    def find(self, chat_id: str) -> Optional[str]:
+        """Locates a chat in any pack (newest first)."""
+        suffix = f"/{chat_id}{CHAT_LOG_EXT}"
+        with self._lock:
+            for pack in reversed(self.packs()):
+                zf = self._zip(pack)
+                if not zf:
+                    continue
+                for name in zf.namelist():
+                    if name.endswith(suffix):
+                        return self.member_path(pack, name)
+        return None
+
+    def write_pack(self, pack_path: str, add: Dict[str, Dict[str, Any]], remove: Optional[set] = None) -> bool:
+        """
+        Rewrites a pack with `add` (member -> chat data) merged in and `remove`
+        members dropped. Goes through a temp file + os.replace, so a crash leaves
+        the previous pack intact. Removes the pack if nothing is left.
+        """
+        remove = remove or set()
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = pack_path + ".tmp"
+        with self._lock:
+            try:
+                current = self._zip(pack_path) if os.path.exists(pack_path) else None
+                kept = 0
+                # The zip goes to a handle we own, so it can be fsynced (Windows refuses fsync on read-only handles)
+                with open(tmp_path, 'wb') as f:
+                    with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as out:
+                        if current:
+                            for info in current.infolist():
+                                if info.filename in add or info.filename in remove:
+                                    continue
+                                out.writestr(info, current.read(info.filename))
+                                kept += 1
+                        for member, data in sorted(add.items()):
+                            out.writestr(member, dumps_snapshot(data))
+                            kept += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._drop(pack_path)
+                if kept:
+                    os.replace(tmp_path, pack_path)
+                else:
+                    os.remove(tmp_path)
+                    if os.path.exists(pack_path):
+                        os.remove(pack_path)
+                return True
+            except Exception as e:
+                logger.error(f"ChatArchive: Failed to write {os.path.basename(pack_path)}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
@@ -0,0 +1,144 @@
+import os
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+from engine.modules import codec
+
+logger = logging.getLogger("domain.memory.index")
+
+INDEX_FILENAME = ".chat_index.jsonl"
+PREVIEW_LENGTH = 50
+# Rewrite the journal once it holds this many records more than live entries
+COMPACT_SLACK = 256
+
+
+def build_preview(messages: list) -> str:
+    """Returns the sidebar preview for a message list (first message, 50 chars)."""
+    first = (messages or [{"content": "Empty"}])[0]
+    return str(first.get("content") or "")[:PREVIEW_LENGTH]
+
+
+class ChatIndex:
+    """
+    Persistent metadata index for the chat archive.
+
+    Stored as an append-only JSONL journal inside the chats folder:
+    each line is either {"op": "put", "entry": {...}} or {"op": "del", "id": ...}.
+    Replaying the journal yields the current entries; the file is compacted
+    once stale records outnumber live ones, so listing never touches chat files.
+    """
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.path = os.path.join(base_path, INDEX_FILENAME)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._records = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> bool:
+        """Loads the journal from disk. Returns False if it is missing or unreadable."""
+        with self._lock:
+            self._entries = {}
+            self._records = 0
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return False
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = codec.loads(line)
+                        except codec.JSONDecodeError:
+                            # A torn final line from a crash mid-append; skip it.
+                            logger.warning("ChatIndex: Skipping corrupt index record.")
+                            continue
+                        self._apply(record)
+                        self._records += 1
+                return True
+            except OSError as e:
+                logger.error(f"ChatIndex: Failed to read index: {e}")
+                self._entries = {}
+                return False
+
+    def _apply(self, record: Dict[str, Any]):
+        op = record.get("op")
+        if op == "put" and record.get("entry", {}).get("id"):
+            entry = record["entry"]
+            self._entries[entry["id"]] = entry
+        elif op == "del":
+            self._entries.pop(record.get("id"), None)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def get(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get(chat_id)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    def put(self, entry: Dict[str, Any]):
+        """Inserts or replaces the entry for a chat."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._entries.get(entry["id"]) == entry:
+                return
+            self._entries[entry["id"]] = entry
+            self._append({"op": "put", "entry": entry})
+
+    def remove(self, chat_id: str):
+        """Drops a chat from the index."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._entries.pop(chat_id, None) is None:
+                return
+            self._append({"op": "del", "id": chat_id})
+
+    def replace_all(self, entries: List[Dict[str, Any]]):
+        """Replaces the whole index (used by rebuilds)."""
+        with self._lock:
+            self._entries = {e["id"]: e for e in entries if e.get("id")}
+            self._loaded = True
+            self._compact()
+
+    def _append(self, record: Dict[str, Any]):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(codec.dumps(record) + "\n")
+            self._records += 1
+        except OSError as e:
+            logger.error(f"ChatIndex: Failed to append index record: {e}")
+            return
+
+        if self._records > len(self._entries) * 2 + COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self):
+        """Rewrites the journal with one record per live entry (atomic replace)."""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self._entries.values():
+                    f.write(codec.dumps({"op": "put", "entry": entry}) + "\n")
+            os.replace(tmp_path, self.path)
+            self._records = len(self._entries)
+            logger.debug(f"ChatIndex: Compacted index ({self._records} entries).")
+        except OSError as e:
+            logger.error(f"ChatIndex: Failed to compact index: {e}")
@@ -0,0 +1,277 @@
+import os
+import logging
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from engine.modules import codec
+
+logger = logging.getLogger("domain.memory.chat_log")
+
+CHAT_LOG_EXT = ".jsonl"
+LEGACY_CHAT_EXT = ".json"
+# Compact once the log holds this many records beyond one per message
+COMPACT_SLACK = 32
+READ_BLOCK = 64 * 1024  # Bytes per step when a log is read from its end
+
+# Record types (one JSON object per line):
+#   {"op": "meta", "id": ..., "created_at": ...}                     -- always the first line
+#   {"op": "add", "seq": n, "msg": {...}}                            -- message at position n
+#   {"op": "edit", "index": i, "id": ..., "set": {...}, "unset": []} -- field changes (e.g. pin toggles)
+#   {"op": "truncate", "count": n}                                   -- keep the first n messages (regeneration)
+# "seq" lets TailReader find the newest messages without replaying the log; an edit
+# only applies while the message at its index still has its id.
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return codec.dumps(record)
+
+
+def _apply_edit(msg: Dict[str, Any], record: Dict[str, Any]):
+    if "id" in record and record["id"] != msg.get("id"):
+        return  # The message it was written for has been replaced since
+    msg.update(record.get("set", {}))
+    for key in record.get("unset", []):
+        msg.pop(key, None)
+
+
+def read_chat_log(path: str) -> Tuple[Dict[str, Any], int]:
+    """Replays a chat log into a chat document. Returns (data, record_count)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return replay_chat_log(f, os.path.basename(path))
+
+
+def replay_chat_log(lines: Iterable[str], name: str = "") -> Tuple[Dict[str, Any], int]:
+    """Replays chat log lines (from a file or an archive member). Returns (data, record_count)."""
+    data: Dict[str, Any] = {"id": None, "created_at": None, "messages": []}
+    messages = data["messages"]
+    records = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = codec.loads(line)
+        except codec.JSONDecodeError:
+            # A torn final line from a crash mid-append; everything before it is intact.
+            logger.warning(f"ChatLog: Skipping corrupt record in {name}")
+            continue
+
+        records += 1
+        op = record.get("op")
+        if op == "add":
+            messages.append(record.get("msg", {}))
+        elif op == "edit":
+            index = record.get("index", -1)
+            if 0 <= index < len(messages):
+                _apply_edit(messages[index], record)
+        elif op == "truncate":
+            del messages[max(0, record.get("count", 0)):]
+        elif op == "meta":
+            for key, value in record.items():
+                if key != "op":
+                    data[key] = value
+    return data, records
+
+
+def read_chat_file(path: str) -> Tuple[Dict[str, Any], int]:
+    """Loads a chat in either format. Legacy .json files report 0 records."""
+    if path.endswith(CHAT_LOG_EXT):
+        return read_chat_log(path)
+    return codec.read_json(path), 0
+
+
+def snapshot_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Returns the minimal record list that reproduces a chat document."""
+    meta = {"op": "meta"}
+    for key, value in data.items():
+        if key != "messages":
+            meta[key] = value
+    return [meta] + [{"op": "add", "seq": seq, "msg": msg} for seq, msg in enumerate(data.get("messages", []))]
+
+
+def diff_records(previous: List[Dict[str, Any]], current: List[Dict[str, Any]], base: int = 0) -> List[Dict[str, Any]]:
+    """
+    Computes the records that turn the persisted message list into the current one.
+    Both lists may be the tail of the chat from position `base` on (earlier messages are
+    left alone). Messages are matched by position and id; anything after the first
+    mismatch is re-appended.
+    """
+    records = []
+    common = min(len(previous), len(current))
+    split = common
+    for i in range(common):
+        old, new = previous[i], current[i]
+        if old.get("id") != new.get("id"):
+            split = i
+            break
+        if old == new:
+            continue
+        changed = {k: v for k, v in new.items() if old.get(k) != v or k not in old}
+        removed = [k for k in old if k not in new]
+        record = {"op": "edit", "index": base + i, "set": changed}
+        if "id" in new:
+            record["id"] = new["id"]
+        if removed:
+            record["unset"] = removed
+        records.append(record)
+
+    if split < len(previous):
+        records.append({"op": "truncate", "count": base + split})
+    for i, msg in enumerate(current[split:], base + split):
+        records.append({"op": "add", "seq": i, "msg": msg})
+    return records
+
+
+def append_records(path: str, records: List[Dict[str, Any]]):
+    """Appends records to a chat log (starting a fresh line if the last append was torn)."""
+    payload = "".join(_dumps(r) + "\n" for r in records).encode('utf-8')
+    with open(path, 'ab+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                payload = b"\n" + payload
+        f.write(payload)
+
+
+def dumps_snapshot(data: Dict[str, Any]) -> str:
+    """Serializes a chat as a compacted log."""
+    return "".join(_dumps(r) + "\n" for r in snapshot_records(data))
+
+
+def write_snapshot(path: str, data: Dict[str, Any]) -> int:
+    """Writes a compacted log via temp file + os.replace. Returns the record count."""
+    records = snapshot_records(data)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("".join(_dumps(r) + "\n" for r in records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def count_records(path: str) -> int:
+    """Number of records in a log, counted without parsing them."""
+    with open(path, 'rb') as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+
+
+def needs_compaction(record_count: int, message_count: int) -> bool:
+    """True once edits/truncations make the log noticeably longer than a snapshot."""
+    return record_count > (message_count + 1) * 2 + COMPACT_SLACK
+
+
+class TailReader:
+    """
+    Reads a chat log from its end, so the newest messages cost only their own records
+    instead of a replay of the whole log. Each read_back() continues where the previous
+    one stopped, so paging towards the start reads every record at most once.
+
+    Walking backwards, the first add/truncate record gives the message count; a truncate
+    hides older adds at or past its count and edits wait for the add of their message.
+    Logs written before "add" records carried "seq" cannot be read this way: read_back()
+    returns None and the caller replays the log instead.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.meta: Dict[str, Any] = {}
+        self.total: Optional[int] = None   # Message count
+        self.offset: Optional[int] = None  # Position of the oldest message returned so far
+        self.positioned = True
+        self._end: Optional[int] = None    # Records before this file position are unread
+        self._head = 0                     # Length of the meta line
+        self._carry = b""                  # Start of a line cut off by the last block boundary
+        self._cap: Optional[int] = None    # Older adds at or past this position were truncated
+        self._low: Optional[int] = None    # Every position from here on has been found
+        self._edits: Dict[int, List[Dict[str, Any]]] = {}  # Newest first, until their add turns up
+        self._found: Dict[int, Dict[str, Any]] = {}
+
+    def read_back(self, count: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """The `count` messages before those already returned (None: all of them), oldest first."""
+        return self._read(lambda offset: 0 if count is None else max(0, offset - count))
+
+    def read_from(self, start: int) -> Optional[List[Dict[str, Any]]]:
+        """The messages from position `start` up to those already returned, oldest first."""
+        return self._read(lambda offset: max(0, min(start, offset)))
+
+    def _read(self, first) -> Optional[List[Dict[str, Any]]]:
+        with open(self.path, 'rb') as f:
+            if self._end is None:
+                self._read_meta(f)
+            while self.total is None and self._step(f):
+                pass
+            if not self.positioned:
+                return None
+            if self.total is None:
+                self._set_total(0)
+            start = first(self.offset)
+            while self._low > start and self._step(f):
+                pass
+        if not self.positioned:
+            return None
+        messages = [self._found.pop(seq) for seq in range(start, self.offset) if seq in self._found]
+        self.offset = start
+        return messages
+
+    def _read_meta(self, f):
+        first = f.readline()
+        record = self._parse(first)
+        if record and record.get("op") == "meta":
+            self._head = len(first)
+            self.meta = {k: v for k, v in record.items() if k != "op"}
+        self._end = f.seek(0, os.SEEK_END)
+
+    def _parse(self, line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return codec.loads(line)
+        except codec.JSONDecodeError:
+            # A torn final line from a crash mid-append; everything before it is intact.
+            logger.warning(f"ChatLog: Skipping corrupt record in {os.path.basename(self.path)}")
+            return None
+
+    def _step(self, f) -> bool:
+        """Takes in the records of the next block towards the start. False once there are none."""
+        if not self.positioned or (self._end <= self._head and not self._carry):
+            return False
+        size = min(READ_BLOCK, self._end - self._head)
+        self._end -= size
+        f.seek(self._end)
+        lines = (f.read(size) + self._carry).split(b"\n")
+        # The first line may continue in the previous block
+        self._carry = lines.pop(0) if self._end > self._head else b""
+        for line in reversed(lines):
+            record = self._parse(line)
+            if record:
+                self._take(record)
+        return self.positioned
+
+    def _set_total(self, total: int):
+        self.total = self.offset = self._cap = self._low = total
+
+    def _take(self, record: Dict[str, Any]):
+        op = record.get("op")
+        if op == "add":
+            seq = record.get("seq")
+            if not isinstance(seq, int):
+                self.positioned = False
+                return
+            if self.total is None:
+                self._set_total(seq + 1)
+            if seq < min(self._cap, self.offset) and seq not in self._found:
+                msg = record.get("msg", {})
+                for edit in reversed(self._edits.pop(seq, [])):
+                    _apply_edit(msg, edit)
+                self._found[seq] = msg
+                while self._low - 1 in self._found:
+                    self._low -= 1
+        elif op == "edit":
+            index = record.get("index", -1)
+            if index >= 0 and (self._cap is None or index < self._cap):
+                self._edits.setdefault(index, []).append(record)
+        elif op == "truncate":
+            count = max(0, record.get("count", 0))
+            if self.total is None:
+                self._set_total(count)
+            self._cap = min(self._cap, count)
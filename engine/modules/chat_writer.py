@@ -0,0 +1,140 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("domain.memory.writer")
+
+DEFAULT_WRITE_DELAY = 0.25  # Seconds a save may wait for newer saves of the same chat
+
+
+class ChatWriter:
+    """
+    Background writer thread for chat saves.
+
+    Saves are queued per chat id; a save arriving while an older one is still
+    waiting replaces it, so a burst of saves of the same chat costs one write.
+    The callback runs under `lock`, which callers also hold while deleting,
+    so a queued write can never resurrect a deleted chat.
+    """
+    def __init__(self, write_fn: Callable[[str, Dict[str, Any]], None], lock: threading.RLock,
+                 delay: float = DEFAULT_WRITE_DELAY,
+                 merge_fn: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None):
+        """
+        Args:
+            merge_fn: Combines a waiting save with a newer one (older, newer) -> data,
+                for saves that only carry part of a chat. By default the newer one wins.
+        """
+        self._write_fn = write_fn
+        self._merge_fn = merge_fn
+        self._lock = lock
+        self.delay = delay
+        self._pending: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # chat_id -> (due, data)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ChatWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, chat_id: str, data: Dict[str, Any]):
+        """Queues a save; replaces any save of the same chat that is still waiting."""
+        with self._cond:
+            if chat_id in self._pending:
+                due, waiting = self._pending[chat_id]
+                if self._merge_fn:
+                    data = self._merge_fn(waiting, data)
+            else:
+                due = time.monotonic() + self.delay
+            self._pending[chat_id] = (due, data)
+            self._cond.notify_all()
+
+    def pending(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the queued (not yet written) data for a chat, if any."""
+        with self._cond:
+            item = self._pending.get(chat_id)
+            return item[1] if item else None
+
+    def pending_items(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {chat_id: item[1] for chat_id, item in self._pending.items()}
+
+    def discard(self, chat_id: str) -> bool:
+        """Drops a queued save. Returns True if one was waiting."""
+        with self._cond:
+            return self._pending.pop(chat_id, None) is not None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes everything queued now and waits for it. Returns False on timeout.
+        Must not be called while holding the caller lock passed to the constructor.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            now = time.monotonic()
+            self._pending = {cid: (now, data) for cid, (_, data) in self._pending.items()}
+            self._cond.notify_all()
+            while (self._pending or self._busy) and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"ChatWriter: Flush timed out with {len(self._pending)} chats pending.")
+                    return False
+                self._cond.wait(min(remaining, 0.5) if remaining is not None else 0.5)
+
+        # Writer thread is gone (e.g. after stop): write leftovers inline
+        while True:
+            with self._lock:
+                with self._cond:
+                    item = self._take_due(force=True)
+                if not item:
+                    return True
+                self._write(*item)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flushes pending saves and stops the thread."""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        return flushed
+
+    def _take_due(self, force: bool = False) -> Optional[Tuple[str, Dict[str, Any]]]:
+        now = time.monotonic()
+        for chat_id, (due, data) in self._pending.items():
+            if force or due <= now:
+                del self._pending[chat_id]
+                return chat_id, data
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._pending:
+                        next_due = min(due for due, _ in self._pending.values())
+                        wait = next_due - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if not self._running and not self._pending:
+                    return
+
+            # Lock order: caller lock first, then the queue, so deletes see a consistent state
+            with self._lock:
+                with self._cond:
+                    item = self._take_due(force=not self._running)
+                    if item:
+                        self._busy = True
+                if item:
+                    self._write(*item)
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+
+    def _write(self, chat_id: str, data: Dict[str, Any]):
+        try:
+            self._write_fn(chat_id, data)
+        except Exception as e:
+            logger.error(f"ChatWriter: Failed to write chat {chat_id}: {e}")
@@ -0,0 +1,93 @@
+import os
+import json
+import logging
+from typing import Any, Union
+
+logger = logging.getLogger("ENGINE.Codec")
+
+# JSON codec used for chats, indexes and config files.
+# Picks the fastest installed backend (orjson > msgspec > stdlib json); override with
+# ERIKA_JSON_CODEC=orjson|msgspec|json. Output is compact UTF-8 unless pretty=True.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _select_backend() -> str:
+    requested = os.environ.get("ERIKA_JSON_CODEC", "").strip().lower()
+    available = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    if requested:
+        if available.get(requested):
+            return requested
+        logger.warning(f"Codec: Requested JSON backend '{requested}' is not installed, auto-selecting.")
+    for name in ("orjson", "msgspec", "json"):
+        if available[name]:
+            return name
+    return "json"
+
+
+BACKEND = _select_backend()
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+# Every backend's parse error is caught by `except JSONDecodeError`
+JSONDecodeError = tuple(
+    err for err in (
+        ValueError,
+        getattr(orjson, "JSONDecodeError", None),
+        getattr(msgspec, "DecodeError", None),
+    ) if err is not None
+)
+
+
+def dumps_bytes(obj: Any, pretty: bool = False, backend: str = None) -> bytes:
+    """Serializes to UTF-8 JSON bytes."""
+    backend = backend or BACKEND
+    if backend == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if backend == "msgspec":
+        raw = _msgspec_encoder.encode(obj)
+        return msgspec.json.format(raw, indent=2) if pretty else raw
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj: Any, pretty: bool = False, backend: str = None) -> str:
+    """Serializes to a JSON string."""
+    return dumps_bytes(obj, pretty, backend).decode('utf-8')
+
+
+def loads(data: Union[str, bytes], backend: str = None) -> Any:
+    """Parses JSON from str or bytes."""
+    backend = backend or BACKEND
+    if backend == "orjson":
+        return orjson.loads(data)
+    if backend == "msgspec":
+        return _msgspec_decoder.decode(data.encode('utf-8') if isinstance(data, str) else data)
+    return json.loads(data)
+
+
+def read_json(path: str) -> Any:
+    """Loads a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_json(path: str, obj: Any, pretty: bool = False):
+    """Writes a JSON file atomically (temp file + os.replace)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps_bytes(obj, pretty))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
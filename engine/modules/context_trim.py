@@ -0,0 +1,147 @@
+import logging
+from typing import List, Dict, Any, Callable, Sequence, Tuple
+from engine.modules.token_counter import TokenCounter, REPLY_PRIMING_TOKENS
+
+logger = logging.getLogger("ENGINE.ContextTrim")
+
+TRUNCATION_MARKER = "\n\n[System prompt truncated to fit context window]"
+# After the first (estimated) probe, try this many tokens further before bisecting
+SEARCH_WINDOW = 16
+
+
+def plan_trim(costs: Sequence[int], budget: int, protected: Sequence[bool]) -> List[int]:
+    """
+    Chooses which messages to drop so the rest fit in `budget` tokens.
+    `costs` are per-message token costs (the reply primer is already part of the budget).
+    Unprotected messages go oldest first; protected ones (pinned) only if that is not
+    enough. The final message is always kept. One pass each, O(n).
+    Returns the indices to drop, ascending.
+    """
+    excess = sum(costs) - budget
+    if excess <= 0 or len(costs) < 2:
+        return []
+
+    dropped = []
+    for want_protected in (False, True):
+        for i in range(len(costs) - 1):
+            if bool(protected[i]) != want_protected:
+                continue
+            dropped.append(i)
+            excess -= costs[i]
+            if excess <= 0:
+                return sorted(dropped)
+    return sorted(dropped)
+
+
+def trim_messages(messages: list, max_tokens: int, counter: TokenCounter) -> Tuple[list, int]:
+    """
+    Fits a prompt into max_tokens by dropping the oldest history.
+    The leading system prompt is never dropped (see _ensure_system_prompt_fits for that);
+    pinned messages only go once every unpinned one has.
+    Each message is counted once. Returns (messages, dropped count).
+    """
+    if not messages or max_tokens <= 0:
+        return messages, 0
+
+    has_system = messages[0].get("role") == "system"
+    history = messages[1:] if has_system else messages
+    budget = max_tokens - REPLY_PRIMING_TOKENS
+    if has_system:
+        budget -= counter.message_cost(messages[0])
+
+    costs = [counter.message_cost(msg) for msg in history]
+    drop = plan_trim(costs, budget, [msg.get("pinned", False) for msg in history])
+    if not drop:
+        return messages, 0
+
+    drop_set = set(drop)
+    kept = [msg for i, msg in enumerate(history) if i not in drop_set]
+    logger.debug(f"ContextTrim: Dropped {len(drop)} of {len(history)} messages to fit {max_tokens} tokens.")
+    return ([messages[0]] if has_system else []) + kept, len(drop)
+
+
+# System prompt sections: {"name", "text", "priority", "prefix", "suffix", "tokens"}.
+# prefix/suffix are the separators and headers around `text`; "tokens" (optional) is the
+# cached count of `text`. Lower priority is given up first.
+
+def render_sections(sections: List[Dict[str, Any]]) -> str:
+    """Joins sections into the system prompt, skipping dropped ones."""
+    return "".join(
+        f"{s.get('prefix', '')}{s['text']}{s.get('suffix', '')}"
+        for s in sections if not s.get("dropped")
+    )
+
+
+def _largest_fitting(fits: Callable[[int], bool], estimate: int, n: int) -> int:
+    """Largest k in [0, n) with fits(k), or -1. Probes the estimate first, then bisects."""
+    lo, hi = -1, n  # fits(lo) holds, fits(hi) does not (n itself is known not to fit)
+    k = min(max(estimate, 0), n - 1)
+    if fits(k):
+        lo = k
+        edge = min(hi - 1, k + SEARCH_WINDOW)
+    else:
+        hi = k
+        edge = max(lo + 1, k - SEARCH_WINDOW)
+    if lo < edge < hi:
+        if fits(edge):
+            lo = edge
+        else:
+            hi = edge
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def fit_sections(sections: List[Dict[str, Any]], budget: int,
+                 counter: TokenCounter) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Shrinks a sectioned system prompt to at most `budget` tokens (as counted by `counter`).
+    The lowest-priority section is cut first: dropped whole if that is not enough,
+    otherwise cut at the largest token boundary that fits. Every accepted result is
+    counted, so the budget is guaranteed. Returns (sections, truncated).
+    """
+    current = [dict(s) for s in sections]
+    truncated = False
+    while True:
+        total = counter.count(render_sections(current))
+        if total <= budget:
+            return current, truncated
+        candidates = [s for s in current if s["text"] and not s.get("dropped")]
+        if not candidates:
+            return current, truncated
+
+        truncated = True
+        section = min(candidates, key=lambda s: s.get("priority", 0))
+        over = total - budget
+        section_tokens = section.get("tokens")
+        if section_tokens is None:
+            section_tokens = counter.count_cached(section["text"])
+        offsets = counter.token_offsets(section["text"]) if section_tokens > over else []
+        if not offsets:
+            section["dropped"] = True
+            logger.info(f"ContextTrim: Dropped system prompt section '{section['name']}' ({section_tokens} tokens).")
+            continue
+
+        text = section["text"]
+
+        def fits(k: int) -> bool:
+            section["text"] = text[:offsets[k]] + TRUNCATION_MARKER
+            return counter.count(render_sections(current)) <= budget
+
+        marker_tokens = counter.count_cached(TRUNCATION_MARKER)
+        estimate = int(len(offsets) * (section_tokens - over - marker_tokens) / section_tokens)
+        keep = _largest_fitting(fits, estimate, len(offsets))
+        if keep < 0:
+            section["text"] = text
+            section["dropped"] = True
+            logger.info(f"ContextTrim: Dropped system prompt section '{section['name']}' ({section_tokens} tokens).")
+            continue
+
+        section["text"] = text[:offsets[keep]] + TRUNCATION_MARKER
+        section["tokens"] = None
+        logger.info(f"ContextTrim: Cut system prompt section '{section['name']}' to {keep} of {len(offsets)} tokens.")
+        return current, truncated
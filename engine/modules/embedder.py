@@ -0,0 +1,86 @@
+import re
+import hashlib
+import logging
+from typing import List, Optional
+import numpy as np
+from ollama import AsyncClient
+
+logger = logging.getLogger("ENGINE.Embedder")
+
+EMBED_BATCH_SIZE = 32
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalizes each row so a dot product is cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class OllamaEmbedder:
+    """
+    Embeds text via the Ollama /api/embed endpoint on the node BrainRouter
+    picks for embedding work (the subconscious node when it is online).
+    """
+    def __init__(self, router, model: Optional[str] = None):
+        self.router = router
+        self.model = model or router.EMBED_MODEL
+        self._clients = {}
+
+    @property
+    def name(self) -> str:
+        return f"ollama:{self.model}"
+
+    def _client(self, host: str) -> AsyncClient:
+        if host not in self._clients:
+            self._clients[host] = AsyncClient(host=host)
+        return self._clients[host]
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Returns one normalized float32 row per text."""
+        host = self.router.get_primary_host('embedding')
+        client = self._client(host)
+        rows = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            response = await client.embed(model=self.model, input=texts[start:start + EMBED_BATCH_SIZE])
+            rows.extend(response["embeddings"])
+        return normalize_rows(np.array(rows, dtype=np.float32))
+
+    async def aclose(self):
+        for client in self._clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Embedder: Error closing client: {e}")
+        self._clients.clear()
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder (feature hashing). Needs no model or
+    network, so tests and offline setups get stable, lexically sensible vectors.
+    """
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    @property
+    def name(self) -> str:
+        return f"hashing:{self.dim}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r'\w+', text.lower(), re.UNICODE):
+            h = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+            vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        return vec
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return normalize_rows(np.stack([self._vector(t) for t in texts]))
+
+    async def aclose(self):
+        pass
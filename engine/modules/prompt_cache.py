@@ -0,0 +1,70 @@
+import os
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+from engine.modules.token_counter import TokenCounter
+
+logger = logging.getLogger("ENGINE.PromptCache")
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PromptSegmentCache:
+    """
+    Keeps prompt segment files (system core, soul, growth, reflections) in memory.
+    A file is re-read only when its mtime or size changes, so steady-state prompt
+    assembly costs one stat per segment and no reads. Token counts are cached per
+    segment and computed on first use.
+    """
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or TokenCounter()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def segment(self, path: str) -> Optional[Dict[str, Any]]:
+        """Returns {"text", "tokens"} for a file (None if missing), reading it only if it changed."""
+        signature = file_signature(path)
+        with self._lock:
+            if signature is None:
+                self._entries.pop(path, None)
+                return None
+            entry = self._entries.get(path)
+            if entry is None or entry["signature"] != signature:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                except FileNotFoundError:
+                    self._entries.pop(path, None)
+                    return None
+                self.reads += 1
+                entry = {"signature": signature, "text": text, "tokens": None}
+                self._entries[path] = entry
+            if entry["tokens"] is None:
+                entry["tokens"] = self.token_counter.count(entry["text"])
+            return {"text": entry["text"], "tokens": entry["tokens"]}
+
+    def read(self, path: str, default: str = "") -> str:
+        """File contents (cached), or `default` if the file does not exist."""
+        entry = self.segment(path)
+        return entry["text"] if entry is not None else default
+
+    def tokens(self, path: str) -> int:
+        """Cached token count of a file (0 if missing)."""
+        entry = self.segment(path)
+        return entry["tokens"] if entry is not None else 0
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drops one cached file (or all), e.g. after writing it within the same mtime tick."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
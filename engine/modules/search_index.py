@@ -0,0 +1,309 @@
+import os
+import re
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("domain.memory.search")
+
+SEARCH_DB_FILENAME = ".search_index.db"
+SNIPPET_TOKENS = 16  # Words of context around each hit
+MAX_RESULTS = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,      -- chat id, or file path relative to its folder
+    kind TEXT NOT NULL,        -- 'chat' | 'reflection'
+    seq INTEGER NOT NULL,      -- message / paragraph position within the source
+    date TEXT,                 -- circadian folder date (DD-MM-YYYY) when known
+    role TEXT,
+    ref TEXT,                  -- message id for chats
+    digest TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS entries_source_seq ON entries(source, seq);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mtime REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(content, tokenize='unicode61 remove_diacritics 2');
+"""
+
+_DATE_IN_NAME = re.compile(r'(\d{2}-\d{2}-\d{4})')
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.blake2b("\x1f".join(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def build_match_query(query: str) -> str:
+    """Turns free text into an FTS5 query: every word must match (prefix match on the last one)."""
+    words = re.findall(r'\w+', query, re.UNICODE)
+    if not words:
+        return ""
+    terms = ['"' + w.replace('"', '""') + '"' for w in words]
+    terms[-1] += '*'
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """
+    Incrementally maintained full-text index (SQLite FTS5) over chat messages
+    and reflection files.
+
+    Each message / paragraph is one row keyed by (source, seq) with a content
+    digest, so re-indexing a chat after a new turn only touches the rows that
+    changed. Plain-file sources are re-read only when their mtime moves.
+    Row ids only ever grow (a changed row is stored under a new id), so readers
+    can pick up what was written since the last id they saw.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        (max_id,) = self._conn.execute("SELECT MAX(id) FROM entries").fetchone()
+        self._last_id = max(max_id or 0, int(self.get_meta("last_row_id") or 0))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def _sync_rows(self, source: str, kind: str, date: Optional[str], rows: List[Dict[str, Any]],
+                   start: int = 0) -> int:
+        """
+        Brings the rows of one source from position `start` on in line with `rows`
+        (caller holds the lock and a transaction).
+        """
+        existing = {seq: (row_id, digest) for row_id, seq, digest in self._conn.execute(
+            "SELECT id, seq, digest FROM entries WHERE source = ? AND seq >= ?", (source, start))}
+
+        changed = 0
+        for seq, row in enumerate(rows, start):
+            changed += self._write_row(source, kind, date, seq, row, existing.pop(seq, None))
+
+        # Rows past the new end (truncated chat / shorter file)
+        for row_id, _ in existing.values():
+            self._delete_row(row_id)
+            changed += 1
+        return changed
+
+    def _write_row(self, source: str, kind: str, date: Optional[str], seq: int, row: Dict[str, Any],
+                   current: Optional[tuple]) -> bool:
+        """Stores one row unless `current` (row_id, digest) already has its content. True if written."""
+        digest = _digest(date or "", row.get("role") or "", row["content"])
+        if current and current[1] == digest:
+            return False
+        if current:
+            self._delete_row(current[0])
+        # Never reuse the id of a deleted row (see class docstring)
+        self._last_id += 1
+        self._conn.execute(
+            "INSERT INTO entries(id, source, kind, seq, date, role, ref, digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self._last_id, source, kind, seq, date, row.get("role"), row.get("ref"), digest))
+        self._conn.execute("INSERT INTO entries_fts(rowid, content) VALUES (?, ?)", (self._last_id, row["content"]))
+        self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('last_row_id', ?)", (str(self._last_id),))
+        return True
+
+    def _delete_row(self, row_id: int):
+        self._conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (row_id,))
+        self._conn.execute("DELETE FROM entries WHERE id = ?", (row_id,))
+
+    @staticmethod
+    def _chat_row(msg: Dict[str, Any]) -> Dict[str, Any]:
+        return {"role": msg.get("role"), "ref": msg.get("id"), "content": msg.get("content") or ""}
+
+    def index_chat(self, chat_id: str, date: Optional[str], messages: List[Dict[str, Any]], start: int = 0) -> int:
+        """
+        Indexes the messages of a chat from position `start` on (earlier rows are kept).
+        Returns the number of rows touched.
+        """
+        rows = [self._chat_row(m) for m in messages]
+        try:
+            with self._lock, self._conn:
+                return self._sync_rows(chat_id, "chat", date, rows, start)
+        except sqlite3.Error as e:
+            logger.error(f"SearchIndex: Failed to index chat {chat_id}: {e}")
+            return 0
+
+    def update_chat(self, chat_id: str, date: Optional[str], changed: Dict[int, Dict[str, Any]], total: int) -> int:
+        """
+        Re-indexes only the messages of a chat that a save changed (position -> message)
+        and drops rows from position `total` on; every other row is left alone.
+        Returns the number of rows touched.
+        """
+        seqs = sorted(changed)
+        try:
+            with self._lock, self._conn:
+                existing = {}
+                for start in range(0, len(seqs), 500):
+                    chunk = seqs[start:start + 500]
+                    existing.update({seq: (row_id, digest) for row_id, seq, digest in self._conn.execute(
+                        f"SELECT id, seq, digest FROM entries WHERE source = ? AND seq IN ({','.join('?' * len(chunk))})",
+                        [chat_id, *chunk])})
+                touched = sum(self._write_row(chat_id, "chat", date, seq, self._chat_row(changed[seq]), existing.get(seq))
+                              for seq in seqs)
+                stale = self._conn.execute("SELECT id FROM entries WHERE source = ? AND seq >= ?",
+                                           (chat_id, total)).fetchall()
+                for (row_id,) in stale:
+                    self._delete_row(row_id)
+                return touched + len(stale)
+        except sqlite3.Error as e:
+            logger.error(f"SearchIndex: Failed to index chat {chat_id}: {e}")
+            return 0
+
+    def sources(self, kind: str) -> set:
+        """All indexed source keys of a kind."""
+        with self._lock:
+            return {source for (source,) in self._conn.execute(
+                "SELECT DISTINCT source FROM entries WHERE kind = ?", (kind,))}
+
+    def count(self) -> int:
+        """Number of indexed rows."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def changes(self, after_id: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows written after row id `after_id` (without content) and the row count, read together."""
+        with self._lock:
+            return self.entries(include_content=False, after_id=after_id), self.count()
+
+    def entries(self, ids: Optional[List[int]] = None, include_content: bool = True,
+                after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Indexed rows (all, the given row ids, or those written after row id `after_id`);
+        `key` changes whenever the content does.
+        """
+        columns = "e.id, e.source, e.seq, e.digest, e.kind, e.date, e.role, e.ref"
+        if include_content:
+            sql = f"SELECT {columns}, f.content FROM entries e JOIN entries_fts f ON f.rowid = e.id"
+        else:
+            sql = f"SELECT {columns}, NULL FROM entries e"
+        with self._lock:
+            if ids is None:
+                rows = self._conn.execute(f"{sql} WHERE e.id > ?", (after_id,)).fetchall()
+            else:
+                rows = []
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    rows.extend(self._conn.execute(
+                        f"{sql} WHERE e.id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        return [
+            {"id": row_id, "key": f"{source}:{seq}:{digest}", "source": source, "kind": kind,
+             "date": date, "role": role, "ref": ref, "content": content}
+            for row_id, source, seq, digest, kind, date, role, ref, content in rows
+        ]
+
+    def remove_source(self, source: str):
+        try:
+            with self._lock, self._conn:
+                ids = [(row_id,) for (row_id,) in self._conn.execute(
+                    "SELECT id FROM entries WHERE source = ?", (source,))]
+                self._conn.executemany("DELETE FROM entries_fts WHERE rowid = ?", ids)
+                self._conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+                self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+        except sqlite3.Error as e:
+            logger.error(f"SearchIndex: Failed to remove {source}: {e}")
+
+    def sync_folder(self, kind: str, folder: str, extensions=('.md', '.txt')) -> int:
+        """
+        Indexes text files of a folder by paragraph, re-reading only files whose
+        mtime changed. Returns the number of files (re)indexed.
+        """
+        if not os.path.isdir(folder):
+            return 0
+
+        seen = {}
+        for name in os.listdir(folder):
+            if name.endswith(extensions):
+                path = os.path.join(folder, name)
+                try:
+                    seen[f"{kind}:{name}"] = (path, os.path.getmtime(path))
+                except OSError:
+                    continue
+
+        with self._lock:
+            known = {source: mtime for source, mtime in self._conn.execute(
+                "SELECT source, mtime FROM sources WHERE kind = ?", (kind,))}
+
+        updated = 0
+        for source, (path, mtime) in seen.items():
+            if known.get(source) == mtime:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    text = f.read()
+            except OSError as e:
+                logger.warning(f"SearchIndex: Cannot read {path}: {e}")
+                continue
+
+            paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+            match = _DATE_IN_NAME.search(os.path.basename(path))
+            rows = [{"content": p, "ref": os.path.basename(path)} for p in paragraphs]
+            try:
+                with self._lock, self._conn:
+                    self._sync_rows(source, kind, match.group(1) if match else None, rows)
+                    self._conn.execute("INSERT OR REPLACE INTO sources(source, kind, mtime) VALUES (?, ?, ?)",
+                                       (source, kind, mtime))
+                updated += 1
+            except sqlite3.Error as e:
+                logger.error(f"SearchIndex: Failed to index {path}: {e}")
+
+        for source in set(known) - set(seen):
+            self.remove_source(source)
+        return updated
+
+    def search(self, query: str, limit: int = MAX_RESULTS, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns ranked hits (best first) with a highlighted snippet."""
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT e.kind, e.source, e.date, e.role, e.ref, e.seq, "
+            f"snippet(entries_fts, 0, '[', ']', '…', {SNIPPET_TOKENS}), bm25(entries_fts) AS score "
+            "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+            "WHERE entries_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if kind:
+            sql += " AND e.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"SearchIndex: Query failed for '{query[:50]}': {e}")
+            return []
+
+        hits = []
+        for kind_, source, date, role, ref, seq, snippet, score in rows:
+            hit = {"kind": kind_, "date": date, "snippet": snippet, "score": -score}
+            if kind_ == "chat":
+                hit.update({"chat_id": source, "role": role, "message_id": ref, "index": seq})
+            else:
+                hit.update({"source": ref, "paragraph": seq})
+            hits.append(hit)
+        return hits
@@ -0,0 +1,74 @@
+import logging
+from typing import List
+
+logger = logging.getLogger("ENGINE.SentenceSplitter")
+
+MIN_UTTERANCE_CHARS = 24  # Shorter sentences are joined with the next one
+SENTENCE_END = ".!?…"
+CLOSERS = "\"')]*_"  # May trail the end punctuation ("Really?!*" / "(yes.)")
+OPENING = {"(": ")", "[": "]"}
+
+
+class SentenceSplitter:
+    """
+    Cuts streamed text into sentences as soon as they are complete.
+
+    A sentence ends at end punctuation followed by whitespace, or at a line break.
+    Nothing is cut inside (parentheses) or [brackets], since those are removed as a
+    whole for speech and may span sentences. Each piece of text is scanned once.
+    """
+    def __init__(self, min_chars: int = MIN_UTTERANCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._pos = 0  # Scan position in _buffer
+        self._closers: List[str] = []  # Expected closing brackets, innermost last
+
+    def feed(self, text: str, at_space: bool = False) -> List[str]:
+        """
+        Adds streamed text; returns the sentences it completed.
+        `at_space` tells that whitespace is known to follow, so a sentence ending right
+        at the end of the text is complete too.
+        """
+        self._buffer += text
+        sentences = []
+        buf = self._buffer
+        i = self._pos
+        n = len(buf)
+        start = 0
+        while i < n:
+            ch = buf[i]
+            if ch in OPENING:
+                self._closers.append(OPENING[ch])
+            elif self._closers and ch == self._closers[-1]:
+                self._closers.pop()
+
+            end = -1
+            if not self._closers:
+                if ch == "\n":
+                    end = i + 1
+                elif ch in SENTENCE_END:
+                    j = i + 1
+                    while j < n and (buf[j] in SENTENCE_END or buf[j] in CLOSERS):
+                        j += 1
+                    if j == n and not at_space:
+                        break  # Cannot tell yet whether the sentence ends here
+                    if j == n or buf[j].isspace():
+                        end = min(j + 1, n)
+                    i = j - 1
+            if end > 0 and len(buf[start:end].strip()) >= self.min_chars:
+                sentences.append(buf[start:end].strip())
+                start = end
+                i = end - 1
+            i += 1
+
+        self._buffer = buf[start:]
+        self._pos = i - start
+        return sentences
+
+    def flush(self) -> str:
+        """Returns whatever is left once the stream has ended."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        self._pos = 0
+        self._closers = []
+        return rest
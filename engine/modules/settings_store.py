@@ -0,0 +1,115 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("ENGINE.SettingsStore")
+
+SETTINGS_FLUSH_DELAY = 0.5  # Seconds of quiet after the last change before a write
+SETTINGS_MAX_DELAY = 2.0  # A change is on disk at most this long after it was made, even mid-drag
+
+
+class SettingsStore:
+    """
+    Debounced persistence for settings documents (user.json, llm_config.json).
+
+    The in-memory dicts stay the source of truth; a setter only marks its document
+    dirty. The snapshot is taken right away (on the caller's thread, so the writer
+    never reads a dict that is being changed), and a background thread writes the
+    latest snapshot once changes stop for `delay` seconds, or after `max_delay` at
+    the latest. A slider drag firing dozens of change events costs one write.
+    """
+    def __init__(self, delay: float = SETTINGS_FLUSH_DELAY, max_delay: float = SETTINGS_MAX_DELAY):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._documents: Dict[str, Dict[str, Callable]] = {}  # name -> {"snapshot", "write"}
+        self._pending: Dict[str, Dict[str, Any]] = {}  # name -> {"data", "due", "deadline"}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._running = True
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0
+
+    def register(self, name: str, snapshot: Callable[[], Any], write: Callable[[Any], None]):
+        """Adds a document: `snapshot()` copies its current state, `write(data)` stores a copy atomically."""
+        self._documents[name] = {"snapshot": snapshot, "write": write}
+
+    def mark_dirty(self, name: str):
+        """Records a change; the document is written once changes settle."""
+        data = self._documents[name]["snapshot"]()
+        now = time.monotonic()
+        with self._cond:
+            if not self._running:
+                # Store already closed (late setter during shutdown): write inline
+                self._write(name, data)
+                return
+            item = self._pending.get(name)
+            deadline = item["deadline"] if item else now + self.max_delay
+            self._pending[name] = {"data": data, "due": min(now + self.delay, deadline), "deadline": deadline}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SettingsStore", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def is_dirty(self, name: str) -> bool:
+        with self._cond:
+            return name in self._pending
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Writes every dirty document now and waits for it. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            now = time.monotonic()
+            for item in self._pending.values():
+                item["due"] = now
+            self._cond.notify_all()
+            while (self._pending or self._busy) and self._thread is not None and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"SettingsStore: Flush timed out with {len(self._pending)} documents pending.")
+                    return False
+                self._cond.wait(min(remaining, 0.5) if remaining is not None else 0.5)
+            # No writer thread (never started or gone): write leftovers inline
+            leftovers, self._pending = self._pending, {}
+        for name, item in leftovers.items():
+            self._write(name, item["data"])
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flushes pending changes and stops the writer thread (shutdown)."""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return flushed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    now = time.monotonic()
+                    due = [name for name, item in self._pending.items() if item["due"] <= now]
+                    if due:
+                        break
+                    wait = min((item["due"] for item in self._pending.values()), default=now + 1.0) - now
+                    self._cond.wait(max(wait, 0.01))
+                if not self._running:
+                    return
+                batch = {name: self._pending.pop(name)["data"] for name in due}
+                self._busy = True
+            try:
+                for name, data in batch.items():
+                    self._write(name, data)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self, name: str, data: Any):
+        try:
+            self._documents[name]["write"](data)
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"SettingsStore: Failed to write {name}: {e}")
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("ENGINE.StreamCoalescer")
+
+STREAM_FPS = 25  # UI updates per second while a reply is streaming
+
+
+class StreamCoalescer:
+    """
+    Frame-rate limiter for streamed replies.
+
+    Text appended to a message is buffered and handed to `send(msg_id, text)` at most
+    `fps` times per second, so the browser gets one small update per frame carrying
+    only the text added since the previous one, however fast the model produces tokens.
+    The first piece of a burst goes out immediately.
+    """
+    def __init__(self, send: Callable[[str, str], object], fps: float = STREAM_FPS):
+        self._send = send
+        self.interval = 1.0 / fps
+        self._pending: Dict[str, List[str]] = {}  # msg_id -> appended pieces not yet sent
+        self._last_flush = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def push(self, msg_id: str, text: str):
+        """Queues text appended to a message."""
+        if not text:
+            return
+        self._pending.setdefault(msg_id, []).append(text)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, msg_id: Optional[str] = None):
+        """Drops queued text (of one message, or all), e.g. after a full re-render already shows it."""
+        if msg_id is None:
+            self._pending.clear()
+        else:
+            self._pending.pop(msg_id, None)
+
+    async def _run(self):
+        while self._pending:
+            delay = self._last_flush + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.flush()
+
+    async def flush(self):
+        """Sends everything queued now."""
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        for msg_id, pieces in pending.items():
+            try:
+                result = self._send(msg_id, "".join(pieces))
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"StreamCoalescer: Failed to send update for {msg_id}: {e}")
+
+    def close(self):
+        self._pending.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,82 @@
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("ENGINE.TokenBudget")
+
+# Share of num_ctx per prompt section (overridable per node via "context_budget" in llm_config.json).
+# "recent" (the latest turns) is elastic: it also gets whatever the other sections leave unused.
+DEFAULT_SHARES = {
+    "core": 0.15,
+    "soul": 0.10,
+    "growth": 0.08,
+    "reflection": 0.06,
+    "recall": 0.05,
+    "summary": 0.06,
+    "recent": 0.4375,
+    "headroom": 0.0625,  # Completion space (512 of 8192)
+}
+
+# name -> dashboard label, in prompt order
+BUDGET_SECTIONS = {
+    "core": "System core",
+    "soul": "Soul",
+    "growth": "Growth",
+    "reflection": "Reflection",
+    "recall": "Recalled memories",
+    "summary": "Summary",
+    "recent": "Recent turns",
+    "headroom": "Completion headroom",
+}
+ELASTIC = ("recent", "headroom")  # Not capped by their share
+
+
+def merge_shares(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Defaults with overrides applied; scaled down if they add up to more than num_ctx."""
+    shares = dict(DEFAULT_SHARES)
+    for name, share in (overrides or {}).items():
+        if name in shares:
+            shares[name] = max(0.0, float(share))
+        else:
+            logger.warning(f"TokenBudget: Unknown budget section '{name}' ignored.")
+    total = sum(shares.values())
+    if total > 1.0:
+        logger.warning(f"TokenBudget: Shares add up to {total:.2f}; scaling them to 1.")
+        shares = {name: share / total for name, share in shares.items()}
+    return shares
+
+
+def headroom_tokens(num_ctx: int, shares: Optional[Dict[str, float]] = None) -> int:
+    """Tokens kept free for the completion."""
+    shares = shares or DEFAULT_SHARES
+    return int(num_ctx * shares.get("headroom", 0.0))
+
+
+def plan_budget(num_ctx: int, wanted: Dict[str, int], shares: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Splits num_ctx between the prompt sections.
+    Each capped section gets min(wanted, its share of num_ctx); the completion headroom is
+    reserved up front and recent turns get everything else. `wanted` holds each section's
+    (cached) token count. Returns {"num_ctx", "target", "sections": {name: {"label", "share",
+    "budget", "wanted", "granted"}}}; "target" is the prompt size limit.
+    """
+    shares = shares or DEFAULT_SHARES
+    headroom = headroom_tokens(num_ctx, shares)
+    sections: Dict[str, Dict[str, Any]] = {}
+    granted_total = 0
+    for name, label in BUDGET_SECTIONS.items():
+        if name in ELASTIC:
+            continue
+        budget = int(num_ctx * shares.get(name, 0.0))
+        want = max(0, int(wanted.get(name, 0)))
+        granted = min(want, budget)
+        granted_total += granted
+        sections[name] = {"label": label, "share": shares.get(name, 0.0), "budget": budget,
+                          "wanted": want, "granted": granted}
+
+    target = num_ctx - headroom
+    recent = max(0, target - granted_total)
+    sections["recent"] = {"label": BUDGET_SECTIONS["recent"], "share": shares.get("recent", 0.0),
+                          "budget": recent, "wanted": max(0, int(wanted.get("recent", 0))), "granted": recent}
+    sections["headroom"] = {"label": BUDGET_SECTIONS["headroom"], "share": shares.get("headroom", 0.0),
+                            "budget": headroom, "wanted": headroom, "granted": headroom}
+    return {"num_ctx": num_ctx, "target": target, "sections": sections}
@@ -1,10 +1,36 @@
+import re
 import tiktoken
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger("ENGINE.TokenCounter")
 
+CONTENT_CACHE_SIZE = 50000  # Message contents whose token counts are kept in memory
+# Persisted on each chat message: {"n": <tokens>, "key": "<tokenizer id>:<content hash>"}
+TOKENS_FIELD = "tokens"
+# Overhead per message and for the reply primer (approximate for most Chat models)
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+
+
+def stored_tokens(messages: list) -> int:
+    """Sum of the content token counts stored on messages (see TokenCounter.count_message)."""
+    total = 0
+    for msg in messages:
+        stored = msg.get(TOKENS_FIELD)
+        if isinstance(stored, dict) and isinstance(stored.get("n"), int):
+            total += stored["n"]
+    return total
+
+
 class TokenCounter:
     _encoding_cache = None
+    # Shared by all instances: hash(content) -> (cache key, token count) (LRU)
+    _content_counts: "OrderedDict[int, Tuple[str, int]]" = OrderedDict()
+    _content_lock = threading.Lock()
 
     def __init__(self, model_name="cl100k_base"):
         if TokenCounter._encoding_cache is None:
@@ -17,6 +43,8 @@ class TokenCounter:
                 TokenCounter._encoding_cache = None
         
         self.encoding = TokenCounter._encoding_cache
+        # Stored counts are only trusted if they came from the same tokenizer
+        self.tokenizer_id = self.encoding.name if self.encoding else "approx-words"
 
     def count(self, text: str) -> int:
         """Returns the number of tokens in a text string."""
@@ -33,23 +61,87 @@ class TokenCounter:
             # Fallback approximation: 1.3 tokens per word
             return int(len(text.split()) * 1.3) + 1
 
+    def token_offsets(self, text: str) -> List[int]:
+        """Character offset where each token starts (word starts in the approximation mode)."""
+        if not text:
+            return []
+        if self.encoding:
+            try:
+                _, offsets = self.encoding.decode_with_offsets(self.encoding.encode(text))
+                return offsets
+            except Exception as e:
+                logger.error(f"Error computing token offsets: {e}")
+        return [m.start() for m in re.finditer(r'\S+', text)]
+
+    def content_key(self, text: str) -> str:
+        """Stable cache key for a text under this tokenizer (survives restarts, unlike hash())."""
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+        return f"{self.tokenizer_id}:{digest}"
+
+    def _cached_entry(self, text: str) -> Optional[Tuple[str, int]]:
+        """Returns (content key, token count) from the in-memory cache, or None."""
+        cache = TokenCounter._content_counts
+        text_hash = hash(text)
+        with TokenCounter._content_lock:
+            entry = cache.get(text_hash)
+            if entry is not None:
+                cache.move_to_end(text_hash)
+            return entry
+
+    def _remember(self, text: str, key: str, tokens: int):
+        cache = TokenCounter._content_counts
+        with TokenCounter._content_lock:
+            cache[hash(text)] = (key, tokens)
+            if len(cache) > CONTENT_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def count_cached(self, text: str) -> int:
+        """count() with an in-memory cache, for text that is counted again and again (chat messages)."""
+        if not text:
+            return 0
+        entry = self._cached_entry(text)
+        if entry is not None:
+            return entry[1]
+        tokens = self.count(text)
+        self._remember(text, self.content_key(text), tokens)
+        return tokens
+
+    def count_message(self, msg: dict) -> int:
+        """
+        Content tokens of one message. Chat messages (those with an "id") carry their count
+        in TOKENS_FIELD so it is persisted with them; it is reused while the key still matches
+        the content and tokenizer, and recomputed otherwise.
+        """
+        content = msg.get("content")
+        if not content:
+            return 0
+        text = content if isinstance(content, str) else str(content)
+        stored = msg.get(TOKENS_FIELD)
+        entry = self._cached_entry(text)
+        if entry is None:
+            key = self.content_key(text)
+            if isinstance(stored, dict) and stored.get("key") == key and isinstance(stored.get("n"), int):
+                entry = (key, stored["n"])
+            else:
+                entry = (key, self.count(text))
+            self._remember(text, *entry)
+
+        if "id" in msg and (not isinstance(stored, dict) or stored.get("key") != entry[0]):
+            msg[TOKENS_FIELD] = {"n": entry[1], "key": entry[0]}
+        return entry[1]
+
+    def message_cost(self, msg: dict) -> int:
+        """Tokens one message adds to a prompt, including its formatting overhead."""
+        # <|im_start|>{role}\n{content}<|im_end|>\n
+        tokens = TOKENS_PER_MESSAGE + self.count_message(msg)
+        if "role" in msg:
+            tokens += 1 # Role takes usually 1 token
+        return tokens
+
     def count_messages(self, messages: list) -> int:
         """
         Counts tokens for a list of messages.
         Includes overhead for message formatting (ChatML/OpenAI style).
         """
-        tokens = 0
-        # Overhead per message (approximate for most Chat models)
-        # <|im_start|>{role}\n{content}<|im_end|>\n
-        tokens_per_message = 3 
-        
-        for msg in messages:
-            tokens += tokens_per_message
-            for key, value in msg.items():
-                if key == "content":
-                    tokens += self.count(str(value))
-                elif key == "role":
-                    tokens += 1 # Role takes usually 1 token
-                    
-        tokens += 3  # Every reply is primed with <|im_start|>assistant<|im_sep|>
-        return tokens
+        # Every reply is primed with <|im_start|>assistant<|im_sep|>
+        return sum(self.message_cost(msg) for msg in messages) + REPLY_PRIMING_TOKENS
@@ -0,0 +1,172 @@
+import re
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger("ENGINE.TtsSanitizer")
+
+LEAD = ". "  # Leading pause so the TTS engine does not clip the first word
+ELLIPSIS = ", ... "  # Spoken pause for "...", "…" and "--"
+KEPT_PUNCTUATION = frozenset(",.'?!:;\"-")
+QUOTES = {"“": '"', "”": '"', "‘": "'", "’": "'"}
+DASHES = frozenset("—–")
+
+# One token per word run (letters/digits with single spaces and plain punctuation),
+# whitespace run, or other single character. Only the last kind needs any logic.
+_PLAIN = r"""(?:[^\W_]|[,?!:;'"])"""
+PLAIN_RUN = re.compile(rf"{_PLAIN}+(?: {_PLAIN}+)*")
+TOKEN = re.compile(rf"(?P<plain>{PLAIN_RUN.pattern})|(?P<space>\s+)|.", re.DOTALL)
+WORD_CHAR = re.compile(r"[^\W_]")
+
+
+class TtsSanitizer:
+    """
+    Turns chat markdown into text for speech in a single pass; text can be fed as it streams.
+
+    Same result as the original multi-pass cleanup on a complete text: curly quotes
+    straightened, "--", "..." and "…" turned into a spoken pause, dashes spaced,
+    (parentheticals) and then [actions] removed, * and _ dropped, anything but
+    letters, digits and basic punctuation removed, whitespace collapsed, and a
+    leading pause added.
+
+    State carried between chunks: a pending "-" or run of dots, and an open "(" or
+    "[" whose text is held back until it closes (it is dropped) or the stream ends
+    without a closing bracket (it is kept).
+    """
+    def __init__(self, lead: str = LEAD):
+        self.lead = lead
+        self._out: List[str] = []
+        self._dots = 0  # Run of "." not yet written
+        self._hyphen = False  # A "-" that may still become "--"
+        self._paren: Optional[List[str]] = None  # Tokens after an open "("
+        self._bracket: Optional[List[str]] = None  # Tokens after an open "["
+        self._space = False  # Whitespace pending before the next kept character
+        self._started = False
+
+    @classmethod
+    def sanitize(cls, text: str, lead: str = LEAD) -> str:
+        """Cleans a complete text."""
+        if not text:
+            return ""
+        sanitizer = cls(lead)
+        return sanitizer.feed(text) + sanitizer.finish()
+
+    def feed(self, text: str) -> str:
+        """Adds streamed text; returns the cleaned text that is final so far."""
+        for match in TOKEN.finditer(text):
+            kind = match.lastgroup
+            if kind and not (self._dots or self._hyphen or self._paren is not None or self._bracket is not None):
+                # Nothing pending: words and whitespace go straight to the output
+                if kind == "plain":
+                    self._write(match.group())
+                else:
+                    self._space = True
+            else:
+                self._normalize(match.group())
+        return self._take()
+
+    def finish(self) -> str:
+        """Ends the stream; returns the rest of the cleaned text."""
+        self._resolve()
+        if self._paren is not None:
+            held, self._paren = self._paren, None
+            for token in held:  # No ")" followed the "(", so it was not a parenthetical
+                self._bracket_stage(token)
+        if self._bracket is not None:
+            held, self._bracket = self._bracket, None
+            for token in held:
+                self._filter_stage(token)
+        return self._take()
+
+    @property
+    def at_space(self) -> bool:
+        """True if whitespace follows the text returned so far (it is written once more text is kept)."""
+        return self._started and self._space
+
+    def _take(self) -> str:
+        out = "".join(self._out)
+        self._out.clear()
+        return out
+
+    # Stage 1: quotes, dashes and pauses
+    def _normalize(self, token: str):
+        if len(token) > 1:
+            self._resolve()
+            self._paren_stage(token)
+        elif token == ".":
+            if self._hyphen:
+                self._flush_dots()
+                self._hyphen = False
+                self._paren_stage("-")
+            self._dots += 1
+        elif token == "-":
+            if self._hyphen:
+                # "--" is a pause; its dots join any dots right before it
+                self._hyphen = False
+                self._dots += 3
+                self._flush_dots()
+                self._paren_stage(" ")
+            else:
+                self._hyphen = True
+        else:
+            self._resolve()
+            if token == "…":
+                self._paren_stage(ELLIPSIS)
+            elif token in DASHES:
+                self._paren_stage(" - ")
+            else:
+                self._paren_stage(QUOTES.get(token, token))
+
+    def _resolve(self):
+        """Writes a pending run of dots and a lone "-" once the next character shows what they are."""
+        self._flush_dots()
+        if self._hyphen:
+            self._hyphen = False
+            self._paren_stage("-")
+
+    def _flush_dots(self):
+        if self._dots:
+            self._paren_stage(ELLIPSIS if self._dots >= 3 else "." * self._dots)
+            self._dots = 0
+
+    # Stage 2: (parentheticals), then [actions]
+    def _paren_stage(self, token: str):
+        if self._paren is not None:
+            if token == ")":
+                self._paren = None
+            else:
+                self._paren.append(token)
+        elif token == "(":
+            self._paren = [token]
+        else:
+            self._bracket_stage(token)
+
+    def _bracket_stage(self, token: str):
+        if self._bracket is not None:
+            if token == "]":
+                self._bracket = None
+            else:
+                self._bracket.append(token)
+        elif token == "[":
+            self._bracket = [token]
+        else:
+            self._filter_stage(token)
+
+    # Stage 3: allowed characters and whitespace
+    def _filter_stage(self, token: str):
+        if PLAIN_RUN.fullmatch(token):
+            self._write(token)
+            return
+        for ch in token:
+            if ch.isspace():
+                self._space = True
+            elif ch in KEPT_PUNCTUATION or WORD_CHAR.match(ch):
+                self._write(ch)
+
+    def _write(self, text: str):
+        if not self._started:
+            self._out.append(self.lead)
+            self._started = True
+        elif self._space:
+            self._out.append(" ")
+        self._space = False
+        self._out.append(text)
@@ -0,0 +1,65 @@
+import math
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger("ENGINE.TurnMetrics")
+
+METRICS_WINDOW = 200  # Turns kept per metric for the rolling percentiles
+PERCENTILES = (50, 95)
+
+# Per-turn measurements: name -> (label, unit)
+TURN_METRICS = {
+    "context_ms": ("Context build", "ms"),
+    "tokenize_ms": ("Tokenization", "ms"),
+    "prefill_ms": ("Prefill", "ms"),
+    "ttft_ms": ("Time to first token", "ms"),
+    "tokens_per_s": ("Generation", "tok/s"),
+    "persist_ms": ("Persist", "ms"),
+    "tts_first_ms": ("TTS first utterance", "ms"),
+    "total_ms": ("Turn total", "ms"),
+}
+
+
+def percentile(sorted_values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class TurnMetrics:
+    """
+    Rolling per-turn latency and throughput figures, kept in memory.
+    Each metric keeps its last `window` values; a turn may leave metrics out
+    (e.g. no TTS when auto-read is off).
+    """
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self._values: Dict[str, Deque[float]] = {name: deque(maxlen=window) for name in TURN_METRICS}
+        self.last: Dict[str, float] = {}
+        self.turns = 0
+
+    def record(self, turn: Dict[str, Optional[float]]):
+        """Adds one turn's measurements (None values are skipped)."""
+        self.last = {name: value for name, value in turn.items() if value is not None}
+        for name, value in self.last.items():
+            self._values.setdefault(name, deque(maxlen=self.window)).append(float(value))
+        self.turns += 1
+        logger.debug("TurnMetrics: " + ", ".join(f"{k}={v:.1f}" for k, v in self.last.items()))
+
+    def percentiles(self, name: str, pcts: Iterable[float] = PERCENTILES) -> Dict[str, Optional[float]]:
+        values = sorted(self._values.get(name, ()))
+        return {f"p{int(p)}": percentile(values, p) for p in pcts}
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        """Per metric: label, unit, sample count, last value and percentiles (for the dashboard)."""
+        summary = {}
+        for name, (label, unit) in TURN_METRICS.items():
+            values = self._values.get(name)
+            if not values:
+                continue
+            summary[name] = {"label": label, "unit": unit, "n": len(values),
+                             "last": self.last.get(name), **self.percentiles(name)}
+        return summary
@@ -0,0 +1,125 @@
+import os
+import logging
+from typing import List, Dict, Any, Optional, Iterable, Set
+import numpy as np
+from engine.modules import codec
+
+logger = logging.getLogger("domain.memory.vectors")
+
+VECTORS_FILENAME = ".recall_vectors.npy"
+ITEMS_FILENAME = ".recall_items.json"
+
+
+class VectorIndex:
+    """
+    Compact in-memory embedding store: one float32 matrix (rows L2-normalized)
+    plus a parallel list of item metadata, persisted as .npy + .json.
+    Search is a single matrix-vector product followed by argpartition.
+    """
+    def __init__(self, folder: str, model_name: str):
+        self.folder = folder
+        self.model_name = model_name
+        self.vectors: Optional[np.ndarray] = None
+        self.items: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.folder, VECTORS_FILENAME)
+
+    @property
+    def _items_path(self) -> str:
+        return os.path.join(self.folder, ITEMS_FILENAME)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def keys(self) -> Set[str]:
+        return set(self._positions)
+
+    def load(self) -> bool:
+        """Loads the persisted index; False (and empty) if missing, corrupt or built by another model."""
+        try:
+            meta = codec.read_json(self._items_path)
+            if meta.get("model") != self.model_name:
+                logger.info(f"VectorIndex: Embedding model changed ({meta.get('model')} -> {self.model_name}), rebuilding.")
+                return False
+            vectors = np.load(self._vectors_path)
+            items = meta.get("items", [])
+            if len(items) != len(vectors):
+                raise ValueError("item / vector count mismatch")
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"VectorIndex: Discarding unreadable index: {e}")
+            return False
+
+        self.vectors = vectors.astype(np.float32, copy=False)
+        self.items = items
+        self._positions = {item["key"]: i for i, item in enumerate(items)}
+        return True
+
+    def save(self):
+        """Persists via temp files + os.replace."""
+        os.makedirs(self.folder, exist_ok=True)
+        vectors = self.vectors if self.vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        tmp_vectors = self._vectors_path + ".tmp.npy"
+        tmp_items = self._items_path + ".tmp"
+        try:
+            np.save(tmp_vectors, vectors)
+            with open(tmp_items, 'wb') as f:
+                f.write(codec.dumps_bytes({"model": self.model_name, "items": self.items}))
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_items, self._items_path)
+        except Exception as e:
+            logger.error(f"VectorIndex: Failed to save: {e}")
+
+    def add(self, items: List[Dict[str, Any]], vectors: np.ndarray):
+        """Appends items (each with a unique "key") and their normalized vectors."""
+        if not items:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.vectors is None or not len(self.vectors):
+            self.vectors = vectors
+        elif vectors.shape[1] != self.vectors.shape[1]:
+            raise ValueError(f"Embedding dimension changed ({self.vectors.shape[1]} -> {vectors.shape[1]})")
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+        for item in items:
+            self._positions[item["key"]] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, keys: Iterable[str]):
+        """Drops items by key (one compaction of the matrix)."""
+        drop = {self._positions[k] for k in keys if k in self._positions}
+        if not drop:
+            return
+        keep = np.array([i for i in range(len(self.items)) if i not in drop], dtype=np.int64)
+        self.vectors = self.vectors[keep] if len(keep) else None
+        self.items = [self.items[i] for i in keep]
+        self._positions = {item["key"]: i for i, item in enumerate(self.items)}
+
+    def top_k(self, query: np.ndarray, k: int, exclude: Optional[Set[str]] = None,
+              min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Returns up to k items (best first) as copies with a "score" field."""
+        if self.vectors is None or not len(self.items) or k <= 0:
+            return []
+        scores = self.vectors @ np.asarray(query, dtype=np.float32).reshape(-1)
+
+        # Over-fetch so exclusions rarely leave the page short
+        fetch = min(len(scores), k + (len(exclude) if exclude else 0))
+        candidates = np.argpartition(-scores, fetch - 1)[:fetch]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        hits = []
+        for i in candidates:
+            score = float(scores[i])
+            if score < min_score:
+                break
+            item = self.items[i]
+            if exclude and (item.get("ref") in exclude or item["key"] in exclude):
+                continue
+            hits.append({**item, "score": score})
+            if len(hits) >= k:
+                break
+        return hits
@@ -1,8 +1,8 @@
 import httpx
 import logging
-import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from engine.modules import codec
 
 logger = logging.getLogger("ENGINE.BrainRouter")
 
@@ -11,6 +11,8 @@ DEFAULT_LOCAL_BRAIN = "http://localhost:11434"
 DEFAULT_REMOTE_BRAIN = "http://192.168.0.69:11434"
 DEFAULT_LOCAL_MODEL = "qwen3:14b"
 DEFAULT_REMOTE_MODEL = "gemma2:9b"
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+DEFAULT_KEEP_ALIVE = "30m"  # How long Ollama keeps a model (and its prompt cache) loaded after a request
 
 
 class BrainRouter:
@@ -21,6 +23,7 @@ class BrainRouter:
 
         self.LOCAL_MODEL = os.environ.get("ERIKA_LOCAL_MODEL", DEFAULT_LOCAL_MODEL)
         self.REMOTE_MODEL = os.environ.get("ERIKA_REMOTE_MODEL", DEFAULT_REMOTE_MODEL)
+        self.EMBED_MODEL = os.environ.get("ERIKA_EMBED_MODEL", DEFAULT_EMBED_MODEL)
 
         self.nodes = {
             'local': self.LOCAL_BRAIN,
@@ -41,12 +44,11 @@ class BrainRouter:
         for path in possible_paths:
             if os.path.exists(path):
                 try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        self.llm_config = json.load(f)
+                    self.llm_config = codec.read_json(path)
                     self.config_path = path
                     logger.info(f"BrainRouter: Loaded LLM Config from {path}")
                     break
-                except (json.JSONDecodeError, IOError) as e:
+                except codec.JSONDecodeError + (IOError,) as e:
                     logger.error(f"BrainRouter: Failed to load config from {path}: {e}")
 
         # State
@@ -64,6 +66,19 @@ class BrainRouter:
         else:
              return self.llm_config.get("consciousness_5070ti", {}).get("options", {})
         
+    def get_keep_alive(self, node_type: str, default: Optional[str] = None):
+        """
+        Returns the keep_alive for a node ("keep_alive" in its llm_config group), else `default`.
+        None leaves Ollama's own setting in place.
+        """
+        group = "subconscious_3060" if node_type == 'remote' else "consciousness_5070ti"
+        return self.llm_config.get(group, {}).get("keep_alive", default)
+
+    def get_context_budget(self, node_type: str) -> Dict[str, float]:
+        """Per-section prompt shares of num_ctx ("context_budget" in the node's llm_config group; empty = defaults)."""
+        group = "subconscious_3060" if node_type == 'remote' else "consciousness_5070ti"
+        return self.llm_config.get(group, {}).get("context_budget", {})
+
     async def check_availability(self, url: str) -> bool:
         """Pings an Ollama instance."""
         try:
@@ -101,8 +116,8 @@ class BrainRouter:
         if task_type == 'chat':
             return self.LOCAL_BRAIN
             
-        # 2. Logic/Reflection -> Prefer Remote
-        if task_type == 'reflection':
+        # 2. Logic/Reflection/Embedding (background work) -> Prefer Remote
+        if task_type in ('reflection', 'embedding'):
             if self.status['remote']:
                 return self.REMOTE_BRAIN
             else:
@@ -120,13 +135,12 @@ class BrainRouter:
         
         self.llm_config[node_group]["options"][key] = value
 
-    def save_config(self):
-        """Saves current llm_config back to disk."""
+    def save_config(self, config: Optional[Dict[str, Any]] = None):
+        """Saves llm_config (or a snapshot of it) back to disk."""
         path = getattr(self, 'config_path', os.path.join("config", "llm_config.json"))
         try:
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(self.llm_config, f, indent=4)
+            codec.write_json(path, self.llm_config if config is None else config, pretty=True)
             logger.info(f"BrainRouter: Saved LLM Config to {path}")
         except Exception as e:
             logger.error(f"BrainRouter: Failed to save config: {e}")
@@ -139,6 +153,14 @@ class BrainRouter:
     def get_active_url(self, node_name: str) -> str:
         return self.nodes.get(node_name, self.LOCAL_BRAIN)
 
+    def spread_nodes(self, count: int) -> List[str]:
+        """
+        Nodes for up to `count` parallel chat samples, one per online node: a node runs
+        its requests one after the other, so a second sample there would not be parallel.
+        """
+        nodes = ['local', 'remote'] if self.status['remote'] else ['local']
+        return nodes[:max(1, count)]
+
     @property
     def current_route(self) -> str:
         """Returns the current routing destination for chat."""
@@ -1,19 +1,31 @@
 from engine.brain import Brain
-from engine.memory import Memory
+from engine.memory import Memory, CHAT_PAGE_SIZE
+from engine.async_memory import AsyncMemory
 from engine.modules.system_monitor import SystemMonitor
-from engine.modules.token_counter import TokenCounter
+from engine.modules.chat_index import build_preview
+from engine.modules.token_counter import TokenCounter, stored_tokens, TOKENS_PER_MESSAGE
+from engine.modules.context_trim import trim_messages, fit_sections, render_sections
+from engine.modules.prompt_cache import PromptSegmentCache
+from engine.modules.sentence_splitter import SentenceSplitter
+from engine.modules.tts_sanitizer import TtsSanitizer, LEAD as TTS_LEAD
+from engine.modules.turn_metrics import TurnMetrics
+from engine.modules.settings_store import SettingsStore
+from engine.modules.token_budget import plan_budget, merge_shares, headroom_tokens
+from engine.modules import codec
 from tools.speech_engine import SpeechEngine
-from engine.network_router import BrainRouter
+from engine.network_router import BrainRouter, DEFAULT_KEEP_ALIVE
 from engine.modules.time_keeper import TimeKeeper
 from engine.mcp_manager import McpManager
 from domain.subconscious.reflection_service import ReflectionService
 from domain.subconscious.growth_service import GrowthService
+from domain.subconscious.recall_service import RecallService
+from domain.subconscious.summary_service import SummaryService
 import asyncio
+import copy
+import time
 import uuid
 import datetime
-import json
 import os
-import re
 import logging
 import sys
 try:
@@ -27,7 +39,12 @@ logger = logging.getLogger("interface.controller")
 # Input validation constants
 MAX_INPUT_LENGTH = 50000  # Maximum characters for user input
 LLM_GENERATION_TIMEOUT = 300  # 5 minutes timeout for LLM generation
-CONTEXT_HEADROOM_TOKENS = 512  # Reserve space for completion
+HISTORY_PAGE_SIZE = 50  # Sidebar chats loaded per page
+STABLE_TRIM_BLOCK = 0.25  # Stable prefix mode: share of the history budget freed by each trim
+STOPPED_MARKER = "\n\n*[Stopped]*"  # Appended to a reply cancelled by the user
+REGEN_CANDIDATES = 2  # Alternative replies generated side by side by regenerate_candidates
+
+SECTION_GROUPS = {"user": "core"}  # System prompt sections that count toward another section's budget
 
 # Config Authority Mapping
 # Each setting has exactly ONE authoritative source to prevent contradictions.
@@ -50,6 +67,8 @@ SETTING_AUTHORITIES = {
     'tts_decode_steps': 'user',
     'tts_eos_threshold': 'user',
     'theme': 'user',
+    'archive_after_days': 'user',
+    'stable_prefix': 'user',
     'window_x': 'user',
     'window_y': 'user',
     'window_width': 'user',
@@ -73,14 +92,23 @@ class Controller:
         """Graceful shutdown of controller resources."""
         if self.brain:
             await self.brain.cleanup()
+        await self.recall_service.close()
+        await self.summary_service.close()
+        self.store.close()
+        self.settings_store.close()
         logger.info("Controller: Shutdown complete.")
 
     def __init__(self, brain: Brain, memory: Memory):
         self.brain = brain
         self.memory = memory
+        self.store = AsyncMemory(memory)  # Non-blocking access for everything on the event loop
         self.current_chat_id = None
         self.current_chat_created_at = None
         self.chat_history = []  # In-memory messages for UI
+        self.history_offset = 0  # Older messages of the current chat not loaded yet (tail-first loading)
+        self.render_start = 0  # Index in chat_history of the first rendered message
+        self._older_pinned = []  # Pinned messages before history_offset (they stay in every prompt)
+        self._older_tokens = 0  # Tokens of the messages before history_offset (from stored counts)
         self.refresh_ui_callback = None
         self.theme_update_callback = None # Callback for dynamic theming
         self.font_update_callback = None # Callback for dynamic font
@@ -94,6 +122,8 @@ class Controller:
         # Token Counter
         self.token_counter = TokenCounter()
         self.current_token_count = 0
+        # System prompt files, re-read only when they change on disk
+        self.prompt_segments = PromptSegmentCache(self.token_counter)
         
         # Brain Router (Distributed)
         self.brain_router = BrainRouter()
@@ -102,14 +132,31 @@ class Controller:
         self.mcp_manager = McpManager()
         
         # Subconscious Domain Services
-        self.reflection_service = ReflectionService(self.brain, self.memory, self.brain_router)
+        self.reflection_service = ReflectionService(self.brain, self.memory, self.brain_router, self.prompt_segments)
+        self.memory.add_search_folder("reflection", self.reflection_service.output_dir)
         self.growth_service = GrowthService(self.brain, self.brain_router)
+        self.recall_service = RecallService(self.memory, self.brain_router, token_counter=self.token_counter)
+        self.summary_service = SummaryService(self.brain, self.memory, self.brain_router, token_counter=self.token_counter)
+        # Stable prefix mode: frozen system block and block-trim position of the current chat
+        self._stable_context: Optional[Dict[str, Any]] = None
+        # Timings of the last reply as reported by Ollama (prefill = prompt_eval_duration)
+        self.last_generation_stats: Dict[str, Any] = {}
+        # Token budget of the last prompt per section (status dashboard)
+        self.last_context_plan: Dict[str, Any] = {}
+        # Rolling per-turn latency/throughput percentiles (status dashboard)
+        self.turn_metrics = TurnMetrics()
+        # Streaming task of the reply in progress (cancel_generation stops it)
+        self._generation_task: Optional[asyncio.Task] = None
+        self._generation_cancelled = False
+        # Set for a whole turn (history update, context build and stream) so no second one starts
+        self._turn_active = False
+        # Auto-read of the reply being streamed: {"msg_id", "sanitizer", "splitter", "started" (first utterance time)}
+        self._tts_stream: Optional[Dict[str, Any]] = None
         
         # Load User Config for TTS
         self.user_config = {}
         try:
-            with open(os.path.join("config", "user.json"), "r") as f:
-                self.user_config = json.load(f)
+            self.user_config = codec.read_json(os.path.join("config", "user.json"))
         except Exception:
             pass
             
@@ -129,6 +176,11 @@ class Controller:
         # Settings State
         self.settings_path = os.path.join("config", "user.json")
         self.settings = self.load_settings()
+        # Setters only mark a config file dirty; it is written once the changes settle
+        self.settings_store = SettingsStore()
+        self.settings_store.register("user", self._user_settings, self._write_user_settings)
+        self.settings_store.register("llm", lambda: copy.deepcopy(self.brain_router.llm_config),
+                                     self.brain_router.save_config)
 
     def load_settings(self):
         """Loads settings from their respective authoritative sources."""
@@ -145,17 +197,18 @@ class Controller:
             'always_on_top': False,
             'tts_temperature': 0.7,
             'tts_decode_steps': 1,
-            'tts_eos_threshold': -4.0
+            'tts_eos_threshold': -4.0,
+            'archive_after_days': 30,
+            'stable_prefix': False
         }
 
         # 1. Load User Settings (UI/Environment)
         if os.path.exists(self.settings_path):
             try:
-                with open(self.settings_path, 'r') as f:
-                    user_data = json.load(f)
-                    for k, v in user_data.items():
-                        if SETTING_AUTHORITIES.get(k) == 'user':
-                            settings[k] = v
+                user_data = codec.read_json(self.settings_path)
+                for k, v in user_data.items():
+                    if SETTING_AUTHORITIES.get(k) == 'user':
+                        settings[k] = v
             except Exception as e:
                 logger.error(f"Controller: Failed to load user settings: {e}")
 
@@ -192,13 +245,23 @@ class Controller:
         return settings
 
     def save_settings(self):
-        """Saves only 'user' authorized settings to user.json."""
+        """Schedules a (debounced) save of the 'user' authorized settings to user.json."""
+        self.settings_store.mark_dirty("user")
+
+    def save_llm_config(self):
+        """Schedules a (debounced) save of llm_config.json."""
+        self.settings_store.mark_dirty("llm")
+        self.recall_service.retry()  # The embedding node or model may work now
+
+    def _user_settings(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.settings.items() if SETTING_AUTHORITIES.get(k) == 'user'}
+
+    def _write_user_settings(self, user_settings: Dict[str, Any]):
+        """Writes user.json (runs on the settings store's writer thread)."""
         try:
-            user_settings = {k: v for k, v in self.settings.items() if SETTING_AUTHORITIES.get(k) == 'user'}
-            logger.info(f"Controller: Saving settings to disk: tts_autoplay={user_settings.get('tts_autoplay')}")
             os.makedirs(os.path.dirname(self.settings_path), exist_ok=True)
-            with open(self.settings_path, 'w') as f:
-                json.dump(user_settings, f, indent=2)
+            # Hand-edited config stays pretty-printed; written atomically
+            codec.write_json(self.settings_path, user_settings, pretty=True)
             logger.info("Controller: Settings saved successfully.")
         except Exception as e:
             logger.error(f"Controller: Failed to save user settings: {e}")
@@ -236,6 +299,24 @@ class Controller:
         # Run Reflection Check (Background)
         asyncio.create_task(self.check_legacy_reflection())
 
+        # Catch up long-term recall embeddings (Background)
+        self.recall_service.schedule_refresh()
+
+        # Pack old day folders into monthly archives (Background)
+        asyncio.create_task(self.archive_old_chats())
+
+    async def archive_old_chats(self):
+        """Moves day folders older than the 'archive_after_days' setting (0 = off) into cold storage."""
+        days = int(self.settings.get('archive_after_days') or 0)
+        if days <= 0:
+            return
+        try:
+            archived = await self.store.archive_old_days(days)
+            if archived:
+                logger.info(f"Controller: Archived {archived} chats older than {days} days.")
+        except Exception as e:
+            logger.error(f"Controller: Chat archival failed: {e}")
+
     async def check_legacy_reflection(self):
         """Checks if we need to generate a reflection for yesterday."""
         if self._is_reflecting:
@@ -296,6 +377,11 @@ class Controller:
         # 3. MCP Servers
         # Delegated to Manager
         stats['mcp'] = self.mcp_manager.get_status()
+
+        # 4. Last reply timings (prefill shows prompt cache reuse) and rolling turn telemetry
+        stats['generation'] = dict(self.last_generation_stats)
+        stats['telemetry'] = self.turn_metrics.summary()
+        stats['context_plan'] = self.last_context_plan
         return stats
     
     def set_username(self, name: str):
@@ -387,8 +473,9 @@ class Controller:
         for key in ['x', 'y', 'width', 'height']:
             if key in geometry:
                 setting_key = f"window_{key}"
-                self.settings[setting_key] = geometry[key]
-                changed = True
+                if self.settings.get(setting_key) != geometry[key]:
+                    self.settings[setting_key] = geometry[key]
+                    changed = True
         
         if changed:
             self.save_settings()
@@ -402,6 +489,7 @@ class Controller:
             os.makedirs(os.path.dirname(soul_path), exist_ok=True)
             with open(soul_path, 'w', encoding='utf-8') as f:
                 f.write(prompt)
+            self.prompt_segments.invalidate(soul_path)
             logger.info("Controller: Updated erika_soul.md personality.")
         except Exception as e:
             logger.error(f"Controller: Failed to save erika_soul.md: {e}")
@@ -412,29 +500,36 @@ class Controller:
 
     # --- Interaction Agent (System) Setters ---
 
+    def set_stable_prefix(self, enabled: bool):
+        """Toggles the prefix-stable (prompt cache friendly) context mode."""
+        self.settings['stable_prefix'] = bool(enabled)
+        self._stable_context = None
+        self.save_settings()
+        logger.info(f"Controller: Stable prompt prefix set to {bool(enabled)}")
+
     def set_sys_temperature(self, val: float):
         self.settings['sys_temperature'] = val
         self.brain_router.set_model_option("consciousness_5070ti", "temperature", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: System Temperature set to {val}")
 
     def set_sys_top_p(self, val: float):
         self.settings['sys_top_p'] = val
         self.brain_router.set_model_option("consciousness_5070ti", "top_p", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: System Top P set to {val}")
 
     def set_sys_repeat_penalty(self, val: float):
         self.settings['sys_repeat_penalty'] = val
         self.brain_router.set_model_option("consciousness_5070ti", "repeat_penalty", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: System Repeat Penalty set to {val}")
 
     def set_sys_context_window(self, val: int):
         self.settings['sys_context_window'] = val
         self.settings['context_window'] = val # Keep legacy sync
         self.brain_router.set_model_option("consciousness_5070ti", "num_ctx", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: System Context Window set to {val}")
 
     # --- Memory Agent (ErikaHQ) Setters ---
@@ -442,25 +537,25 @@ class Controller:
     def set_mem_temperature(self, val: float):
         self.settings['mem_temperature'] = val
         self.brain_router.set_model_option("subconscious_3060", "temperature", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: Memory Temperature set to {val}")
 
     def set_mem_top_p(self, val: float):
         self.settings['mem_top_p'] = val
         self.brain_router.set_model_option("subconscious_3060", "top_p", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: Memory Top P set to {val}")
 
     def set_mem_repeat_penalty(self, val: float):
         self.settings['mem_repeat_penalty'] = val
         self.brain_router.set_model_option("subconscious_3060", "repeat_penalty", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: Memory Repeat Penalty set to {val}")
 
     def set_mem_context_window(self, val: int):
         self.settings['mem_context_window'] = val
         self.brain_router.set_model_option("subconscious_3060", "num_ctx", val)
-        self.brain_router.save_config()
+        self.save_llm_config()
         logger.info(f"Controller: Memory Context Window set to {val}")
 
     def set_tts_voice(self, voice: str):
@@ -515,42 +610,8 @@ class Controller:
 
     def _sanitize_for_tts(self, text: str) -> str:
         """Removes emojis and meta-text but preserves emphasis and rhythm for TTS."""
-        if not text: return ""
-        
-        # 1. Normalize unicode punctuation and force pauses for rhythm
-        text = text.replace('“', '"').replace('”', '"').replace('‘', "'").replace('’', "'")
-        
-        # Contemplation marker "--" at the end of thoughts
-        text = text.replace('--', '... ')
-        
-        # Force a pause for ellipses by adding a comma (single pass to avoid double-replacement)
-        text = re.sub(r'\.{3,}|…', ', ... ', text)
-        
-        # Ensure dashes have space to prevent word merging and add a slight pause
-        text = text.replace('—', ' - ').replace('–', ' - ')
-        
-        # 2. Strip (parentheticals) - often meta-commentary like (laughing) or multi-line thoughts
-        clean = re.sub(r'\(.*?\)', '', text, flags=re.DOTALL)
-        clean = re.sub(r'\[.*?\]', '', clean, flags=re.DOTALL) # Also strip [actions]
-        
-        # 3. Remove literal markdown symbols used for emphasis (* and _)
-        clean = clean.replace('*', '').replace('_', '')
-        
-        # 4. Remove emojis and truly "illegal" symbols (Keep alphanumeric + basic punctuation)
-        # Whitelist includes standard punctuation that assists TTS engines
-        clean = re.sub(r'[^\w\s,.\'?!:;"-]', '', clean)
-        
-        # 5. Collapse multiple spaces but stay mindful of the space we just added for pauses
-        clean = re.sub(r'\s+', ' ', clean)
-        
-        clean = clean.strip()
-        
-        # Add a leading pause/period to prevent the TTS engine from cutting off the first word.
-        # This is critical for short bolded starts like "**Hmm.**" or("**Heh**") which Erika uses often.
-        if clean:
-            clean = ". " + clean
-
-        logger.info(f"Controller: Sanitized TTS Text: '{clean}'")
+        clean = TtsSanitizer.sanitize(text)
+        logger.debug(f"Controller: Sanitized {len(text or '')} chars for TTS ({len(clean)} left).")
         return clean
 
     def _get_sentiment_params(self, text: str) -> dict:
@@ -611,6 +672,57 @@ class Controller:
         # Refresh to update icons
         await self._safe_refresh()
 
+    def _begin_streamed_tts(self, msg_id: str):
+        """Starts reading a reply aloud while it is still being generated."""
+        if self.speaking_msg_id:
+            self.speech_engine.stop()
+        self.speaking_msg_id = msg_id
+        self._tts_stream = {"msg_id": msg_id, "sanitizer": TtsSanitizer(lead=""), "splitter": SentenceSplitter(),
+                            "started": None}
+        logger.info(f"Controller: Streaming TTS for {msg_id}")
+
+    def _feed_streamed_tts(self, msg_id: str, text: str):
+        """Queues each sentence of the streamed reply for speech as soon as it is complete."""
+        stream = self._tts_stream
+        if not stream or stream["msg_id"] != msg_id:
+            return
+        if self.speaking_msg_id != msg_id:
+            self._tts_stream = None  # Stopped from the UI
+            return
+        # Cleaned as it arrives; an open (parenthetical) is held back until it closes
+        sanitizer = stream["sanitizer"]
+        clean = sanitizer.feed(text)
+        for sentence in stream["splitter"].feed(clean, at_space=sanitizer.at_space):
+            self._enqueue_tts(stream, sentence)
+
+    def _enqueue_tts(self, stream: Dict[str, Any], sentence: str, on_finished: Optional[Callable[[], None]] = None):
+        """Queues one cleaned sentence (each utterance gets the leading pause)."""
+        if not stream["started"] and sentence:
+            # The voice follows the mood of the opening sentence
+            sentiment = self._get_sentiment_params(sentence)
+            self.speech_engine.set_temperature(sentiment["temperature"])
+            self.speech_engine.set_decode_steps(sentiment["decode_steps"])
+            stream["started"] = time.perf_counter()
+        if sentence or on_finished:
+            self.speech_engine.enqueue(TTS_LEAD + sentence if sentence else "", on_finished)
+
+    def _finish_streamed_tts(self, msg_id: str, stopped: bool = False):
+        """Queues the rest of the reply (or stops speaking if the reply was cancelled)."""
+        stream = self._tts_stream
+        if not stream or stream["msg_id"] != msg_id:
+            return
+        self._tts_stream = None
+        if self.speaking_msg_id != msg_id:
+            return
+        if stopped:
+            self.speech_engine.stop()
+            self.speaking_msg_id = None
+            return
+        for sentence in stream["splitter"].feed(stream["sanitizer"].finish()):
+            self._enqueue_tts(stream, sentence)
+        rest = stream["splitter"].flush()
+        self._enqueue_tts(stream, rest, lambda: self._handle_tts_finished_threadsafe(msg_id))
+
     def _handle_tts_finished_threadsafe(self, msg_id: str):
         """Thread-safe handler for TTS completion."""
         # We need to bridge from Thread -> Async Loop
@@ -666,20 +778,24 @@ class Controller:
             else:
                 self.refresh_ui_callback()
 
-    async def _safe_stream(self, msg_id, content):
-        """Safely calls stream updater."""
+    async def _safe_stream(self, msg_id, delta):
+        """Safely calls stream updater with the text appended to a streaming message."""
         if self.stream_ui_callback:
             if asyncio.iscoroutinefunction(self.stream_ui_callback):
-                await self.stream_ui_callback(msg_id, content)
+                await self.stream_ui_callback(msg_id, delta)
             else:
-                self.stream_ui_callback(msg_id, content)
+                self.stream_ui_callback(msg_id, delta)
 
     def new_chat(self):
         """Starts a new chat."""
-        chat_data = self.memory.create_chat()
+        chat_data = self.store.create_chat()
         self.current_chat_id = chat_data['id']
         self.current_chat_created_at = chat_data['created_at']
         self.chat_history = []
+        self.history_offset = 0
+        self.render_start = 0
+        self._older_pinned = []
+        self._older_tokens = 0
         if self.refresh_ui_callback:
              # Schedule it since new_chat is sync
              if asyncio.iscoroutinefunction(self.refresh_ui_callback):
@@ -688,52 +804,124 @@ class Controller:
                  self.refresh_ui_callback()
         logger.info(f"Controller: New chat started {self.current_chat_id}")
 
-    async def load_history(self):
+    async def load_history(self, limit: Optional[int] = None, before_cursor: Optional[str] = None):
         """Loads list of chats for sidebar."""
-        return self.memory.list_chats()
+        return await self.store.list_chats(limit, before_cursor)
+
+    async def search_memory(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Ranked full-text search over past chats and reflections."""
+        if not query or not query.strip():
+            return []
+        return await self.store.search(query.strip()[:500], limit)
 
     async def load_chat_session(self, chat_id: str):
-        """Loads a specific chat session."""
-        data = self.memory.get_chat(chat_id)
-        if data:
+        """Loads a specific chat session (newest page first; older pages load on demand)."""
+        page = await self.store.get_chat_page(chat_id, CHAT_PAGE_SIZE)
+        if page:
+            offset = page.get("offset", 0)
+            older_pinned, older_tokens = [], 0
+            if offset:
+                # Totals of the part not loaded come from the chat index (computed once for older chats)
+                stats = page
+                if page.get("tokens") is None or page.get("pinned") is None:
+                    stats = await self.store.get_chat_stats(chat_id) or {}
+                positions = [p for p in stats.get("pinned") or [] if p < offset]
+                if positions:
+                    older_pinned = await self.store.get_messages(chat_id, positions)
+                older_tokens = ((stats.get("tokens") or 0) - stored_tokens(page.get("messages", []))
+                                + offset * (TOKENS_PER_MESSAGE + 1))
+
             self.current_chat_id = chat_id
-            self.current_chat_created_at = data.get("created_at")
-            self.chat_history = data.get("messages", [])
-            
-            # Ensure IDs exist (backward compatibility)
-            for msg in self.chat_history:
-                if 'id' not in msg:
-                    msg['id'] = uuid.uuid4().hex
-            
-            # Recount tokens
-            self.current_token_count = self.token_counter.count_messages(self.chat_history)
-            logger.info(f"Controller: Loaded chat {chat_id} (Tokens: {self.current_token_count})")
+            self.current_chat_created_at = page.get("created_at")
+            self.chat_history = page.get("messages", [])
+            self.history_offset = offset
+            self.render_start = 0
+            self._older_pinned = older_pinned
+            self._older_tokens = max(0, older_tokens)
+            self._ensure_message_ids(self.chat_history)
+            self._update_token_count()
+            logger.info(f"Controller: Loaded chat {chat_id} ({len(self.chat_history)}/{page.get('total')} messages)")
             
             await self._safe_refresh()
 
+    @staticmethod
+    def _ensure_message_ids(messages: list):
+        """Ensure IDs exist (backward compatibility)."""
+        for msg in messages:
+            if 'id' not in msg:
+                msg['id'] = uuid.uuid4().hex
+
+    @property
+    def has_earlier_messages(self) -> bool:
+        return self.render_start > 0 or self.history_offset > 0
+
+    async def load_earlier_messages(self, count: int = CHAT_PAGE_SIZE) -> bool:
+        """Extends the rendered window towards the start of the chat. Returns False at the start."""
+        if self.render_start > 0:
+            self.render_start = max(0, self.render_start - count)
+            return True
+        if not self.history_offset:
+            return False
+        return await self._load_older_page(count) is not None
+
+    async def _load_older_page(self, count: int = CHAT_PAGE_SIZE) -> Optional[list]:
+        """Prepends the page before history_offset to chat_history. None if nothing was loaded."""
+        chat_id, before = self.current_chat_id, self.history_offset
+        page = await self.store.get_chat_page(chat_id, count, before=before)
+        if not page or chat_id != self.current_chat_id or self.history_offset != before:
+            return None  # Chat switched, or another load got there first
+        older = page.get("messages", [])
+        self._older_tokens = max(0, self._older_tokens - stored_tokens(older) - len(older) * (TOKENS_PER_MESSAGE + 1))
+        self._ensure_message_ids(older)
+        self.chat_history[:0] = older
+        self.history_offset = page.get("offset", 0)
+        loaded = {m['id'] for m in older}
+        self._older_pinned = [m for m in self._older_pinned if m.get('id') not in loaded]
+        return older
+
+    async def _ensure_context_history(self):
+        """
+        Loads older pages until the loaded tail alone fills the context window (or the whole
+        chat is loaded), so the prompt is always built from messages in memory.
+        """
+        _, target_ctx = self._context_window()
+        while self.history_offset and self.token_counter.count_messages(self.chat_history) < target_ctx:
+            older = await self._load_older_page()
+            if older is None:
+                break
+            self.render_start += len(older)  # Keep the rendered window where it was
+
+    def _update_token_count(self):
+        """Token count of the whole chat: the loaded messages plus the stored total of the rest."""
+        self.current_token_count = self._older_tokens + self.token_counter.count_messages(self.chat_history)
+
     async def regenerate_last_message(self):
         """Removes the last assistant message and regenerates it."""
-        if not self.chat_history:
+        if self.is_generating or not self.chat_history:
             return
 
-        # Check if last message is from assistant
-        last_msg = self.chat_history[-1]
-        if last_msg['role'] == 'assistant':
-            logger.info("Controller: Regenerating last message...")
-            self.chat_history.pop() # Remove bad response
+        self._turn_active = True
+        try:
+            # Check if last message is from assistant
+            last_msg = self.chat_history[-1]
+            if last_msg['role'] == 'assistant':
+                logger.info("Controller: Regenerating last message...")
+                self.chat_history.pop() # Remove bad response
             
-            # Find last user message content
-            user_content = ""
-            for msg in reversed(self.chat_history):
-                if msg['role'] == 'user':
-                    user_content = msg['content']
-                    break
+                # Find last user message content
+                user_content = ""
+                for msg in reversed(self.chat_history):
+                    if msg['role'] == 'user':
+                        user_content = msg['content']
+                        break
             
-            if user_content:
-                # Trigger generation again (handle_user_input logic but skipping history add)
-                await self._trigger_regeneration(user_content)
-            else:
-                logger.warning("Controller: No user message found for regeneration.")
+                if user_content:
+                    # Trigger generation again (handle_user_input logic but skipping history add)
+                    await self._trigger_regeneration(user_content)
+                else:
+                    logger.warning("Controller: No user message found for regeneration.")
+        finally:
+            self._turn_active = False
 
     async def _trigger_regeneration(self, content: str):
         """Internal helper to re-run generation flow without adding new user message."""
@@ -759,97 +947,296 @@ class Controller:
         # I will refactor handle_user_input below to support this.
         await self._execute_generation(content, assistant_msg)
 
+    async def regenerate_candidates(self, count: int = REGEN_CANDIDATES):
+        """
+        Replaces the last reply with up to `count` alternatives generated at the same time,
+        one per online node, so they take one generation's time. They stream side by side
+        into the message's "candidates"; choose_candidate keeps one. With only the local
+        node online this is a plain regeneration.
+        """
+        if self.is_generating or not self.chat_history or self.chat_history[-1]['role'] != 'assistant':
+            return
+        user_content = next((m['content'] for m in reversed(self.chat_history) if m['role'] == 'user'), "")
+        if not user_content:
+            logger.warning("Controller: No user message found for regeneration.")
+            return
+        nodes = self.brain_router.spread_nodes(count)
+        if len(nodes) < 2:
+            logger.info("Controller: Only one node online, regenerating a single reply instead of alternatives.")
+            await self.regenerate_last_message()
+            return
+
+        self._turn_active = True
+        try:
+            self.chat_history.pop()
+            await self._ensure_context_history()
+            context_messages, trimmed, _, system_trimmed, stable = await self._build_context(user_content, self.chat_history)
+            prompt_tokens = self.token_counter.count_messages(context_messages)
+            if trimmed or system_trimmed:
+                logger.warning("Controller: Context trimmed to fit the context window.")
+
+            targets = [{
+                "node": node,
+                "model": self.brain_router.REMOTE_MODEL if node == 'remote' else self.brain_router.LOCAL_MODEL,
+                "host": self.brain_router.get_active_url(node),
+                "options": self.brain_router.get_model_options(node),
+                "keep_alive": self._keep_alive(node, stable),
+            } for node in nodes]
+            candidates = [{"id": uuid.uuid4().hex, "content": "", "node": t["node"], "model": t["model"]} for t in targets]
+            assistant_msg = {"role": "assistant", "content": "", "id": uuid.uuid4().hex, "candidates": candidates}
+            self.chat_history.append(assistant_msg)
+            logger.info(f"Controller: Generating {len(candidates)} candidates on "
+                        f"{', '.join(c['node'] for c in candidates)}.")
+            await self._safe_refresh()
+
+            started = time.perf_counter()
+            self._generation_cancelled = False
+            self._generation_task = asyncio.create_task(
+                self._stream_candidates(candidates, targets, context_messages, prompt_tokens, stable))
+            try:
+                await self._generation_task
+            except asyncio.CancelledError:
+                if not self._generation_cancelled:
+                    raise
+            stopped = self._generation_cancelled
+            self._generation_cancelled = False
+            for candidate in candidates:
+                if stopped:
+                    candidate['content'] = f"{candidate['content']}{STOPPED_MARKER}"
+            # Until one is chosen, the first candidate stands for the reply
+            assistant_msg['content'] = candidates[0]['content']
+            logger.info(f"Controller: {len(candidates)} candidates done in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+            await self._safe_refresh()
+            self._update_token_count()
+            await self._persist()
+        finally:
+            self._turn_active = False
+
+    async def _stream_candidates(self, candidates: list, targets: list, messages: list, prompt_tokens: int,
+                                 stable: bool):
+        """
+        Streams all candidates concurrently (one task, so cancel_generation stops them all).
+        Each candidate keeps its own Ollama timings in "stats" until one is chosen.
+        """
+        turns = [{} for _ in candidates]
+        try:
+            await asyncio.gather(*(
+                self._stream_reply(candidate, target["model"], messages, target["host"], target["options"],
+                                   target["keep_alive"], prompt_tokens, stable, turn)
+                for candidate, target, turn in zip(candidates, targets, turns)))
+        finally:
+            for candidate, turn in zip(candidates, turns):
+                if turn.get("ollama"):
+                    candidate["stats"] = turn["ollama"]
+
+    async def choose_candidate(self, msg_id: str, candidate_id: str):
+        """Keeps one of a message's candidate replies as the reply."""
+        if self.is_generating:
+            return
+        msg = next((m for m in self.chat_history if m.get('id') == msg_id), None)
+        candidate = next((c for c in (msg or {}).get('candidates') or [] if c['id'] == candidate_id), None)
+        if not candidate:
+            return
+        msg['content'] = candidate['content']
+        del msg['candidates']
+        if candidate.get('stats'):
+            self.last_generation_stats = candidate['stats']
+        logger.info(f"Controller: Chose candidate from {candidate.get('node')} ({candidate.get('model')}).")
+        await self._safe_refresh()
+        self._update_token_count()
+        await self._persist()
+        self.recall_service.schedule_refresh()
+
+    @property
+    def alternatives_available(self) -> bool:
+        """True when regenerate_candidates can run alternatives side by side (more than one node online)."""
+        return len(self.brain_router.spread_nodes(REGEN_CANDIDATES)) > 1
+
+    def _settle_candidates(self):
+        """Keeps the shown (first) candidate of an unchosen reply once the conversation moves on."""
+        if self.chat_history and self.chat_history[-1].get('candidates'):
+            del self.chat_history[-1]['candidates']
+
     async def pin_message(self, msg_id: str):
         """Toggles pinned state of a message."""
         for msg in self.chat_history:
             if msg.get('id') == msg_id:
                 msg['pinned'] = not msg.get('pinned', False)
-                self._persist()
+                await self._persist()
                 await self._safe_refresh()
                 logger.info(f"Controller: Toggled pin for {msg_id}")
                 break
 
-    async def request_delete_chat(self, chat_id: str):
-        """Deletes a chat and updates state."""
-        success = self.memory.delete_chat(chat_id)
+    async def request_delete_chat(self, chat_id: str) -> bool:
+        """Deletes a chat and updates state. Returns False if it could not be deleted."""
+        success = await self.store.delete_chat(chat_id)
         if success:
+            self.summary_service.forget(chat_id)
             logger.info(f"Controller: Chat {chat_id} deleted successfully.")
             if self.current_chat_id == chat_id:
                 self.new_chat()
-            # Triggers full UI rebuild including sidebar
             await self._safe_refresh()
         else:
             logger.warning(f"Controller: Failed to delete chat {chat_id}")
+        return success
 
-    def build_system_prompt(self) -> str:
-        """Constructs the system prompt from Core, Soul, and Growth files."""
+    def build_system_sections(self) -> List[Dict[str, Any]]:
+        """
+        The system prompt as ordered sections (Core, Soul, Growth, Reflection, User) with
+        cached token counts. Lower priority is given up first when the prompt must shrink.
+        """
         base_path = os.path.join("erika_home", "config")
-        core_path = os.path.join(base_path, "system_core.md")
-        soul_path = os.path.join(base_path, "erika_soul.md")
-        growth_path = os.path.join(base_path, "erika_growth.md")
-        
-        # Load Core
-        if os.path.exists(core_path):
-            with open(core_path, 'r', encoding='utf-8') as f:
-                core_text = f.read()
-        else:
-            core_text = "ERROR: SYSTEM CORE MISSING. ACT AS A HELPFUL ASSISTANT."
-            
-        # Load Soul
-        if os.path.exists(soul_path):
-            with open(soul_path, 'r', encoding='utf-8') as f:
-                soul_text = f.read()
-        else:
-            soul_text = f"You are chatting with {self.settings.get('username', 'User')}."
 
-        # Load Growth (The Living Personality)
-        growth_text = ""
-        if os.path.exists(growth_path):
-             with open(growth_path, 'r', encoding='utf-8') as f:
-                 growth_text = f.read()
-            
-        # Load Reflection
-        reflection = self.reflection_service.get_latest_reflection()
-        reflection_block = ""
-        if reflection:
-            reflection_block = (
-                "\n### INTERNAL MEMORY: YESTERDAY'S PERSPECTIVE ###\n"
-                f"{reflection}\n"
-                "### END MEMORY ###\n"
-            )
+        def segment(name: str, path: str, priority: int, default: str = "", prefix: str = "") -> Dict[str, Any]:
+            # Segments come from memory unless the file changed since the last prompt
+            cached = self.prompt_segments.segment(path)
+            if cached is None:
+                return {"name": name, "text": default, "priority": priority, "prefix": prefix,
+                        "tokens": self.token_counter.count_cached(default)}
+            return {"name": name, "text": cached["text"], "priority": priority, "prefix": prefix,
+                    "tokens": cached["tokens"]}
+
+        sections = [
+            segment("core", os.path.join(base_path, "system_core.md"), 4,
+                    "ERROR: SYSTEM CORE MISSING. ACT AS A HELPFUL ASSISTANT."),
+            segment("soul", os.path.join(base_path, "erika_soul.md"), 3,
+                    f"You are chatting with {self.settings.get('username', 'User')}.", prefix="\n\n"),
+            # Growth (The Living Personality)
+            segment("growth", os.path.join(base_path, "erika_growth.md"), 2, prefix="\n\n"),
+        ]
+
+        # Reflection
+        reflection_text = self.reflection_service.get_latest_reflection()
+        reflection = {"name": "reflection", "text": reflection_text, "priority": 1, "prefix": "\n\n",
+                      "tokens": self.token_counter.count_cached(reflection_text)}
+        if reflection_text:
+            reflection["prefix"] = "\n\n\n### INTERNAL MEMORY: YESTERDAY'S PERSPECTIVE ###\n"
+            reflection["suffix"] = "\n### END MEMORY ###\n"
+        sections.append(reflection)
 
         # User Context
         username = self.settings.get('username', 'User')
-        user_context = f"\n\nCURRENT USER: {username}"
+        sections.append({"name": "user", "text": f"CURRENT USER: {username}", "priority": 5, "prefix": "\n\n"})
+        return sections
+
+    def build_system_prompt(self) -> str:
+        """Constructs the system prompt from Core, Soul, and Growth files."""
+        return render_sections(self.build_system_sections())
 
-        return f"{core_text}\n\n{soul_text}\n\n{growth_text}\n\n{reflection_block}{user_context}"
+    def _context_window(self) -> tuple[int, int]:
+        """(num_ctx of the chat model, prompt target after the completion headroom)."""
+        max_ctx = self.brain_router.llm_config.get("consciousness_5070ti", {}).get("options", {}).get("num_ctx", 8192)
+        return max_ctx, self._calc_context_target(max_ctx)
 
     def _calc_context_target(self, max_tokens: int) -> int:
-        """Returns the target max tokens for the prompt after headroom."""
+        """Returns the target max tokens for the prompt after the completion headroom share."""
         if not max_tokens or max_tokens <= 0:
             return 0
-        headroom = min(CONTEXT_HEADROOM_TOKENS, max_tokens // 4)
+        headroom = headroom_tokens(max_tokens, self._budget_shares())
         if max_tokens < 64:
             return max_tokens
         return min(max_tokens, max(64, max_tokens - headroom))
 
-    def _trim_context_messages(self, messages: list, max_tokens: int) -> tuple[list, bool]:
-        """Trims oldest messages to fit within max_tokens."""
-        if not messages or max_tokens <= 0:
-            return messages, False
-
-        trimmed = list(messages)
-        while len(trimmed) > 1 and self.token_counter.count_messages(trimmed) > max_tokens:
-            if trimmed[0].get("role") == "system" and len(trimmed) > 2:
-                trimmed.pop(1)
-            else:
-                trimmed.pop(0)
-
-        was_trimmed = len(trimmed) != len(messages)
-        return trimmed, was_trimmed
+    def _budget_shares(self) -> Dict[str, float]:
+        return merge_shares(self.brain_router.get_context_budget('local'))
+
+    def _section_tokens(self, section: Dict[str, Any]) -> int:
+        tokens = section.get("tokens")
+        return tokens if tokens is not None else self.token_counter.count_cached(section["text"])
+
+    def _plan_sections(self, sections: List[Dict[str, Any]], num_ctx: int,
+                       wanted: Dict[str, int]) -> tuple[List[Dict[str, Any]], Dict[str, Any], bool]:
+        """
+        Plans the prompt budget from the sections' cached token counts (plus `wanted` for
+        recall, summary and recent turns) and cuts any system section that is over its
+        share, so one long file cannot crowd out the rest. Returns (sections, plan, truncated).
+        """
+        wanted = dict(wanted)
+        for section in sections:
+            group = SECTION_GROUPS.get(section["name"], section["name"])
+            wanted[group] = wanted.get(group, 0) + self._section_tokens(section)
+        plan = plan_budget(num_ctx, wanted, self._budget_shares())
+
+        capped, truncated = [], False
+        for section in sections:
+            entry = plan["sections"].get(section["name"])
+            tokens = self._section_tokens(section)
+            if entry is not None and section["text"]:
+                # Other sections of the group (e.g. the user line in core) keep their part of it
+                allowed = max(0, entry["budget"] - (entry["wanted"] - tokens))
+                if tokens > allowed:
+                    fitted, _ = fit_sections([{**section, "prefix": "", "suffix": ""}], allowed, self.token_counter)
+                    section = {**section, "text": fitted[0]["text"], "tokens": None,
+                               "dropped": fitted[0].get("dropped", False)}
+                    truncated = True
+                    logger.info(f"Controller: System section '{section['name']}' cut to its budget of {allowed} tokens.")
+            capped.append(section)
+        return capped, plan, truncated
+
+    def _record_context_plan(self, plan: Dict[str, Any], sections: List[Dict[str, Any]], messages: list,
+                             recall_block: str, summary_block: Optional[str], mode: str):
+        """Notes what each section actually used in the final prompt (status dashboard)."""
+        used = {name: 0 for name in plan["sections"]}
+        for section in sections:
+            if not section.get("dropped") and section["text"]:
+                group = SECTION_GROUPS.get(section["name"], section["name"])
+                used[group] = used.get(group, 0) + self._section_tokens(section)
+        used["recall"] = self.token_counter.count_cached(recall_block) if recall_block else 0
+        used["summary"] = self.token_counter.count_cached(summary_block) if summary_block else 0
+        prompt_tokens = self.token_counter.count_messages(messages)
+        fixed = sum(tokens for name, tokens in used.items() if name not in ("recent", "headroom"))
+        used["recent"] = max(0, prompt_tokens - fixed)
+        used["headroom"] = plan["sections"]["headroom"]["budget"]
+        for name, entry in plan["sections"].items():
+            entry["used"] = used.get(name, 0)
+        plan.update(mode=mode, prompt_tokens=prompt_tokens)
+        self.last_context_plan = plan
 
-    def _ensure_system_prompt_fits(self, messages: list, max_tokens: int) -> tuple[list, bool]:
-        """Ensures the system prompt fits by truncating it if needed."""
+    def _trim_context_messages(self, messages: list, max_tokens: int) -> tuple[list, bool]:
+        """Trims oldest messages to fit within max_tokens (keeps the system prompt and pinned messages)."""
+        trimmed, dropped = trim_messages(messages, max_tokens, self.token_counter)
+        return trimmed, dropped > 0
+
+    @staticmethod
+    def _evicted_prefix(history: list, kept: list) -> int:
+        """Length of the history prefix that holds every message missing from `kept`."""
+        kept_ids = {id(m) for m in kept}
+        return max((i + 1 for i, m in enumerate(history) if id(m) not in kept_ids), default=0)
+
+    async def _apply_history_summary(self, history: list, messages: list, max_tokens: int) -> tuple[list, bool]:
+        """
+        Puts the rolling summary of the evicted turns right after the system prompt
+        (re-trimming to make room for it) and schedules the summary to catch up with
+        what was evicted. `history` starts at history_offset; the messages before it
+        count as evicted. Returns (messages, summary_injected).
+        """
+        chat_id = self.current_chat_id
+        offset = self.history_offset
+        cut = self._evicted_prefix(history, messages)
+        summary = await self.summary_service.load(chat_id)
+        injected = False
+        if self.summary_service.is_valid(summary, history[:cut], offset):
+            summary_msg = {"role": "system", "content": self.summary_service.block(summary)}
+            system = messages[:1] if messages and messages[0].get("role") == "system" else []
+            messages, _ = self._trim_context_messages(system + self._older_pinned + history,
+                                                      max_tokens - self.token_counter.message_cost(summary_msg))
+            cut = self._evicted_prefix(history, messages)
+            messages.insert(len(system), summary_msg)
+            injected = True
+
+        if (not summary or not self.summary_service.is_valid(summary, history, offset)
+                or summary["count"] < offset + cut):
+            self.summary_service.schedule_update(chat_id, history[:cut], offset)
+        return messages, injected
+
+    def _ensure_system_prompt_fits(self, messages: list, max_tokens: int,
+                                   sections: Optional[List[Dict[str, Any]]] = None) -> tuple[list, bool]:
+        """
+        Shrinks the system prompt until the whole prompt fits max_tokens, cutting the
+        lowest-priority section first (see fit_sections). Without `sections` the prompt
+        is treated as one block.
+        """
         if not messages or max_tokens <= 0:
             return messages, False
 
@@ -860,31 +1247,88 @@ class Controller:
         if not system_content:
             return messages, False
 
-        if self.token_counter.count_messages([messages[0]]) <= max_tokens:
+        rest_tokens = self.token_counter.count_messages(messages[1:])
+        system_cost = self.token_counter.message_cost(messages[0])
+        if rest_tokens + system_cost <= max_tokens:
             return messages, False
 
-        # Truncate by characters to approximate token reduction.
-        approx_limit = max(200, max_tokens * 3)
-        truncated = system_content[:approx_limit] + "\n\n[System prompt truncated to fit context window]"
-        messages[0]["content"] = truncated
-        return messages, True
-
-    async def _generate_with_timeout(self, model: str, messages: list, host: str, options: dict):
-        """Async generator wrapper for LLM generation with a per-chunk timeout."""
-        gen = self.brain.generate_response(model=model, messages=messages, host=host, options=options)
-        while True:
-            try:
-                chunk = await asyncio.wait_for(gen.__anext__(), timeout=LLM_GENERATION_TIMEOUT)
-            except StopAsyncIteration:
-                break
-            except asyncio.TimeoutError:
+        # History was already trimmed; the floor only matters if the latest message alone is huge
+        budget = max(max_tokens - rest_tokens, max_tokens // 4) - (system_cost - self.token_counter.count_message(messages[0]))
+        if sections is None:
+            sections = [{"name": "system", "text": system_content, "priority": 0}]
+        fitted, truncated = fit_sections(sections, budget, self.token_counter)
+        messages[0] = {**messages[0], "content": render_sections(fitted)}
+        return messages, truncated
+
+    def _keep_alive(self, node: str, stable: bool):
+        """
+        keep_alive for a generation: the node's configured value, else a long one only in stable
+        prefix mode (its prompt cache is only worth keeping while the prefix is reused).
+        """
+        return self.brain_router.get_keep_alive(node, DEFAULT_KEEP_ALIVE if stable else None)
+
+    async def _generate_with_timeout(self, model: str, messages: list, host: str, options: dict, keep_alive=None):
+        """
+        Async generator wrapper for LLM generation with a per-chunk timeout.
+        The brain stream is always closed on the way out (timeout, cancellation or
+        the consumer stopping), which aborts the HTTP request so the node stops generating.
+        """
+        extra = {"keep_alive": keep_alive} if keep_alive is not None else {}
+        gen = self.brain.generate_response(model=model, messages=messages, host=host, options=options, **extra)
+        try:
+            while True:
                 try:
-                    await gen.aclose()
-                except Exception:
-                    pass
-                yield {"error": f"Generation timed out after {LLM_GENERATION_TIMEOUT}s"}
-                break
-            yield chunk
+                    chunk = await asyncio.wait_for(gen.__anext__(), timeout=LLM_GENERATION_TIMEOUT)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    yield {"error": f"Generation timed out after {LLM_GENERATION_TIMEOUT}s"}
+                    break
+                yield chunk
+        finally:
+            try:
+                await gen.aclose()
+            except Exception:
+                pass
+
+    @property
+    def is_generating(self) -> bool:
+        """True while a turn is running, from its history update until the reply is done."""
+        return self._turn_active or self._streaming
+
+    @property
+    def _streaming(self) -> bool:
+        return self._generation_task is not None and not self._generation_task.done()
+
+    def cancel_generation(self) -> bool:
+        """
+        Stops the reply being generated. The model stream is closed right away and the
+        partial reply is kept (marked as stopped). Returns True if a reply was running.
+        """
+        if not self._streaming:
+            return False
+        logger.info("Controller: Generation cancelled by user.")
+        self._generation_cancelled = True
+        self._generation_task.cancel()
+        return True
+
+    def _record_generation_stats(self, chunk: dict, prompt_tokens: int, stable: bool) -> Dict[str, Any]:
+        """Ollama's timings from the final chunk; prefill shows how much of the prompt was cached."""
+        ns = 1e-6
+        stats = {
+            "mode": "stable" if stable else "rolling",
+            "prompt_tokens": prompt_tokens,
+            "prefill_tokens": chunk.get("prompt_eval_count") or 0,
+            "prefill_ms": (chunk.get("prompt_eval_duration") or 0) * ns,
+            "completion_tokens": chunk.get("eval_count") or 0,
+            "generation_ms": (chunk.get("eval_duration") or 0) * ns,
+            "load_ms": (chunk.get("load_duration") or 0) * ns,
+        }
+        logger.info(
+            f"Controller: Prefill {stats['prefill_ms']:.0f} ms for {stats['prefill_tokens']}/{prompt_tokens} prompt tokens "
+            f"({stats['mode']} context), {stats['completion_tokens']} tokens in {stats['generation_ms']:.0f} ms."
+        )
+        return stats
 
     async def handle_user_input(self, content: str):
         """Processes user input."""
@@ -902,50 +1346,176 @@ class Controller:
             logger.warning("Controller: Null byte in input, sanitizing")
             content = content.replace('\x00', '')
 
-        if not self.current_chat_id:
-            self.new_chat()
+        if self.is_generating:
+            logger.info("Controller: A reply is still being generated, ignoring input.")
+            return
+
+        self._turn_active = True
+        try:
+            if not self.current_chat_id:
+                self.new_chat()
+            self._settle_candidates()
 
-        # 1. Add User Message
-        user_msg = {"role": "user", "content": content, "id": uuid.uuid4().hex}
-        self.chat_history.append(user_msg)
+            # 1. Add User Message
+            user_msg = {"role": "user", "content": content, "id": uuid.uuid4().hex}
+            self.chat_history.append(user_msg)
         
-        # Log Prompt Tokens (raw history before trimming)
-        raw_prompt_tokens = self.token_counter.count_messages(self.chat_history)
-        logger.info(f"Controller: User Input Received. Raw Context Tokens: {raw_prompt_tokens}")
+            # Log Prompt Tokens (raw history before trimming)
+            raw_prompt_tokens = self.token_counter.count_messages(self.chat_history)
+            logger.info(f"Controller: User Input Received. Raw Context Tokens: {raw_prompt_tokens}")
 
-        await self._safe_refresh()
+            await self._safe_refresh()
             
-        # 2. Persist
-        self._persist()
+            # 2. Persist
+            await self._persist()
         
-        # 3. Generate Response
-        # Create a placeholder for assistant
-        assistant_msg = {"role": "assistant", "content": "", "id": uuid.uuid4().hex}
-        self.chat_history.append(assistant_msg)
+            # 3. Generate Response
+            # Create a placeholder for assistant
+            assistant_msg = {"role": "assistant", "content": "", "id": uuid.uuid4().hex}
+            self.chat_history.append(assistant_msg)
         
-        await self._execute_generation(content, assistant_msg)
+            await self._execute_generation(content, assistant_msg)
+        finally:
+            self._turn_active = False
+
+    async def _build_rolling_context(self, user_content: str, history: list, num_ctx: int, target_ctx: int,
+                                     wanted: Dict[str, int]) -> tuple[list, bool, bool, bool]:
+        """
+        Default context: a fresh system prompt (with recall) each turn and the newest
+        history that fits. Returns (messages, trimmed, summarized, system_trimmed).
+        """
+        system_sections, plan, capped = self._plan_sections(self.build_system_sections(), num_ctx, wanted)
+        recall_budget = plan["sections"]["recall"]["granted"]
+        history_target = target_ctx - recall_budget
+        context_messages = [{"role": "system", "content": render_sections(system_sections)}] + self._older_pinned + history
+        context_messages, trimmed = self._trim_context_messages(context_messages, history_target)
+        trimmed = trimmed or self.history_offset > 0
+        summarized = False
+        if trimmed:
+            # Evicted turns are replaced by the chat's rolling summary (kept up to date in the background)
+            context_messages, summarized = await self._apply_history_summary(history, context_messages, history_target)
+
+        # Long-term recall: relevant past moments that are not already in the prompt
+        in_context = {m.get("id") for m in context_messages if m.get("id")}
+        recall_block = await self.recall_service.recall(user_content, exclude_refs=in_context,
+                                                        token_budget=recall_budget) if recall_budget else ""
+        if recall_block and context_messages and context_messages[0].get("role") == "system":
+            # Recalled moments are the first thing to go if the prompt is still too long
+            system_sections.append({"name": "recall", "text": recall_block, "priority": 0, "prefix": "\n"})
+            context_messages[0] = {**context_messages[0], "content": render_sections(system_sections)}
+
+        context_messages, system_trimmed = self._ensure_system_prompt_fits(context_messages, target_ctx, system_sections)
+        self._record_context_plan(plan, [s for s in system_sections if s["name"] != "recall"], context_messages,
+                                  recall_block, context_messages[1]["content"] if summarized else None, "rolling")
+        return context_messages, trimmed, summarized, system_trimmed or capped
+
+    async def _build_stable_context(self, user_content: str, history: list, num_ctx: int, target_ctx: int,
+                                    wanted: Dict[str, int]) -> tuple[list, bool, bool, bool]:
+        """
+        Prefix-stable context for Ollama's prompt cache: the system block is frozen for the
+        chat session and history is cut in large blocks, so consecutive turns share the
+        whole prompt prefix and only the new messages need prefill. Per-turn content
+        (recall) goes right before the latest message. Same return as _build_rolling_context.
+        """
+        state = self._stable_context
+        if not state or state["chat_id"] != self.current_chat_id:
+            sections, _, capped = self._plan_sections(self.build_system_sections(), num_ctx, wanted)
+            system_budget = target_ctx // 2 - (self.token_counter.message_cost({"role": "system", "content": ""}))
+            sections, system_trimmed = fit_sections(sections, system_budget, self.token_counter)
+            system_trimmed = system_trimmed or capped
+            state = self._stable_context = {
+                "chat_id": self.current_chat_id,
+                "sections": sections,
+                "system": {"role": "system", "content": render_sections(sections)},
+                "system_trimmed": system_trimmed,
+                "cut": 0, "cut_id": None, "summary": None,
+            }
+            logger.info("Controller: Froze system prompt for this chat (stable prefix mode).")
+
+        # Sections are frozen (already within their shares); the plan still follows recall and history
+        _, plan, _ = self._plan_sections(state["sections"], num_ctx, wanted)
+        recall_budget = plan["sections"]["recall"]["granted"]
+        history_target = target_ctx - recall_budget
+
+        # The cut is a position in the whole chat; history starts at history_offset.
+        # A regenerated or edited history before the cut invalidates it
+        offset = self.history_offset
+        cut = state["cut"]
+        if cut and (cut > offset + len(history) or (cut > offset and state["cut_id"] is not None
+                                                      and history[cut - offset - 1].get("id") != state["cut_id"])):
+            state.update(cut=0, cut_id=None, summary=None)
+
+        def assemble() -> list:
+            head = [state["system"]] + ([state["summary"]] if state["summary"] else [])
+            local_cut = max(0, state["cut"] - offset)
+            older = self._older_pinned + [m for m in history[:local_cut] if m.get("pinned")]
+            return head + older + history[local_cut:]
+
+        messages = assemble()
+        if self.token_counter.count_messages(messages) > history_target or state["cut"] < offset:
+            # Free a whole block at once; the following turns then only append
+            low_target = int(history_target * (1 - STABLE_TRIM_BLOCK))
+            trimmed_messages, _ = self._trim_context_messages([state["system"]] + self._older_pinned + history, low_target)
+            trimmed_messages, summarized = await self._apply_history_summary(history, trimmed_messages, low_target)
+            cut = self._evicted_prefix(history, trimmed_messages)
+            state.update(cut=offset + cut, cut_id=history[cut - 1].get("id") if cut else None,
+                         summary=trimmed_messages[1] if summarized else None)
+            logger.info(f"Controller: Stable prefix moved past {cut} messages.")
+            messages = assemble()
+
+        in_context = {m.get("id") for m in messages if m.get("id")}
+        recall_block = await self.recall_service.recall(user_content, exclude_refs=in_context,
+                                                        token_budget=recall_budget) if recall_budget else ""
+        if recall_block and len(messages) > 1:
+            messages.insert(len(messages) - 1, {"role": "system", "content": recall_block.strip()})
+
+        # Only an oversized latest message can still overflow; then the prefix has to give
+        messages, system_trimmed = self._ensure_system_prompt_fits(messages, target_ctx, state["sections"])
+        self._record_context_plan(plan, state["sections"], messages, recall_block,
+                                  state["summary"]["content"] if state["summary"] else None, "stable")
+        return messages, state["cut"] > 0, state["summary"] is not None, system_trimmed or state["system_trimmed"]
+
+    async def _build_context(self, user_content: str, context_history: list) -> tuple[list, bool, bool, bool, bool]:
+        """
+        Builds the prompt for a reply to user_content in the configured context mode.
+        Returns (messages, trimmed, summarized, system_trimmed, stable).
+        """
+        # Every section gets its share of num_ctx (see token_budget); history gets the rest
+        max_ctx, target_ctx = self._context_window()
+        summary = await self.summary_service.load(self.current_chat_id) if self.current_chat_id else None
+        wanted = {
+            "recall": self.recall_service.token_budget if self.recall_service.ready else 0,
+            "summary": self.token_counter.count_cached(self.summary_service.block(summary)) if summary and summary.get("text") else 0,
+            "recent": self.token_counter.count_messages(context_history),
+        }
+        stable = bool(self.settings.get('stable_prefix'))
+        if stable:
+            context_messages, trimmed, summarized, system_trimmed = await self._build_stable_context(
+                user_content, context_history, max_ctx, target_ctx, wanted)
+        else:
+            context_messages, trimmed, summarized, system_trimmed = await self._build_rolling_context(
+                user_content, context_history, max_ctx, target_ctx, wanted)
+        return context_messages, trimmed, summarized, system_trimmed, stable
 
     async def _execute_generation(self, user_content: str, assistant_msg: dict):
         """Core generation logic used by handle_user_input and regenerate."""
+        turn = {"started": time.perf_counter()}  # Timestamps for the turn telemetry
+        await self._ensure_context_history()
          # Router Decision
         target_node = await self.brain_router.route_query('chat', {'msg': user_content})
         target_url = self.brain_router.get_active_url(target_node)
         logger.info(f"Controller: Routing generation to {target_node} ({target_url})")
         
         # Build Context (System + History)
-        system_prompt = self.build_system_prompt()
         # Note: Chat history already contains the assistant_msg placeholder at the end
         # We need context to exclude it for the prompt
         context_history = self.chat_history[:-1] # Exclude empty placeholder
-        
-        context_messages = [{"role": "system", "content": system_prompt}] + context_history
+        context_messages, trimmed, summarized, system_trimmed, stable = await self._build_context(
+            user_content, context_history)
 
-        # Trim context to fit target window
-        max_ctx = self.brain_router.llm_config.get("consciousness_5070ti", {}).get("options", {}).get("num_ctx", 8192)
-        target_ctx = self._calc_context_target(max_ctx)
-        context_messages, trimmed = self._trim_context_messages(context_messages, target_ctx)
-        context_messages, system_trimmed = self._ensure_system_prompt_fits(context_messages, target_ctx)
+        turn["context_built"] = time.perf_counter()
         prompt_tokens = self.token_counter.count_messages(context_messages)
+        turn["tokenize_s"] = time.perf_counter() - turn["context_built"]
         self.current_token_count = prompt_tokens
         if trimmed or system_trimmed:
             logger.warning("Controller: Context trimmed to fit the context window.")
@@ -954,7 +1524,6 @@ class Controller:
         await self._safe_refresh()
         
         # Stream response
-        full_response = ""
         model_to_use = self.brain_router.LOCAL_MODEL
         target_node_alias = 'local'
         if target_node == 'remote':
@@ -965,10 +1534,93 @@ class Controller:
         gen_options = self.brain_router.get_model_options(target_node_alias)
         logger.info(f"Controller: Using Options: {gen_options}")
 
+        keep_alive = self._keep_alive(target_node_alias, stable)
+        # Auto-read starts with the first complete sentence instead of after the whole reply
+        should_autoplay = self.settings.get('tts_autoplay', False)
+        logger.info(f"Controller: Checking Auto-Read. Enabled={should_autoplay}")
+        if should_autoplay:
+            self._begin_streamed_tts(assistant_msg['id'])
+
+        tts_stream = self._tts_stream
+
+        self._generation_cancelled = False
+        turn["requested"] = time.perf_counter()
+        self._generation_task = asyncio.create_task(self._stream_reply(
+            assistant_msg, model_to_use, context_messages, target_url, gen_options, keep_alive, prompt_tokens, stable,
+            turn))
+        try:
+            await self._generation_task
+        except asyncio.CancelledError:
+            if not self._generation_cancelled:
+                raise  # Not the stop button (e.g. shutdown)
+        stopped = self._generation_cancelled
+        self._generation_cancelled = False
+        if turn.get("ollama"):
+            self.last_generation_stats = turn["ollama"]
+        if stopped:
+            assistant_msg['content'] = f"{assistant_msg['content']}{STOPPED_MARKER}"
+        self._finish_streamed_tts(assistant_msg['id'], stopped)
+
+        # Append a brief notice if trimming occurred (and no summary stood in for the dropped turns)
+        if trimmed and not summarized:
+            assistant_msg['content'] = (
+                f"{assistant_msg['content']}\n\nNote: earlier messages were trimmed to fit the context window."
+            )
+
+        # Final Refresh to ensure complete message consistency
+        await self._safe_refresh()
+
+        # Count before persisting so the reply is saved with its token count
+        counted = time.perf_counter()
+        final_tokens = self._older_tokens + self.token_counter.count_messages(self.chat_history)
+        turn["tokenize_s"] += time.perf_counter() - counted
+
+        # 4. Persist Final
+        persist_start = time.perf_counter()
+        await self._persist()
+        turn["persisted"] = time.perf_counter()
+        turn["persist_s"] = turn["persisted"] - persist_start
+        self.recall_service.schedule_refresh()
+        self._record_turn_metrics(turn, tts_stream)
+
+        # Log Completion Tokens
+        completion_tokens = final_tokens - prompt_tokens
+        self.current_token_count = final_tokens
+        
+        logger.info(f"Controller: Response complete. Completion: {completion_tokens} toks. Total: {final_tokens} toks.")
+
+    def _record_turn_metrics(self, turn: Dict[str, Any], tts_stream: Optional[Dict[str, Any]]):
+        """Adds a finished turn's timings to the rolling telemetry."""
+        ms = 1000.0
+        start, requested = turn["started"], turn["requested"]
+        ollama = turn.get("ollama") or {}
+        gen_ms = ollama.get("generation_ms") or 0
+        first_token = turn.get("first_token")
+        first_audio = tts_stream.get("started") if tts_stream else None
+        self.turn_metrics.record({
+            "context_ms": (turn["context_built"] - start) * ms,
+            "tokenize_ms": turn["tokenize_s"] * ms,
+            "prefill_ms": ollama.get("prefill_ms"),
+            "ttft_ms": (first_token - requested) * ms if first_token else None,
+            "tokens_per_s": ollama["completion_tokens"] / (gen_ms / ms) if gen_ms and ollama.get("completion_tokens") else None,
+            "persist_ms": turn["persist_s"] * ms,
+            "tts_first_ms": (first_audio - requested) * ms if first_audio else None,
+            "total_ms": (turn["persisted"] - start) * ms,
+        })
+
+    async def _stream_reply(self, assistant_msg: dict, model: str, messages: list, host: str, options: dict,
+                            keep_alive, prompt_tokens: int, stable: bool, turn: Dict[str, Any]):
+        """
+        Streams the model's reply into assistant_msg (runs as the task cancel_generation stops).
+        Notes the first token time and Ollama's final timings in `turn`.
+        """
+        full_response = ""
         try:
             # Direct iteration - asyncio.wait_for cannot wrap an async generator for 'async for'
-            async for chunk in self._generate_with_timeout(model_to_use, context_messages, target_url, gen_options):
-                
+            async for chunk in self._generate_with_timeout(model, messages, host, options, keep_alive):
+                if chunk.get("done"):
+                    turn["ollama"] = self._record_generation_stats(chunk, prompt_tokens, stable)
+
                 # Ollama chunk format: {'message': {'role': 'assistant', 'content': '...'}, 'done': False}
                 if "message" in chunk:
                     msg_obj = chunk['message']
@@ -984,8 +1636,12 @@ class Controller:
 
                     assistant_msg['content'] = full_response
 
-                    # Targeted Update (No Flash)
-                    await self._safe_stream(assistant_msg['id'], full_response)
+                    # Targeted Update (No Flash): only the new text goes to the view;
+                    # the final refresh below renders the finished message once
+                    if content_bit:
+                        turn.setdefault("first_token", time.perf_counter())
+                        await self._safe_stream(assistant_msg['id'], content_bit)
+                        self._feed_streamed_tts(assistant_msg['id'], content_bit)
 
                 elif "error" in chunk:
                     assistant_msg['content'] = f"Error: {chunk['error']}"
@@ -997,45 +1653,54 @@ class Controller:
                     assistant_msg['content'] = f"Error during generation: {str(e)}"
                     await self._safe_refresh()
 
-        # Append a brief notice if trimming occurred
-        if trimmed:
-            assistant_msg['content'] = (
-                f"{assistant_msg['content']}\n\nNote: earlier messages were trimmed to fit the context window."
-            )
-
-        # Final Refresh to ensure complete message consistency
-        await self._safe_refresh()
-        
-        # 4. Persist Final
-        self._persist()
-        
-        # Auto-read
-        should_autoplay = self.settings.get('tts_autoplay', False)
-        logger.info(f"Controller: Checking Auto-Read. Enabled={should_autoplay}")
-        if should_autoplay:
-                logger.info("Controller: Triggering Auto-Read...")
-                await self.toggle_tts(assistant_msg['id'], assistant_msg['content'])
-        
-        # Log Completion Tokens
-        final_tokens = self.token_counter.count_messages(self.chat_history)
-        completion_tokens = final_tokens - prompt_tokens
-        self.current_token_count = final_tokens
-        
-        logger.info(f"Controller: Response complete. Completion: {completion_tokens} toks. Total: {final_tokens} toks.")
-
-    def _persist(self):
-        """Saves current state to memory."""
+    async def _persist(self):
+        """Saves current state to memory (off the event loop)."""
         if self.current_chat_id:
+            # Only the loaded tail is saved; messages before history_offset stay as they are on disk.
+            # Unchosen candidates are not: the shown one is saved as the reply, the chosen one replaces it.
+            messages = [{k: v for k, v in m.items() if k != 'candidates'} if 'candidates' in m else m
+                        for m in self.chat_history]
             data = {
                 "id": self.current_chat_id,
                 "created_at": self.current_chat_created_at,
-                "messages": self.chat_history
+                "messages": messages,
+                "offset": self.history_offset
             }
-            self.memory.save_chat(self.current_chat_id, data)
+            await self.store.save_chat(self.current_chat_id, data)
+
+    async def get_grouped_history(self, limit: Optional[int] = None, before_cursor: Optional[str] = None):
+        """Retrieves and groups chat history (one page when `limit` is given)."""
+        groups, _ = await self.get_history_page(limit, before_cursor)
+        return groups
+
+    async def get_history_page(self, limit: Optional[int] = HISTORY_PAGE_SIZE, before_cursor: Optional[str] = None):
+        """
+        Retrieves one page of grouped chat history.
+        Returns (groups, next_cursor); next_cursor is None once the last page is reached.
+        """
+        chats = await self.store.list_chats(limit, before_cursor)
+        next_cursor = None
+        if limit and len(chats) == limit:
+            next_cursor = Memory.chat_cursor(chats[-1])
+        return self._group_chats(chats), next_cursor
+
+    def current_chat_entry(self) -> Optional[Dict[str, Any]]:
+        """
+        Sidebar entry of the open chat with its date "group" (None while it is empty).
+        "preview" is None when the chat's first message is not loaded (it cannot have changed).
+        """
+        if not self.current_chat_id or not self.chat_history:
+            return None
+        entry = {
+            "id": self.current_chat_id,
+            "created_at": self.current_chat_created_at,
+            "preview": None if self.history_offset else build_preview(self.chat_history),
+        }
+        entry["group"] = next(name for name, chats in self._group_chats([entry]).items() if chats)
+        return entry
 
-    async def get_grouped_history(self):
-        """Retrieves and groups chat history."""
-        chats = self.memory.list_chats()
+    def _group_chats(self, chats: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Buckets chats (newest first) by logical date."""
         groups = {
             "Today": [],
             "Yesterday": [],
@@ -21,6 +21,7 @@ ALLOWED_HANDLERS = frozenset({
     'set_sys_top_p',
     'set_sys_repeat_penalty',
     'set_sys_context_window',
+    'set_stable_prefix',
     # Memory Agent (ErikaHQ)
     'set_mem_temperature',
     'set_mem_top_p',
@@ -141,6 +142,14 @@ SETTINGS_CONFIG = [
                         "key": "sys_context_window",
                         "change_handler": "set_sys_context_window"
                     },
+                    {
+                        "type": "toggle",
+                        "label": "Stable Prompt Prefix",
+                        "sub": "Freeze the system prompt per chat and trim history in blocks so the model can reuse its prompt cache.",
+                        "default": False,
+                        "key": "stable_prefix",
+                        "change_handler": "set_stable_prefix"
+                    },
                     {
                         "type": "separator"
                     },
@@ -49,6 +49,7 @@ class StatusDashboard:
                     # Custom CSS Progress Bar to avoid unwanted text
                     with ui.element('div').classes('w-full h-2 bg-gray-800 rounded-full mt-2 overflow-hidden'):
                          self.ctx_bar_inner = ui.element('div').classes('h-full bg-blue-500 transition-all duration-300').style('width: 0%')
+                    self.prefill_label = ui.label('Prefill: --').classes('text-sm text-gray-300 font-mono')
                 
                 # 3. Brain Status
                 with ui.card().classes('bg-white/5 border border-white/5 p-4 gap-2'):
@@ -56,6 +57,16 @@ class StatusDashboard:
                     self.local_status = ui.label('Consciousness (Local): --').classes('text-sm text-gray-300')
                     self.remote_status = ui.label('Subconscious (Remote): --').classes('text-sm text-gray-300')
 
+            # Turn Telemetry (Full Width)
+            with ui.card().classes('bg-white/5 border border-white/5 p-4 w-full gap-2'):
+                 ui.label('Turn Telemetry').classes('text-xs font-bold text-gray-400 uppercase tracking-wider mb-2')
+                 self.telemetry_container = ui.column().classes('w-full gap-1')
+
+            # Prompt Budget (Full Width)
+            with ui.card().classes('bg-white/5 border border-white/5 p-4 w-full gap-2'):
+                 ui.label('Prompt Budget').classes('text-xs font-bold text-gray-400 uppercase tracking-wider mb-2')
+                 self.budget_container = ui.column().classes('w-full gap-1')
+
             # MCP Servers (Full Width)
             with ui.card().classes('bg-white/5 border border-white/5 p-4 w-full gap-2'):
                  ui.label('MCP Capabilities').classes('text-xs font-bold text-gray-400 uppercase tracking-wider mb-2')
@@ -84,6 +95,13 @@ class StatusDashboard:
             pct = curr / maxx if maxx > 0 else 0
             self.ctx_label.set_text(f"Context: {curr} / {maxx} ({pct*100:.1f}%)")
             self.ctx_bar_inner.style(f'width: {pct*100}%')
+
+            gen = stats.get('generation') or {}
+            if gen:
+                self.prefill_label.set_text(
+                    f"Prefill: {gen.get('prefill_ms', 0):.0f} ms "
+                    f"({gen.get('prefill_tokens', 0)}/{gen.get('prompt_tokens', 0)} tok, {gen.get('mode', '')})"
+                )
             
             # 3. Brain
             l_stat = "Online" if stats['brain']['local'] else "Offline"
@@ -95,7 +113,47 @@ class StatusDashboard:
             self.remote_status.set_text(f"Subconscious (Remote): {r_stat}")
             self.remote_status.classes(remove='text-green-400 text-red-400', add='text-green-400' if stats['brain']['remote'] else 'text-red-400')
             
-            # 4. MCP
+            # 4. Telemetry (rolling percentiles over recent turns)
+            self.telemetry_container.clear()
+            with self.telemetry_container:
+                telemetry = stats.get('telemetry') or {}
+                if not telemetry:
+                    ui.label('No turns measured yet').classes('text-xs text-gray-600 italic')
+                else:
+                    with ui.grid(columns=5).classes('w-full gap-x-4 gap-y-1 text-sm font-mono'):
+                        for head in ('Metric', 'p50', 'p95', 'Last', 'Turns'):
+                            ui.label(head).classes('text-xs text-gray-500')
+                        for metric in telemetry.values():
+                            unit = metric['unit']
+                            ui.label(metric['label']).classes('text-gray-300')
+                            for key in ('p50', 'p95', 'last'):
+                                value = metric.get(key)
+                                ui.label(f"{value:.1f} {unit}" if value is not None else "--").classes('text-gray-300')
+                            ui.label(str(metric['n'])).classes('text-gray-500')
+
+            # 5. Prompt budget of the last turn (share of num_ctx per section, and what it used)
+            self.budget_container.clear()
+            with self.budget_container:
+                plan = stats.get('context_plan') or {}
+                if not plan:
+                    ui.label('No prompt built yet').classes('text-xs text-gray-600 italic')
+                else:
+                    ui.label(f"{plan['prompt_tokens']} / {plan['num_ctx']} tokens ({plan['mode']} context)").classes('text-sm text-gray-300 font-mono')
+                    with ui.grid(columns=5).classes('w-full gap-x-4 gap-y-1 text-sm font-mono'):
+                        for head in ('Section', 'Share', 'Budget', 'Used', ''):
+                            ui.label(head).classes('text-xs text-gray-500')
+                        for entry in plan['sections'].values():
+                            budget = entry['budget']
+                            used = entry.get('used', 0)
+                            ui.label(entry['label']).classes('text-gray-300')
+                            ui.label(f"{entry['share'] * 100:.0f}%").classes('text-gray-500')
+                            ui.label(str(budget)).classes('text-gray-300')
+                            ui.label(str(used)).classes('text-red-400' if used > budget else 'text-gray-300')
+                            with ui.element('div').classes('w-full h-2 bg-gray-800 rounded-full mt-2 overflow-hidden'):
+                                pct = min(100.0, used / budget * 100) if budget else 0
+                                ui.element('div').classes('h-full bg-blue-500').style(f'width: {pct}%')
+
+            # 6. MCP
             self.mcp_container.clear()
             with self.mcp_container:
                 for srv in stats['mcp']:
@@ -1,9 +1,11 @@
 from nicegui import ui
 import asyncio
+import json
 import logging
 from interface.controller import Controller
 from interface.settings_ui import build_settings_modal
 from interface.status_ui import open_dashboard
+from engine.modules.stream_coalescer import StreamCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +141,19 @@ def build_ui(controller: Controller):
                 document.documentElement.style.setProperty('--accent-primary', color);
             }
 
+            // Streaming: raw text is appended to the bubble until the finished reply is rendered as markdown
+            window.appendStreamText = (id, text) => {
+                const el = getHtmlElement(id);
+                if (!el) return;
+                let tail = el.querySelector(':scope > .stream-tail');
+                if (!tail) {
+                    tail = document.createElement('span');
+                    tail.className = 'stream-tail whitespace-pre-wrap';
+                    el.appendChild(tail);
+                }
+                tail.append(text);
+            }
+
             // Code Block Copy Button Observer
             const observer = new MutationObserver((mutations) => {
                 mutations.forEach((mutation) => {
@@ -178,11 +193,17 @@ def build_ui(controller: Controller):
     
     # Track UI elements for direct updates
     message_elements = {}
+    stream_coalescer = StreamCoalescer(lambda msg_id, text: send_stream_text(msg_id, text))  # ~25 updates/s
+    history_state = {'cursor': None, 'loading': False, 'last_group': None}  # Sidebar pagination
+    # Rendered sidebar: chat_id -> {'row', 'icon', 'label', 'preview', 'group'}, group -> header label
+    sidebar = {'ready': False, 'rows': {}, 'headers': {}, 'empty': None, 'active': None, 'newest': ''}
+    chat_window_state = {'loading': False}  # Tail-first chat loading
 
     @ui.refreshable
     def render_chat_history():
         """Renders the chat stream with high-fidelity avatars and bubbles."""
         message_elements.clear()
+        stream_coalescer.discard()  # Re-rendered bubbles already show everything streamed so far
         
         # 1. Empty State - Hero
         if not controller.chat_history:
@@ -192,8 +213,12 @@ def build_ui(controller: Controller):
                 ui.label('How can I help you today?').classes('text-2xl font-light text-gray-400')
             return
 
-        # 2. Chat List
-        for msg in controller.chat_history:
+        # 2. Chat List (windowed: older messages load on demand)
+        if controller.has_earlier_messages:
+            with ui.row().classes('w-full justify-center mb-4'):
+                ui.button('Load earlier messages', on_click=lambda: load_earlier_messages()).props('flat dense size=sm').classes('text-xs text-gray-500 hover:text-white')
+
+        for msg in controller.chat_history[controller.render_start:]:
             is_user = msg['role'] == 'user'
             
             # Row Layout
@@ -208,7 +233,8 @@ def build_ui(controller: Controller):
                          ui.image('/assets/ErikaLogo_small.png').classes('w-10 h-10 rounded-full object-cover bg-black/20 border border-white/5')
 
                 # --- MESSAGE COLUMN (Bubble + Actions) ---
-                width_cls = 'max-w-[75%]' # Limit width
+                candidates = msg.get('candidates')
+                width_cls = 'flex-1 min-w-0' if candidates else 'max-w-[75%]' # Limit width (alternatives get the row)
                 bubble_cls = 'msg-bubble-user p-4' if is_user else 'msg-bubble-ai p-5'
                 
                 # Dynamic Accent Override for User Bubble
@@ -221,13 +247,25 @@ def build_ui(controller: Controller):
                             ui.icon('push_pin', size='xs').classes('text-yellow-400 rotate-45')
                             ui.label('Pinned').classes('text-[10px] uppercase font-bold text-yellow-500')
 
-                    with ui.column().classes(f'w-full {bubble_cls}').style(f'contain: layout; {style_override}'):
-                        if is_user:
-                            ui.label(msg['content']).classes('text-base leading-relaxed whitespace-pre-wrap')
-                        else:
-                            md_el = ui.markdown(msg['content']).classes('text-base leading-relaxed w-full prose text-slate-300 prose-invert prose-p:my-1 prose-headings:text-slate-100 prose-pre:bg-black/50 prose-pre:border prose-pre:border-white/10')
-                            if 'id' in msg:
-                                message_elements[msg['id']] = md_el
+                    if candidates:
+                        # Alternative replies, streamed side by side until one is chosen
+                        with ui.row().classes('w-full gap-3 no-wrap items-stretch'):
+                            for cand in candidates:
+                                with ui.column().classes('flex-1 min-w-0 msg-bubble-ai p-4 gap-2').style('contain: layout;'):
+                                    ui.label(f"{cand.get('node', '')} · {cand.get('model', '')}").classes('text-[10px] uppercase font-bold text-gray-500')
+                                    cand_el = ui.markdown(cand['content']).classes('text-base leading-relaxed w-full prose text-slate-300 prose-invert prose-p:my-1 prose-pre:bg-black/50')
+                                    message_elements[cand['id']] = cand_el
+                                    ui.button('Use this', icon='check', on_click=lambda mid=msg['id'], cid=cand['id']: controller.choose_candidate(mid, cid))\
+                                        .props('flat dense size=sm').classes('self-end text-gray-400 hover:text-green-400')\
+                                        .bind_visibility_from(controller, 'is_generating', backward=lambda busy: not busy)
+                    else:
+                        with ui.column().classes(f'w-full {bubble_cls}').style(f'contain: layout; {style_override}'):
+                            if is_user:
+                                ui.label(msg['content']).classes('text-base leading-relaxed whitespace-pre-wrap')
+                            else:
+                                md_el = ui.markdown(msg['content']).classes('text-base leading-relaxed w-full prose text-slate-300 prose-invert prose-p:my-1 prose-headings:text-slate-100 prose-pre:bg-black/50 prose-pre:border prose-pre:border-white/10')
+                                if 'id' in msg:
+                                    message_elements[msg['id']] = md_el
                     
                     # Footer Actions (Row)
                     if not is_user:
@@ -253,9 +291,12 @@ def build_ui(controller: Controller):
                              pin_color = 'text-yellow-400' if is_pinned else 'text-gray-500 hover:text-yellow-400'
                              ui.button(icon=pin_icon, on_click=lambda mid=msg_id: controller.pin_message(mid)).props('flat round dense size=xs aria-label="Pin Message"').classes(f'{pin_color} transition-colors')
                              
-                             # Regenerate (Only if it's the LAST message)
-                             if msg == controller.chat_history[-1]:
-                                 ui.button(icon='refresh', on_click=lambda: controller.regenerate_last_message()).props('flat round dense size=xs aria-label="Regenerate Response"').classes('text-gray-500 hover:text-green-400 transition-colors')
+                             # Regenerate (Only if it's the LAST message, and not while a reply streams)
+                             if msg is controller.chat_history[-1]:
+                                 ui.button(icon='refresh', on_click=lambda: controller.regenerate_last_message()).props('flat round dense size=xs aria-label="Regenerate Response"').classes('text-gray-500 hover:text-green-400 transition-colors')\
+                                     .bind_visibility_from(controller, 'is_generating', backward=lambda busy: not busy)
+                                 ui.button(icon='call_split', on_click=lambda: regenerate_alternatives()).props('flat round dense size=xs aria-label="Generate Alternatives"').classes('text-gray-500 hover:text-green-400 transition-colors')\
+                                     .bind_visibility_from(controller, 'is_generating', backward=lambda busy: not busy)
 
                 # --- USER AVATAR (Right) ---
                 if is_user:
@@ -283,7 +324,7 @@ def build_ui(controller: Controller):
             ui.label('History').classes('text-xs font-semibold text-gray-500 uppercase tracking-wider mb-3 px-2')
             
             # Scrollable History
-            scroll_list = ui.scroll_area().classes('flex-1 w-full -mx-2 px-2')
+            scroll_list = ui.scroll_area(on_scroll=lambda e: on_history_scroll(e)).classes('flex-1 w-full -mx-2 px-2')
             
             # User Account / Settings Footnote
             with ui.row().classes('w-full border-t border-white/5 pt-4 mt-auto items-center gap-3 cursor-pointer sidebar-btn p-2 rounded-lg').on('click', settings_dialog.open):
@@ -322,7 +363,7 @@ def build_ui(controller: Controller):
                 #     ui.icon('expand_more', size='xs')
 
             # Chat Stream (Scroll Area)
-            with ui.scroll_area().classes('w-full flex-1 p-0 pb-40') as chat_scroll:
+            with ui.scroll_area(on_scroll=lambda e: on_chat_scroll(e)).classes('w-full flex-1 p-0 pb-40') as chat_scroll:
                  # Container for messages
                  with ui.column().classes('w-full h-full pt-4'):
                     render_chat_history()
@@ -347,12 +388,18 @@ def build_ui(controller: Controller):
                         # Send Button
                         async def send():
                             val = text_input.value
-                            if not val: return
+                            if not val or controller.is_generating: return  # Keep the draft until the reply is done
                             text_input.value = ''
                             await controller.handle_user_input(val)
                             
-                        with ui.button(on_click=send).classes('send-btn rounded-full w-10 h-10 flex items-center justify-center shadow-lg unstyled'):
+                        with ui.button(on_click=send).classes('send-btn rounded-full w-10 h-10 flex items-center justify-center shadow-lg unstyled') \
+                                .bind_visibility_from(controller, 'is_generating', backward=lambda busy: not busy):
                              ui.icon('arrow_upward', size='xs')
+
+                        # Stop Button (replaces Send while a reply is streaming)
+                        with ui.button(on_click=controller.cancel_generation).classes('send-btn rounded-full w-10 h-10 flex items-center justify-center shadow-lg unstyled') \
+                                .props('aria-label="Stop generating"').bind_visibility_from(controller, 'is_generating'):
+                             ui.icon('stop', size='xs')
                         
                         text_input.on('keydown.enter', send)
 
@@ -373,7 +420,8 @@ def build_ui(controller: Controller):
                  if cid:
                      logger.info(f"UI: Deleting chat {cid}")
                      delete_dialog.close()
-                     await controller.request_delete_chat(cid)
+                     if await controller.request_delete_chat(cid):
+                         remove_sidebar_row(cid)
                      
              ui.button('Delete', color='red', on_click=perform_delete).props('flat')
              
@@ -395,60 +443,193 @@ def build_ui(controller: Controller):
         with user_avatar_ui:
              ui.label(uname[0].upper() if uname else 'U')
 
-        # Refresh Sidebar
-        grouped_chats = await controller.get_grouped_history()
+        await update_sidebar()
+
+    async def reload_sidebar():
+        """Renders the first page of the sidebar from scratch (further pages load on scroll)."""
+        groups, next_cursor = await controller.get_history_page()
         scroll_list.clear()
-        
+        history_state.update({'cursor': next_cursor, 'loading': False, 'last_group': None})
+        sidebar.update({'ready': True, 'rows': {}, 'headers': {}, 'empty': None,
+                        'active': controller.current_chat_id, 'newest': ''})
+
         with scroll_list:
-            has_history = False
-            for group_name, chats in grouped_chats.items():
-                if not chats: continue
-                has_history = True
-                
-                # Group Header
-                ui.label(group_name).classes('text-[10px] font-bold text-gray-600 uppercase tracking-widest mt-4 mb-2 pl-2')
-                
-                for chat in chats:
-                     # Calculate time hint
-                     preview = chat.get('preview', 'New Chat')
-                     chat_id = chat['id']
-                     
-                     # Async Handler Factories (Closures) to preserve Context
-                     def make_load_handler(cid):
-                         async def _load():
-                             await controller.load_chat_session(cid)
-                         return _load
-
-                     def make_delete_handler(cid):
-                         def _del():
-                             open_delete_confirm(cid)
-                         return _del
-                     
-                     with ui.row().classes('sidebar-btn w-full p-2 mb-1 cursor-pointer items-center gap-3').on('click', make_load_handler(chat_id)):
-                        
-                        # Active Indicator
-                        is_active = controller.current_chat_id == chat_id
-                        icon = 'chat_bubble' if is_active else 'chat_bubble_outline'
-                        icon_color = 'text-blue-400' if is_active else 'text-gray-600'
-                        
-                        ui.icon(icon, size='xs').classes(f'{icon_color}')
-                        ui.label(preview).classes(f'text-sm truncate flex-1 { "text-white" if is_active else "text-gray-400" }')
-                        
-                        with ui.context_menu():
-                            ui.menu_item('Delete', on_click=make_delete_handler(chat_id)).classes('text-red-400')
-            
+            has_history = render_history_page(groups)
             if not has_history:
-                 ui.label('No history yet').classes('text-xs text-gray-600 p-2 italic')
-
+                sidebar['empty'] = ui.label('No history yet').classes('text-xs text-gray-600 p-2 italic')
+
+    async def update_sidebar():
+        """
+        Brings the sidebar in line with the open chat: a new chat is prepended, a changed
+        preview relabelled and the active marker moved. Everything else stays as rendered.
+        """
+        if not sidebar['ready']:
+            await reload_sidebar()
+            return
 
-    async def update_stream(msg_id: str, content: str):
-        """Directly updates a bubble without full re-render."""
-        if msg_id in message_elements:
-             try:
-                 message_elements[msg_id].set_content(content)
-                 chat_scroll.scroll_to(percent=1.0)
-             except Exception:
-                 pass # Element might be dead
+        entry = controller.current_chat_entry()
+        if entry:
+            shown = sidebar['rows'].get(entry['id'])
+            if shown is None and (entry.get('created_at') or '') > sidebar['newest']:
+                prepend_sidebar_row(entry)
+            elif shown is not None and entry['preview'] is not None and entry['preview'] != shown['preview']:
+                shown['preview'] = entry['preview']
+                shown['label'].set_text(entry['preview'])
+        mark_active_row(controller.current_chat_id)
+
+    def render_chat_row(chat) -> dict:
+        """Renders one sidebar entry and registers it in `sidebar`."""
+        preview = chat.get('preview', 'New Chat')
+        chat_id = chat['id']
+
+        # Async Handler Factories (Closures) to preserve Context
+        def make_load_handler(cid):
+            async def _load():
+                await controller.load_chat_session(cid)
+            return _load
+
+        def make_delete_handler(cid):
+            def _del():
+                open_delete_confirm(cid)
+            return _del
+
+        with ui.row().classes('sidebar-btn w-full p-2 mb-1 cursor-pointer items-center gap-3').on('click', make_load_handler(chat_id)) as row:
+
+            # Active Indicator
+            is_active = controller.current_chat_id == chat_id
+            icon = 'chat_bubble' if is_active else 'chat_bubble_outline'
+            icon_color = 'text-blue-400' if is_active else 'text-gray-600'
+
+            icon_ui = ui.icon(icon, size='xs').classes(f'{icon_color}')
+            label_ui = ui.label(preview).classes(f'text-sm truncate flex-1 { "text-white" if is_active else "text-gray-400" }')
+
+            with ui.context_menu():
+                ui.menu_item('Delete', on_click=make_delete_handler(chat_id)).classes('text-red-400')
+
+        entry = {'row': row, 'icon': icon_ui, 'label': label_ui, 'preview': preview, 'group': chat.get('group')}
+        sidebar['rows'][chat_id] = entry
+        sidebar['newest'] = max(sidebar['newest'], chat.get('created_at') or '')
+        return entry
+
+    def render_history_page(grouped_chats) -> bool:
+        """Appends a page of grouped chats to the sidebar. Returns True if anything was rendered."""
+        has_history = False
+        for group_name, chats in grouped_chats.items():
+            if not chats: continue
+            has_history = True
+            
+            # Group Header (a group can continue across pages)
+            if group_name != history_state['last_group']:
+                sidebar['headers'][group_name] = ui.label(group_name).classes(
+                    'text-[10px] font-bold text-gray-600 uppercase tracking-widest mt-4 mb-2 pl-2')
+                history_state['last_group'] = group_name
+            
+            for chat in chats:
+                 render_chat_row({**chat, 'group': group_name})
+        return has_history
+
+    def prepend_sidebar_row(chat):
+        """Puts a chat newer than everything shown at the top of the sidebar."""
+        if sidebar['empty'] is not None:
+            sidebar['empty'].delete()
+            sidebar['empty'] = None
+        group = chat['group']
+        with scroll_list:
+            header = sidebar['headers'].get(group)
+            if header is None:
+                header = sidebar['headers'][group] = ui.label(group).classes(
+                    'text-[10px] font-bold text-gray-600 uppercase tracking-widest mt-4 mb-2 pl-2')
+                header.move(scroll_list, target_index=0)
+                if history_state['last_group'] is None:
+                    history_state['last_group'] = group
+            entry = render_chat_row(chat)
+        entry['row'].move(scroll_list, target_index=list(scroll_list.default_slot.children).index(header) + 1)
+
+    def remove_sidebar_row(chat_id):
+        """Drops a deleted chat (and its group header once the group is empty) from the sidebar."""
+        entry = sidebar['rows'].pop(chat_id, None)
+        if entry is None:
+            return
+        entry['row'].delete()
+        group = entry['group']
+        if group in sidebar['headers'] and not any(e['group'] == group for e in sidebar['rows'].values()):
+            sidebar['headers'].pop(group).delete()
+            if history_state['last_group'] == group:
+                history_state['last_group'] = None
+        if not sidebar['rows'] and not history_state['cursor']:
+            with scroll_list:
+                sidebar['empty'] = ui.label('No history yet').classes('text-xs text-gray-600 p-2 italic')
+
+    def mark_active_row(chat_id):
+        """Moves the active-chat marker in the sidebar."""
+        if sidebar['active'] == chat_id:
+            return
+        for cid, active in ((sidebar['active'], False), (chat_id, True)):
+            entry = sidebar['rows'].get(cid)
+            if entry is None:
+                continue
+            entry['icon'].set_name('chat_bubble' if active else 'chat_bubble_outline')
+            entry['icon'].classes(replace='text-blue-400' if active else 'text-gray-600')
+            entry['label'].classes(remove='text-gray-400 text-white', add='text-white' if active else 'text-gray-400')
+        sidebar['active'] = chat_id
+
+    async def on_history_scroll(e):
+        """Loads the next history page when the sidebar is scrolled near its end."""
+        if not history_state['cursor'] or history_state['loading'] or e.vertical_percentage < 0.9:
+            return
+        cursor = history_state['cursor']
+        history_state['loading'] = True
+        try:
+            groups, next_cursor = await controller.get_history_page(before_cursor=cursor)
+            if history_state['cursor'] != cursor:
+                return  # Sidebar was refreshed while this page loaded
+            with scroll_list:
+                render_history_page(groups)
+            history_state['cursor'] = next_cursor
+        except Exception as ex:
+            logger.error(f"UI: Failed to load more history: {ex}")
+        finally:
+            history_state['loading'] = False
+
+
+    async def load_earlier_messages():
+        """Renders the previous page of the open chat above the current window."""
+        if chat_window_state['loading']:
+            return
+        chat_window_state['loading'] = True
+        try:
+            if await controller.load_earlier_messages():
+                render_chat_history.refresh()
+        except Exception as ex:
+            logger.error(f"UI: Failed to load earlier messages: {ex}")
+        finally:
+            chat_window_state['loading'] = False
+
+    async def regenerate_alternatives():
+        """Alternatives need a second node; with only the local one online it is a plain regenerate."""
+        if not controller.alternatives_available:
+            ui.notify('Remote node offline: regenerating a single reply', type='info', position='top')
+        await controller.regenerate_candidates()
+
+    async def on_chat_scroll(e):
+        """Loads earlier messages when the chat is scrolled to the very top."""
+        if e.vertical_position <= 0 and controller.has_earlier_messages:
+            await load_earlier_messages()
+
+    def send_stream_text(msg_id: str, text: str):
+        """Appends streamed text to a bubble in the browser (no markdown pass until the reply is done)."""
+        el = message_elements.get(msg_id)
+        if el is None:
+            return
+        try:
+            el.client.run_javascript(f"appendStreamText({el.id}, {json.dumps(text)})")
+            chat_scroll.scroll_to(percent=1.0)
+        except Exception:
+            pass # Element might be dead
+
+    async def update_stream(msg_id: str, delta: str):
+        """Queues text appended to a streaming bubble; it reaches the browser once per frame."""
+        stream_coalescer.push(msg_id, delta)
 
     
     async def update_theme(color: str):
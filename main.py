@@ -35,7 +35,7 @@ UI_PORT = 3333
 
 def cleanup():
     """Cleanup handler."""
-    global lock, shutting_down, window_process, controller
+    global lock, shutting_down, window_process, controller, memory
 
     with _state_lock:
         if shutting_down:
@@ -67,6 +67,22 @@ def cleanup():
         except (RuntimeError, AttributeError) as e:
             logger.warning(f"Error stopping controller components: {e}")
 
+    # Flush queued chat saves before the process is torn down
+    if memory:
+        try:
+            if not memory.close(timeout=5.0):
+                logger.warning("Engine: Some chat saves could not be flushed in time.")
+        except Exception as e:
+            logger.error(f"Engine: Error flushing chat saves: {e}")
+
+    # Write settings changes still waiting for their debounce
+    if controller:
+        try:
+            if not controller.settings_store.close(timeout=2.0):
+                logger.warning("Engine: Some settings could not be flushed in time.")
+        except Exception as e:
+            logger.error(f"Engine: Error flushing settings: {e}")
+
     try:
         if tray and tray.icon:
             tray.icon.stop()
@@ -146,7 +162,7 @@ def restart_window():
 
 def restart_agent():
     """Restarts the entire agent process."""
-    global lock, tray, window_process
+    global lock, tray, window_process, memory, controller
     logger.info("Engine: Restarting Agent (Full Process)...")
 
     # 1. Kill Window
@@ -171,7 +187,22 @@ def restart_agent():
         except (IOError, OSError) as e:
             logger.error(f"Engine: Error releasing lock: {e}")
 
-    # 4. Restart Process - use explicit script path instead of sys.argv for security
+    # 4. Flush queued chat saves (execl replaces the process without running cleanup)
+    if memory:
+        try:
+            memory.close(timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Engine: Error flushing chat saves for restart: {e}")
+
+    # 5. Write settings changes still waiting for their debounce
+    if controller:
+        try:
+            if not controller.settings_store.close(timeout=2.0):
+                logger.warning("Engine: Some settings could not be flushed before restart.")
+        except Exception as e:
+            logger.warning(f"Engine: Error flushing settings for restart: {e}")
+
+    # 6. Restart Process - use explicit script path instead of sys.argv for security
     python = sys.executable
     script_path = os.path.abspath(__file__)
     os.execl(python, python, script_path)
@@ -207,7 +238,7 @@ def main():
     
     # 2. Init Core Components
     logger.info("Engine: Initializing Brain & Memory...")
-    memory = Memory()
+    memory = Memory(background_writes=True)
     brain = Brain()
     controller = Controller(brain, memory)
     logger.info("Engine: System Monitor Active.")
@@ -52,6 +52,36 @@ def speak(text: str, voice: str = "azelma", volume: float = 1.0,
     else:
         return "Failed to start speech."
 
+@mcp.tool()
+def enqueue(text: str, voice: str = "azelma", volume: float = 1.0,
+            temperature: float = 0.7, decode_steps: int = 1,
+            eos_threshold: float = -4.0) -> str:
+    """
+    Queues text to be spoken after what is already playing or queued (back-to-back).
+
+    Args:
+        text: The text to speak.
+        voice: Voice ID.
+        volume: Volume multiplier.
+        temperature: Voice personality.
+        decode_steps: Speech clarity.
+        eos_threshold: Ending sensitivity.
+    """
+    if voice:
+        service.set_voice(voice)
+    if volume is not None:
+        service.set_volume(volume)
+    if temperature is not None:
+        service.set_temperature(temperature)
+    if decode_steps is not None:
+        service.set_decode_steps(decode_steps)
+    if eos_threshold is not None:
+        service.set_eos_threshold(eos_threshold)
+
+    if service.enqueue(text):
+        return f"Queued: {text[:50]}..."
+    return "Failed to queue speech."
+
 @mcp.tool()
 def stop() -> str:
     """Stops current playback."""
@@ -6,6 +6,7 @@ import sounddevice as sd
 import threading
 import logging
 import glob
+import collections
 import numpy as np
 from typing import Optional, Callable
 
@@ -35,6 +36,10 @@ class TTSService:
         self.is_speaking = False
         self.volume = 1.0
         self._speak_lock = threading.Lock()
+        # Utterances waiting to play back-to-back: (text, on_finished)
+        self._queue = collections.deque()
+        self._queue_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
 
         # Advanced Inference settings
         self.temperature = 0.7
@@ -208,29 +213,65 @@ class TTSService:
         logger.info(f"TTS Sensitivity (EOS Threshold) set to: {self.eos_threshold:.2f}")
 
     def stop(self):
-        if self.is_speaking:
-            self.stop_event.set()
-            logger.info("Stop requested.")
+        """Stops playback and drops everything still queued."""
+        with self._queue_lock:
+            self._queue.clear()
+            if self.is_speaking:
+                self.stop_event.set()
+                logger.info("Stop requested.")
 
     def speak(self, text: str, on_finished: Optional[Callable[[], None]] = None) -> bool:
+        """Speaks text now, interrupting whatever is playing or queued."""
         if not text:
             return False
 
         with self._speak_lock:
+            worker = self._worker
             if self.is_speaking:
                 self.stop()
-                start_wait = time.time()
-                while self.is_speaking and (time.time() - start_wait < 1.0):
-                    time.sleep(0.05)
-            
-            self.stop_event.clear()
-            self.is_speaking = True
-
-            t = threading.Thread(target=self._speak_thread, args=(text, on_finished), daemon=True)
-            t.start()
+                if worker and worker is not threading.current_thread():
+                    worker.join(timeout=1.0)
+            return self.enqueue(text, on_finished)
+
+    def enqueue(self, text: str, on_finished: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Queues an utterance behind the ones already queued; they play back-to-back.
+        `on_finished` runs once it has played (not when stopped). An empty text only
+        runs the callback when the queue gets there.
+        """
+        if not text and on_finished is None:
+            return False
+
+        with self._queue_lock:
+            self._queue.append((text, on_finished))
+            if self._worker is None or self.stop_event.is_set():
+                # Each worker gets its own stop event, so a stopped one finishing its
+                # last chunk cannot silence the next
+                self.stop_event = threading.Event()
+                self.is_speaking = True
+                self._worker = threading.Thread(target=self._play_queue, args=(self.stop_event,), daemon=True)
+                self._worker.start()
         return True
 
-    def _speak_thread(self, text, on_finished):
+    def _play_queue(self, stop_event: threading.Event):
+        while True:
+            with self._queue_lock:
+                if stop_event.is_set() or not self._queue:
+                    if self.stop_event is stop_event:
+                        self._worker = None
+                        self.is_speaking = False
+                    return
+                text, on_finished = self._queue.popleft()
+
+            if text:
+                self._play_utterance(text, stop_event)
+            if on_finished and not stop_event.is_set():
+                try:
+                    on_finished()
+                except Exception as e:
+                    logger.error(f"Callback error: {e}")
+
+    def _play_utterance(self, text, stop_event):
         try:
             if self.tts_model:
                 # Apply current inference settings to the model
@@ -246,7 +287,7 @@ class TTSService:
 
                     with sd.OutputStream(samplerate=fs, channels=1) as sd_stream:
                         for chunk in stream_gen:
-                            if self.stop_event.is_set():
+                            if stop_event.is_set():
                                 logger.info("Playback interrupted.")
                                 break
                             audio_np = chunk.cpu().numpy()
@@ -260,14 +301,7 @@ class TTSService:
             else:
                 logger.info(f"Simulating TTS: {text}")
                 for _ in range(3):
-                    if self.stop_event.is_set(): break
+                    if stop_event.is_set(): break
                     time.sleep(0.5)
         except Exception as e:
             logger.error(f"Thread error: {e}")
-        finally:
-            if on_finished and not self.stop_event.is_set():
-                 try:
-                     on_finished()
-                 except Exception as e:
-                     logger.error(f"Callback error: {e}")
-            self.is_speaking = False
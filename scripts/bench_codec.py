@@ -0,0 +1,115 @@
+"""
+Benchmarks the JSON codec backends on real chat data.
+
+Loads the sample chats in chats/18-01-2026/, scales them up into large
+synthetic histories and times encode/decode per backend, plus a full
+Memory save/load round trip with the active backend.
+
+Usage: python scripts/bench_codec.py [--sizes 100,1000,10000] [--repeat 5]
+"""
+import os
+import sys
+import time
+import json
+import uuid
+import shutil
+import argparse
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules import codec
+from engine.memory import Memory
+
+SAMPLE_DIR = os.path.join("chats", "18-01-2026")
+
+
+def load_sample_messages() -> list:
+    messages = []
+    if os.path.isdir(SAMPLE_DIR):
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            if name.endswith(".json"):
+                with open(os.path.join(SAMPLE_DIR, name), 'r', encoding='utf-8') as f:
+                    messages.extend(json.load(f).get("messages", []))
+    if not messages:
+        messages = [
+            {"role": "user", "content": "Wie war dein Tag? Erzähl mir etwas über Sterne ✨"},
+            {"role": "assistant", "content": "Ein ruhiger Tag. " * 40}
+        ]
+    return messages
+
+
+def synthetic_chat(sample: list, size: int) -> dict:
+    messages = []
+    for i in range(size):
+        msg = dict(sample[i % len(sample)])
+        msg["id"] = uuid.uuid4().hex
+        messages.append(msg)
+    return {"id": str(uuid.uuid4()), "created_at": "2026-01-18T18:51:34+01:00", "messages": messages}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_backends(chat: dict, repeat: int):
+    backends = ["json"] + [b for b in ("orjson", "msgspec") if getattr(codec, b) is not None]
+    baseline_pretty = json.dumps(chat, indent=2)
+    rows = []
+    for backend in backends:
+        encoded = codec.dumps_bytes(chat, backend=backend)
+        rows.append((
+            backend,
+            best_of(lambda: codec.dumps_bytes(chat, backend=backend), repeat),
+            best_of(lambda: codec.loads(encoded, backend=backend), repeat),
+            len(encoded),
+        ))
+    pretty_time = best_of(lambda: json.dumps(chat, indent=2), repeat)
+    return rows, pretty_time, len(baseline_pretty.encode('utf-8'))
+
+
+def bench_memory(chat: dict, repeat: int) -> tuple:
+    tmp = tempfile.mkdtemp()
+    try:
+        memory = Memory(base_path=tmp)
+        chat_id = chat["id"]
+
+        def save():
+            memory._forget(chat_id)  # Force a full snapshot write every time
+            memory.save_chat(chat_id, chat)
+
+        save_time = best_of(save, repeat)
+        load_time = best_of(lambda: Memory(base_path=tmp).get_chat(chat_id), repeat)
+        memory.close()
+        return save_time, load_time
+    finally:
+        shutil.rmtree(tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Messages per synthetic chat")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sample = load_sample_messages()
+    print(f"Active backend: {codec.BACKEND} | sample messages: {len(sample)}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        chat = synthetic_chat(sample, size)
+        rows, pretty_time, pretty_size = bench_backends(chat, args.repeat)
+        print(f"\n== {size} messages ==")
+        print(f"  {'stdlib indent=2 (old)':<24} dump {pretty_time * 1000:8.2f} ms  size {pretty_size / 1024:9.1f} KiB")
+        for backend, dump_t, load_t, size_b in rows:
+            print(f"  {backend + ' compact':<24} dump {dump_t * 1000:8.2f} ms  load {load_t * 1000:8.2f} ms  size {size_b / 1024:9.1f} KiB")
+        save_t, load_t = bench_memory(chat, args.repeat)
+        print(f"  {'Memory (' + codec.BACKEND + ')':<24} save {save_t * 1000:8.2f} ms  load {load_t * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark for the TTS text sanitizer.
+
+Compares the previous multi-pass regex cleanup with the single-pass TtsSanitizer
+on synthetic replies of growing length: once on the complete text, and once fed
+token by token the way a reply streams in. The legacy function can only run on
+complete text, so the streaming case re-sanitizes the whole prefix at every
+sentence end (the only way to use it while a reply is still arriving).
+
+Usage: python scripts/bench_sanitize.py [--sizes 1000,10000,50000,200000] [--repeat 5]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules.tts_sanitizer import TtsSanitizer
+
+
+def legacy_sanitize(text: str) -> str:
+    """The previous Controller._sanitize_for_tts (without its logging)."""
+    if not text: return ""
+    text = text.replace('“', '"').replace('”', '"').replace('‘', "'").replace('’', "'")
+    text = text.replace('--', '... ')
+    text = re.sub(r'\.{3,}|…', ', ... ', text)
+    text = text.replace('—', ' - ').replace('–', ' - ')
+    clean = re.sub(r'\(.*?\)', '', text, flags=re.DOTALL)
+    clean = re.sub(r'\[.*?\]', '', clean, flags=re.DOTALL)
+    clean = clean.replace('*', '').replace('_', '')
+    clean = re.sub(r'[^\w\s,.\'?!:;"-]', '', clean)
+    clean = re.sub(r'\s+', ' ', clean)
+    clean = clean.strip()
+    if clean:
+        clean = ". " + clean
+    return clean
+
+
+PARAGRAPH = (
+    "**Hmm.** That's a “good” question -- and honestly, I've thought about it before... "
+    "(She leans back, thinking.) The short answer is *yes*; the long answer — well — "
+    "depends on what you mean by `fast`. [smiles] Here's a list:\n"
+    "- First, measure it. 📏\n- Second, fix the __slowest__ part…\n\n"
+)
+
+
+def synthetic_reply(chars: int) -> str:
+    return (PARAGRAPH * (chars // len(PARAGRAPH) + 1))[:chars]
+
+
+def tokens(text: str) -> list:
+    """Splits text into stream-sized pieces (about one word each)."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_streaming(pieces: list):
+    text = ""
+    for piece in pieces:
+        text += piece
+        if piece.rstrip().endswith((".", "!", "?")):
+            legacy_sanitize(text)
+    legacy_sanitize(text)
+
+
+def incremental_streaming(pieces: list):
+    sanitizer = TtsSanitizer()
+    for piece in pieces:
+        sanitizer.feed(piece)
+    sanitizer.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000,200000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'chars':>8} {'legacy ms':>10} {'single ms':>10} {'legacy stream ms':>17} {'single stream ms':>17} {'same':>5}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        text = synthetic_reply(size)
+        pieces = tokens(text)
+        same = legacy_sanitize(text) == TtsSanitizer.sanitize(text)
+        legacy_ms = timed(lambda: legacy_sanitize(text), args.repeat) * 1000
+        single_ms = timed(lambda: TtsSanitizer.sanitize(text), args.repeat) * 1000
+        stream_repeat = 1 if size > 50000 else args.repeat
+        legacy_stream_ms = timed(lambda: legacy_streaming(pieces), stream_repeat) * 1000
+        single_stream_ms = timed(lambda: incremental_streaming(pieces), args.repeat) * 1000
+        print(f"{size:>8} {legacy_ms:>10.2f} {single_ms:>10.2f} {legacy_stream_ms:>17.1f} {single_stream_ms:>17.2f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for context trimming.
+
+Compares the old pop-and-recount loop with the single-pass planner on
+synthetic chats of growing length, trimming each to the same window.
+The old loop grows quadratically; the planner stays roughly linear.
+
+Usage: python scripts/bench_trim.py [--sizes 250,500,1000,2000,4000] [--window 8192]
+"""
+import os
+import sys
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules.token_counter import TokenCounter
+from engine.modules.context_trim import trim_messages
+
+
+def legacy_trim(messages: list, max_tokens: int, counter: TokenCounter) -> list:
+    """The previous Controller._trim_context_messages loop."""
+    trimmed = list(messages)
+    while len(trimmed) > 1 and counter.count_messages(trimmed) > max_tokens:
+        if trimmed[0].get("role") == "system" and len(trimmed) > 2:
+            trimmed.pop(1)
+        else:
+            trimmed.pop(0)
+    return trimmed
+
+
+def synthetic_prompt(size: int) -> list:
+    messages = [{"role": "system", "content": "You are Erika. " * 200}]
+    for i in range(size):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"Message {i}: " + "some words about the day " * 12, "id": f"m{i}"})
+    return messages
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="250,500,1000,2000,4000")
+    parser.add_argument("--window", type=int, default=8192)
+    args = parser.parse_args()
+
+    counter = TokenCounter()
+    print(f"{'messages':>9} {'legacy ms':>10} {'planner ms':>11} {'kept':>6}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        messages = synthetic_prompt(size)
+        counter.count_messages(messages)  # Warm the per-message cache for both variants
+
+        legacy_time = timed(lambda: legacy_trim(messages, args.window, counter))
+        kept = []
+        planner_time = timed(lambda: kept.append(trim_messages(messages, args.window, counter)[0]))
+        assert kept[0] == legacy_trim(messages, args.window, counter)
+        print(f"{size:>9} {legacy_time * 1000:>10.2f} {planner_time * 1000:>11.2f} {len(kept[0]):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.async_memory import AsyncMemory
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestAsyncMemory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    async def test_round_trip(self):
+        store = AsyncMemory(self.memory)
+        chat = store.create_chat()
+        chat['messages'].append({"role": "user", "content": "Hello", "id": "a"})
+        await store.save_chat(chat['id'], chat)
+
+        loaded = await store.get_chat(chat['id'])
+        self.assertEqual(loaded['messages'][0]['content'], "Hello")
+        self.assertEqual(len(await store.list_chats()), 1)
+        self.assertTrue(await store.delete_chat(chat['id']))
+        store.close()
+
+    async def test_streaming_continues_during_large_list_chats(self):
+        """Token chunks keep reaching the UI while a slow list_chats is in progress."""
+        if not Controller: self.skipTest("No Controller")
+
+        real_list = self.memory.list_chats
+        list_window = {}
+
+        def slow_list_chats(*args, **kwargs):
+            list_window['start'] = time.monotonic()
+            time.sleep(0.5)  # A large archive on a slow / cloud-synced disk
+            result = real_list(*args, **kwargs)
+            list_window['end'] = time.monotonic()
+            return result
+
+        self.memory.list_chats = slow_list_chats
+
+        async def fake_stream(*args, **kwargs):
+            for i in range(40):
+                await asyncio.sleep(0.02)
+                yield {"message": {"role": "assistant", "content": f"tok{i} "}}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, self.memory)
+
+        chunk_times = []
+
+        async def on_stream(msg_id, content):
+            chunk_times.append(time.monotonic())
+
+        controller.bind_view(MagicMock(), on_stream)
+
+        await asyncio.gather(
+            controller.handle_user_input("Tell me a story"),
+            controller.get_grouped_history()
+        )
+        controller.store.close()
+
+        during = [t for t in chunk_times if list_window['start'] < t < list_window['end']]
+        self.assertGreater(len(during), 5, "Streaming stalled while list_chats was running")
+        self.assertEqual(len(chunk_times), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
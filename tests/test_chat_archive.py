@@ -0,0 +1,118 @@
+import unittest
+import os
+import sys
+import uuid
+import shutil
+import datetime
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.chat_archive import ARCHIVE_DIR
+
+TODAY = datetime.date(2026, 3, 10)
+
+
+class TestChatArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        patcher = patch('engine.memory.TimeKeeper.get_logical_date', return_value=TODAY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.test_dir)
+
+    def _save(self, created_at, content="Hello"):
+        chat_id = str(uuid.uuid4())
+        data = {"id": chat_id, "created_at": created_at,
+                "messages": [{"role": "user", "content": content, "id": "a"}]}
+        self.memory.save_chat(chat_id, data)
+        return data
+
+    def test_pack_is_fsynced_through_a_writable_handle(self):
+        # Windows rejects fsync on a read-only descriptor (EBADF); emulate that here
+        real_fsync = os.fsync
+
+        try:
+            import fcntl
+        except ImportError:
+            self.skipTest("Needs fcntl to inspect descriptor modes")
+
+        def strict_fsync(fd):
+            if fcntl.fcntl(fd, fcntl.F_GETFL) & os.O_ACCMODE == os.O_RDONLY:
+                raise OSError(9, "Bad file descriptor")
+            real_fsync(fd)
+
+        self._save("2026-01-18T12:00:00+00:00", "January one")
+        with patch('engine.modules.chat_archive.os.fsync', side_effect=strict_fsync):
+            self.assertEqual(self.memory.archive_old_days(30), 1)
+        self.assertEqual(os.listdir(os.path.join(self.test_dir, ARCHIVE_DIR)), ["2026-01.zip"])
+
+    def test_old_days_are_packed_per_month(self):
+        jan_a = self._save("2026-01-18T12:00:00+00:00", "January one")
+        jan_b = self._save("2026-01-20T12:00:00+00:00", "January two")
+        feb = self._save("2026-02-02T12:00:00+00:00", "February")
+        recent = self._save("2026-03-09T12:00:00+00:00", "Yesterday")
+
+        self.assertEqual(self.memory.archive_old_days(30), 3)
+
+        entries = sorted(os.listdir(self.test_dir))
+        self.assertIn("09-03-2026", entries)
+        self.assertNotIn("18-01-2026", entries)
+        self.assertNotIn("02-02-2026", entries)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.test_dir, ARCHIVE_DIR))), ["2026-01.zip", "2026-02.zip"])
+
+        # Transparent reads, in this instance and a fresh one
+        for memory in (self.memory, Memory(base_path=self.test_dir)):
+            self.assertEqual(memory.get_chat(jan_a['id'])['messages'][0]['content'], "January one")
+            self.assertEqual(memory.get_chat(feb['id'])['messages'][0]['content'], "February")
+            by_day = memory.get_chats_by_date(datetime.date(2026, 1, 20))
+            self.assertEqual([c['id'] for c in by_day], [jan_b['id']])
+            self.assertEqual(len(memory.list_chats()), 4)
+        self.assertEqual(self.memory.list_chats()[-1]['date'], "18-01-2026")
+        self.assertEqual(self.memory.get_chat(recent['id'])['messages'][0]['content'], "Yesterday")
+
+    def test_rebuild_index_includes_packs(self):
+        chat = self._save("2026-01-18T12:00:00+00:00")
+        self.memory.archive_old_days(30)
+        self.assertEqual(self.memory.rebuild_index(), 1)
+        self.assertTrue(self.memory.list_chats()[0]['path'].startswith(ARCHIVE_DIR))
+        self.assertIsNotNone(Memory(base_path=self.test_dir).get_chat(chat['id']))
+
+    def test_saving_or_deleting_archived_chat(self):
+        kept = self._save("2026-01-18T12:00:00+00:00", "Stays archived")
+        revived = self._save("2026-01-19T12:00:00+00:00", "Comes back")
+        doomed = self._save("2026-01-20T12:00:00+00:00", "Goes away")
+        self.memory.archive_old_days(30)
+
+        revived['messages'].append({"role": "assistant", "content": "Welcome back", "id": "b"})
+        self.memory.save_chat(revived['id'], revived)
+        self.assertTrue(self.memory.delete_chat(doomed['id']))
+
+        memory = Memory(base_path=self.test_dir)
+        self.assertEqual(len(memory.get_chat(revived['id'])['messages']), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "19-01-2026")))
+        self.assertIsNone(memory.get_chat(doomed['id']))
+        self.assertIsNotNone(memory.get_chat(kept['id']))
+        self.assertEqual(memory.rebuild_index(), 2)
+
+    def test_rearchiving_merges_into_existing_pack(self):
+        first = self._save("2026-01-18T12:00:00+00:00")
+        self.memory.archive_old_days(30)
+        second = self._save("2026-01-25T12:00:00+00:00")
+        self.memory.archive_old_days(30)
+
+        memory = Memory(base_path=self.test_dir)
+        self.assertIsNotNone(memory.get_chat(first['id']))
+        self.assertIsNotNone(memory.get_chat(second['id']))
+        self.assertEqual(os.listdir(os.path.join(self.test_dir, ARCHIVE_DIR)), ["2026-01.zip"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+import json
+import uuid
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.chat_index import INDEX_FILENAME
+
+
+class TestChatIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _save(self, content="Hello there"):
+        chat = self.memory.create_chat()
+        chat['messages'].append({"role": "user", "content": content})
+        self.memory.save_chat(chat['id'], chat)
+        return chat
+
+    def test_save_updates_index(self):
+        chat = self._save("A fairly long opening message that exceeds fifty characters easily")
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, INDEX_FILENAME)))
+
+        chats = self.memory.list_chats()
+        self.assertEqual(len(chats), 1)
+        self.assertEqual(chats[0]['id'], chat['id'])
+        self.assertEqual(chats[0]['message_count'], 1)
+        self.assertEqual(len(chats[0]['preview']), 50)
+
+    def test_list_does_not_read_chat_files(self):
+        self._save()
+        self._save()
+        # A fresh instance must answer from the index alone
+        memory = Memory(base_path=self.test_dir)
+        with patch('engine.memory.read_chat_file', side_effect=AssertionError("chat file parsed")):
+            self.assertEqual(len(memory.list_chats()), 2)
+
+    def test_delete_removes_entry(self):
+        chat = self._save()
+        self.assertTrue(self.memory.delete_chat(chat['id']))
+        self.assertEqual(Memory(base_path=self.test_dir).list_chats(), [])
+
+    def test_rebuild_picks_up_out_of_band_files(self):
+        self._save()
+        chat_id = str(uuid.uuid4())
+        folder = os.path.join(self.test_dir, "01-01-2026")
+        os.makedirs(folder)
+        with open(os.path.join(folder, f"{chat_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump({"id": chat_id, "created_at": "2026-01-01T12:00:00+00:00",
+                       "messages": [{"role": "user", "content": "Manual"}]}, f)
+
+        self.assertEqual(len(self.memory.list_chats()), 1)
+        self.assertEqual(self.memory.rebuild_index(), 2)
+        ids = [c['id'] for c in self.memory.list_chats()]
+        self.assertIn(chat_id, ids)
+
+    def test_missing_index_is_rebuilt_on_first_use(self):
+        self._save()
+        os.remove(os.path.join(self.test_dir, INDEX_FILENAME))
+        memory = Memory(base_path=self.test_dir)
+        self._save_with(memory)
+        self.assertEqual(len(memory.list_chats()), 2)
+
+    def test_cursor_pagination_walks_every_chat_once(self):
+        for i in range(7):
+            chat = self._save(f"Chat {i}")
+        # Same timestamp on two chats: the id breaks the tie so neither is skipped
+        twin = self.memory.create_chat()
+        twin['created_at'] = chat['created_at']
+        twin['messages'].append({"role": "user", "content": "Twin"})
+        self.memory.save_chat(twin['id'], twin)
+
+        expected = [c['id'] for c in self.memory.list_chats()]
+        seen, cursor = [], None
+        while True:
+            page = self.memory.list_chats(limit=3, before_cursor=cursor)
+            seen.extend(c['id'] for c in page)
+            if len(page) < 3:
+                break
+            cursor = Memory.chat_cursor(page[-1])
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 8)
+
+    def _save_with(self, memory):
+        chat = memory.create_chat()
+        chat['messages'].append({"role": "user", "content": "Later"})
+        memory.save_chat(chat['id'], chat)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import os
+import sys
+import json
+import uuid
+import shutil
+import random
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules import chat_log
+from engine.modules.chat_log import read_chat_log, diff_records, TailReader
+
+
+class TestChatLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.chat = self.memory.create_chat()
+        self.chat_id = self.chat['id']
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _add(self, role, content):
+        msg = {"role": role, "content": content, "id": uuid.uuid4().hex}
+        self.chat['messages'].append(msg)
+        return msg
+
+    def _log_lines(self):
+        with open(self.memory._find_chat_path(self.chat_id), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_turn_appends_only_new_messages(self):
+        self._add("user", "Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        path = self.memory._find_chat_path(self.chat_id)
+        self.assertTrue(path.endswith(".jsonl"))
+        size_before = os.path.getsize(path)
+
+        self._add("assistant", "Hi!")
+        self.memory.save_chat(self.chat_id, self.chat)
+
+        lines = self._log_lines()
+        self.assertEqual([r['op'] for r in lines], ["meta", "add", "add"])
+        with open(path, 'r', encoding='utf-8') as f:
+            f.seek(size_before)
+            self.assertIn('"Hi!"', f.read())
+
+        # Saving unchanged data writes nothing
+        self.memory.save_chat(self.chat_id, self.chat)
+        self.assertEqual(len(self._log_lines()), 3)
+
+    def test_pin_and_regeneration_records(self):
+        user = self._add("user", "Hello")
+        self._add("assistant", "First answer")
+        self.memory.save_chat(self.chat_id, self.chat)
+
+        user['pinned'] = True
+        self.chat['messages'].pop()
+        self._add("assistant", "Second answer")
+        self.memory.save_chat(self.chat_id, self.chat)
+
+        ops = [r['op'] for r in self._log_lines()]
+        self.assertEqual(ops[-3:], ["edit", "truncate", "add"])
+
+        loaded = Memory(base_path=self.test_dir).get_chat(self.chat_id)
+        self.assertEqual([m['content'] for m in loaded['messages']], ["Hello", "Second answer"])
+        self.assertTrue(loaded['messages'][0]['pinned'])
+
+    def test_legacy_json_is_read_and_migrated(self):
+        legacy_dir = os.path.join(self.test_dir, "18-01-2026")
+        os.makedirs(legacy_dir)
+        legacy_path = os.path.join(legacy_dir, f"{self.chat_id}.json")
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump({"id": self.chat_id, "created_at": "2026-01-18T18:51:34+01:00",
+                       "messages": [{"role": "user", "content": "Old", "id": "a"}]}, f, indent=2)
+
+        memory = Memory(base_path=self.test_dir)
+        data = memory.get_chat(self.chat_id)
+        self.assertEqual(data['messages'][0]['content'], "Old")
+
+        data['messages'].append({"role": "assistant", "content": "New", "id": "b"})
+        memory.save_chat(self.chat_id, data)
+        self.assertFalse(os.path.exists(legacy_path))
+        self.assertEqual(len(Memory(base_path=self.test_dir).get_chat(self.chat_id)['messages']), 2)
+
+    def test_torn_last_line_is_ignored(self):
+        self._add("user", "Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        path = self.memory._find_chat_path(self.chat_id)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"op":"add","msg":{"role":"assis')
+
+        data, _ = read_chat_log(path)
+        self.assertEqual(len(data['messages']), 1)
+
+        # The next append starts on a fresh line instead of merging into the torn one
+        self._add("assistant", "Recovered")
+        self.memory.save_chat(self.chat_id, self.chat)
+        data, _ = read_chat_log(path)
+        self.assertEqual([m['content'] for m in data['messages']], ["Hello", "Recovered"])
+
+    def test_repeated_edits_trigger_compaction(self):
+        msg = self._add("user", "Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        for _ in range(60):
+            msg['pinned'] = not msg.get('pinned', False)
+            self.memory.save_chat(self.chat_id, self.chat)
+
+        self.assertLess(len(self._log_lines()), 40)
+        loaded = Memory(base_path=self.test_dir).get_chat(self.chat_id)
+        self.assertEqual(loaded['messages'][0].get('pinned'), msg['pinned'])
+
+    def test_diff_records_unset(self):
+        records = diff_records([{"id": "a", "pinned": True}], [{"id": "a"}])
+        self.assertEqual(records, [{"op": "edit", "index": 0, "set": {}, "id": "a", "unset": ["pinned"]}])
+
+    def _long_chat(self, count):
+        for i in range(count):
+            self._add("user" if i % 2 == 0 else "assistant", f"Message {i}")
+        self.memory.save_chat(self.chat_id, self.chat)
+
+    def test_tail_page_reads_only_the_end_of_the_log(self):
+        self._long_chat(2000)
+        memory = Memory(base_path=self.test_dir)
+        with patch.object(chat_log, "READ_BLOCK", 1024), \
+                patch.object(chat_log.codec, "loads", wraps=chat_log.codec.loads) as loads:
+            page = memory.get_chat_page(self.chat_id, limit=10)
+        self.assertEqual([m['content'] for m in page['messages']], [f"Message {i}" for i in range(1990, 2000)])
+        self.assertEqual((page['offset'], page['total']), (1990, 2000))
+        self.assertLess(loads.call_count, 100)
+
+    def test_tail_reader_matches_replay(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            roll = rng.random()
+            if roll < 0.6 or not self.chat['messages']:
+                self._add("user", f"Message {rng.random()}")
+            elif roll < 0.8:
+                msg = rng.choice(self.chat['messages'])
+                msg['pinned'] = not msg.get('pinned', False)
+            else:
+                del self.chat['messages'][rng.randrange(len(self.chat['messages'])):]
+            self.memory.save_chat(self.chat_id, self.chat)
+
+        path = self.memory._find_chat_path(self.chat_id)
+        expected = read_chat_log(path)[0]['messages']
+        reader = TailReader(path)
+        pages = []
+        while reader.offset is None or reader.offset > 0:
+            pages[:0] = reader.read_back(7)
+        self.assertEqual(reader.total, len(expected))
+        self.assertEqual(pages, expected)
+
+    def test_save_from_offset_keeps_older_messages(self):
+        self._long_chat(120)
+        memory = Memory(base_path=self.test_dir)
+        page = memory.get_chat_page(self.chat_id)
+        tail = page['messages']
+        tail[-1]['pinned'] = True
+        tail.append({"role": "user", "content": "New", "id": "new"})
+        memory.save_chat(self.chat_id, {"id": self.chat_id, "created_at": self.chat['created_at'],
+                                        "messages": tail, "offset": page['offset']})
+
+        data = Memory(base_path=self.test_dir).get_chat(self.chat_id)
+        self.assertEqual(len(data['messages']), 121)
+        self.assertEqual(data['messages'][0]['content'], "Message 0")
+        self.assertTrue(data['messages'][119]['pinned'])
+        self.assertEqual(memory.index.get(self.chat_id)['pinned'], [119])
+        self.assertEqual(memory.index.get(self.chat_id)['message_count'], 121)
+
+    def test_persisted_state_is_bounded(self):
+        from engine.memory import PERSISTED_CACHE_SIZE
+        chats = []
+        for i in range(PERSISTED_CACHE_SIZE + 5):
+            chat = self.memory.create_chat()
+            chat['messages'].append({"role": "user", "content": f"Chat {i}", "id": f"m{i}"})
+            self.memory.save_chat(chat['id'], chat)
+            chats.append(chat)
+        self.assertEqual(len(self.memory._persisted), PERSISTED_CACHE_SIZE)
+        self.assertNotIn(chats[0]['id'], self.memory._persisted)
+
+        # An evicted chat is read back from disk when it is saved again
+        chats[0]['messages'].append({"role": "assistant", "content": "Back", "id": "back"})
+        self.memory.save_chat(chats[0]['id'], chats[0])
+        data = Memory(base_path=self.test_dir).get_chat(chats[0]['id'])
+        self.assertEqual([m['content'] for m in data['messages']], ["Chat 0", "Back"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.token_counter import TokenCounter
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestChatPaging(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.chat = self.memory.create_chat()
+        for i in range(120):
+            self.chat['messages'].append({"role": "user" if i % 2 == 0 else "assistant", "content": f"Message {i}", "id": f"m{i}"})
+        self.memory.save_chat(self.chat['id'], self.chat)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_tail_then_older_pages(self):
+        memory = Memory(base_path=self.test_dir)
+        tail = memory.get_chat_page(self.chat['id'], limit=50)
+        self.assertEqual((tail['offset'], tail['total']), (70, 120))
+        self.assertEqual(tail['messages'][-1]['content'], "Message 119")
+        self.assertEqual(tail['created_at'], self.chat['created_at'])
+
+        # Older pages continue reading the log backwards instead of replaying it
+        with patch('engine.memory.read_chat_log', side_effect=AssertionError("replayed")):
+            middle = memory.get_chat_page(self.chat['id'], limit=50, before=tail['offset'])
+            first = memory.get_chat_page(self.chat['id'], limit=50, before=middle['offset'])
+        self.assertEqual(middle['offset'], 20)
+        self.assertEqual(first['offset'], 0)
+        self.assertEqual([m['content'] for m in first['messages']], [f"Message {i}" for i in range(20)])
+        self.assertIsNone(memory.get_chat_page("00000000-0000-0000-0000-000000000000"))
+
+    async def test_controller_loads_tail_and_saves_only_the_tail(self):
+        if not Controller: self.skipTest("No Controller")
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(MagicMock(), self.memory)
+
+        await controller.load_chat_session(self.chat['id'])
+        self.assertEqual(len(controller.chat_history), 50)
+        self.assertTrue(controller.has_earlier_messages)
+
+        self.assertTrue(await controller.load_earlier_messages())
+        self.assertEqual(len(controller.chat_history), 100)
+
+        # Editing a partially loaded chat must not truncate it on disk, nor load the rest
+        await controller.pin_message("m119")
+        controller.store.close()
+        self.assertEqual((controller.history_offset, len(controller.chat_history)), (20, 100))
+        saved = Memory(base_path=self.test_dir).get_chat(self.chat['id'])
+        self.assertEqual(len(saved['messages']), 120)
+        self.assertTrue(saved['messages'][119]['pinned'])
+        self.assertEqual(self.memory.index.get(self.chat['id'])['pinned'], [119])
+
+    async def test_controller_keeps_older_pins_and_token_total(self):
+        if not Controller: self.skipTest("No Controller")
+        self.chat['messages'][3]['pinned'] = True
+        TokenCounter().count_messages(self.chat['messages'])  # Stores per-message counts, as a turn does
+        self.memory.save_chat(self.chat['id'], self.chat)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(MagicMock(), Memory(base_path=self.test_dir))
+            full = Controller(MagicMock(), Memory(base_path=self.test_dir))
+
+        await controller.load_chat_session(self.chat['id'])
+        self.assertEqual(controller.history_offset, 70)
+        self.assertEqual([m['id'] for m in controller._older_pinned], ["m3"])
+        # Same total as counting every message
+        full.chat_history = Memory(base_path=self.test_dir).get_chat(self.chat['id'])['messages']
+        full._update_token_count()
+        self.assertEqual(controller.current_token_count, full.current_token_count)
+        controller.store.close()
+        full.store.close()
+
+    async def test_current_chat_entry_for_sidebar(self):
+        if not Controller: self.skipTest("No Controller")
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(MagicMock(), self.memory)
+        controller.new_chat()
+        self.assertIsNone(controller.current_chat_entry())  # Empty chats are not listed
+
+        controller.chat_history.append({"role": "user", "content": "Hello there", "id": "h"})
+        self.assertEqual(controller.current_chat_entry()['preview'], "Hello there")
+        self.assertEqual(controller.current_chat_entry()['group'], "Today")
+
+        # The first message of a partially loaded chat is not in memory: its preview is left alone
+        await controller.load_chat_session(self.chat['id'])
+        self.assertIsNone(controller.current_chat_entry()['preview'])
+        controller.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import time
+import uuid
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+
+
+class TestChatWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir, background_writes=True, write_delay=0.2)
+        self.chat = self.memory.create_chat()
+        self.chat_id = self.chat['id']
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.test_dir)
+
+    def _add(self, content):
+        self.chat['messages'].append({"role": "user", "content": content, "id": uuid.uuid4().hex})
+
+    def test_saves_are_coalesced(self):
+        with patch.object(self.memory, '_write_chat', wraps=self.memory._write_chat) as write:
+            self.memory._writer._write_fn = write
+            for i in range(10):
+                self._add(f"msg {i}")
+                self.memory.save_chat(self.chat_id, self.chat)
+            self.assertTrue(self.memory.flush())
+            self.assertEqual(write.call_count, 1)
+
+        loaded = Memory(base_path=self.test_dir).get_chat(self.chat_id)
+        self.assertEqual(len(loaded['messages']), 10)
+
+    def test_queued_save_is_visible_before_flush(self):
+        self._add("Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        # Later in-place edits by the caller must not leak into the queued copy
+        self.chat['messages'][0]['content'] = "Changed"
+
+        self.assertEqual(self.memory.get_chat(self.chat_id)['messages'][0]['content'], "Hello")
+        self.assertEqual([c['id'] for c in self.memory.list_chats()], [self.chat_id])
+
+    def test_delete_discards_queued_save(self):
+        self._add("Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        self.assertTrue(self.memory.delete_chat(self.chat_id))
+        self.memory.flush()
+        time.sleep(0.3)
+        self.assertIsNone(Memory(base_path=self.test_dir).get_chat(self.chat_id))
+
+    def test_flush_writes_without_waiting_for_delay(self):
+        self.memory._writer.delay = 60
+        self._add("Hello")
+        self.memory.save_chat(self.chat_id, self.chat)
+        start = time.monotonic()
+        self.assertTrue(self.memory.flush(timeout=5))
+        self.assertLess(time.monotonic() - start, 2)
+
+        folder = os.path.dirname(Memory(base_path=self.test_dir)._find_chat_path(self.chat_id))
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(folder)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules import codec
+
+SAMPLE = {
+    "id": "abc",
+    "messages": [{"role": "user", "content": "Grüße aus Köln ✨ \"quoted\"\nnew line", "pinned": False, "n": 3}],
+    "nested": {"list": [1, 2.5, None, True]}
+}
+
+
+def installed_backends():
+    return ["json"] + [b for b in ("orjson", "msgspec") if getattr(codec, b) is not None]
+
+
+class TestCodec(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip_every_backend(self):
+        for backend in installed_backends():
+            with self.subTest(backend=backend):
+                encoded = codec.dumps_bytes(SAMPLE, backend=backend)
+                self.assertIn("Grüße".encode('utf-8'), encoded)  # Raw UTF-8, not \u escapes
+                self.assertNotIn(b"\n ", encoded)
+                self.assertEqual(codec.loads(encoded, backend=backend), SAMPLE)
+                self.assertEqual(codec.loads(encoded.decode('utf-8'), backend=backend), SAMPLE)
+                # Readable by the stdlib too
+                self.assertEqual(json.loads(encoded), SAMPLE)
+
+    def test_pretty_output(self):
+        for backend in installed_backends():
+            with self.subTest(backend=backend):
+                pretty = codec.dumps(SAMPLE, pretty=True, backend=backend)
+                self.assertIn('\n  "messages"', pretty)
+                self.assertEqual(json.loads(pretty), SAMPLE)
+
+    def test_decode_errors_share_one_type(self):
+        for backend in installed_backends():
+            with self.subTest(backend=backend):
+                with self.assertRaises(codec.JSONDecodeError):
+                    codec.loads(b'{"broken": ', backend=backend)
+
+    def test_write_json_replaces_atomically(self):
+        path = os.path.join(self.test_dir, "settings.json")
+        codec.write_json(path, {"a": 1})
+        codec.write_json(path, SAMPLE, pretty=True)
+        self.assertEqual(codec.read_json(path), SAMPLE)
+        self.assertEqual(os.listdir(self.test_dir), ["settings.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules.token_counter import TokenCounter
+from engine.modules.context_trim import plan_trim, trim_messages, fit_sections, render_sections, TRUNCATION_MARKER
+
+
+def make_prompt(size: int) -> list:
+    messages = [{"role": "system", "content": "System prompt " * 20}]
+    for i in range(size):
+        messages.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"Message {i} " * 10, "id": f"m{i}"})
+    return messages
+
+
+class TestContextTrim(unittest.TestCase):
+    def setUp(self):
+        self.counter = TokenCounter()
+
+    def test_plan_drops_oldest_unprotected_first(self):
+        costs = [10, 10, 10, 10, 10]
+        self.assertEqual(plan_trim(costs, 50, [False] * 5), [])
+        self.assertEqual(plan_trim(costs, 35, [False] * 5), [0, 1])
+        self.assertEqual(plan_trim(costs, 35, [True, False, False, False, False]), [1, 2])
+        # Protected messages go only when nothing else is left; the last one always stays
+        self.assertEqual(plan_trim(costs, 5, [True, True, False, False, False]), [0, 1, 2, 3])
+
+    def test_matches_pop_loop_and_fits(self):
+        messages = make_prompt(60)
+        budget = self.counter.count_messages(messages) // 3
+        trimmed, dropped = trim_messages(messages, budget, self.counter)
+
+        self.assertLessEqual(self.counter.count_messages(trimmed), budget)
+        self.assertEqual(trimmed[0]["role"], "system")
+        self.assertEqual(trimmed[-1]["id"], "m59")
+        self.assertEqual(len(trimmed) + dropped, len(messages))
+        # Dropping one fewer message would not have fitted
+        self.assertGreater(self.counter.count_messages([messages[0]] + messages[dropped:]), budget)
+
+    def test_pinned_messages_survive(self):
+        messages = make_prompt(40)
+        messages[3]["pinned"] = True
+        budget = self.counter.count_messages(messages) // 2
+        trimmed, _ = trim_messages(messages, budget, self.counter)
+        self.assertIn("m2", [m.get("id") for m in trimmed])
+        self.assertLessEqual(self.counter.count_messages(trimmed), budget)
+
+    def test_each_message_is_counted_once(self):
+        messages = make_prompt(200)
+        with patch.object(self.counter, 'message_cost', wraps=self.counter.message_cost) as cost:
+            trim_messages(messages, 500, self.counter)
+        self.assertEqual(cost.call_count, len(messages))
+
+
+class TestSystemPromptFit(unittest.TestCase):
+    def setUp(self):
+        self.counter = TokenCounter()
+        self.sections = [
+            {"name": "core", "text": "Core rules of behaviour. " * 40, "priority": 4},
+            {"name": "soul", "text": "A warm and curious personality. " * 40, "priority": 3, "prefix": "\n\n"},
+            {"name": "growth", "text": "Things learned over time. " * 40, "priority": 2, "prefix": "\n\n"},
+            {"name": "reflection", "text": "Yesterday was a quiet day. " * 40, "priority": 1,
+             "prefix": "\n\n### MEMORY ###\n", "suffix": "\n### END ###\n"},
+        ]
+        self.full = self.counter.count(render_sections(self.sections))
+
+    def test_untouched_when_it_fits(self):
+        fitted, truncated = fit_sections(self.sections, self.full, self.counter)
+        self.assertFalse(truncated)
+        self.assertEqual(render_sections(fitted), render_sections(self.sections))
+
+    def test_cuts_lowest_priority_section_first(self):
+        budget = self.full - 50
+        fitted, truncated = fit_sections(self.sections, budget, self.counter)
+        prompt = render_sections(fitted)
+        self.assertTrue(truncated)
+        self.assertLessEqual(self.counter.count(prompt), budget)
+        self.assertEqual([s["text"] for s in fitted[:3]], [s["text"] for s in self.sections[:3]])
+        self.assertTrue(fitted[3]["text"].endswith(TRUNCATION_MARKER))
+        self.assertIn("### END ###", prompt)  # Section wrapper survives the cut
+
+    def test_drops_whole_sections_then_cuts_the_next(self):
+        core_and_some_soul = self.counter.count(render_sections(self.sections[:1])) + 60
+        fitted, _ = fit_sections(self.sections, core_and_some_soul, self.counter)
+        self.assertLessEqual(self.counter.count(render_sections(fitted)), core_and_some_soul)
+        self.assertTrue(fitted[2].get("dropped") and fitted[3].get("dropped"))
+        self.assertTrue(fitted[1]["text"].endswith(TRUNCATION_MARKER))
+        self.assertEqual(fitted[0]["text"], self.sections[0]["text"])
+
+    def test_cut_is_maximal_with_few_tokenizer_calls(self):
+        budget = self.full - 100
+        with patch.object(self.counter, 'count', wraps=self.counter.count) as count:
+            fitted, _ = fit_sections(self.sections, budget, self.counter)
+        self.assertLessEqual(count.call_count, 12)
+
+        # One more token of the cut section would overflow
+        section = fitted[3]
+        offsets = self.counter.token_offsets(self.sections[3]["text"])
+        kept = section["text"][:-len(TRUNCATION_MARKER)]
+        longer = dict(section, text=self.sections[3]["text"][:offsets[offsets.index(len(kept)) + 1]] + TRUNCATION_MARKER)
+        self.assertGreater(self.counter.count(render_sections(fitted[:3] + [longer])), budget)
+
+    def test_whole_prompt_fits_after_system_truncation(self):
+        try:
+            from interface.controller import Controller
+        except ImportError:
+            self.skipTest("No Controller")
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(MagicMock(), MagicMock())
+        messages = [{"role": "system", "content": render_sections(self.sections)},
+                    {"role": "user", "content": "Hello " * 50, "id": "u"}]
+        target = self.full // 2
+        fitted, truncated = controller._ensure_system_prompt_fits(messages, target, self.sections)
+        self.assertTrue(truncated)
+        self.assertLessEqual(self.counter.count_messages(fitted), target)
+        self.assertTrue(fitted[0]["content"].startswith("Core rules"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,25 @@ class TestEngineBrain(unittest.IsolatedAsyncioTestCase):
             mock_instance.list.side_effect = Exception("Connection refused")
             status = await brain.check_connection()
             self.assertFalse(status)
+    async def test_closing_response_closes_http_stream(self):
+        """Abandoning a reply closes Ollama's response stream (and with it the HTTP request)."""
+        closed = []
+
+        async def http_stream():
+            try:
+                for i in range(100):
+                    yield {"message": {"content": f"tok{i}"}}
+            finally:
+                closed.append(True)
+
+        with patch('engine.brain.AsyncClient') as mock_client:
+            mock_client.return_value.chat = AsyncMock(return_value=http_stream())
+            from engine.brain import Brain
+            brain = Brain()
+            gen = brain.generate_response(model="m", messages=[])
+            self.assertEqual((await gen.__anext__())["message"]["content"], "tok0")
+            await gen.aclose()
+        self.assertEqual(closed, [True])
 
 if __name__ == '__main__':
     unittest.main()
@@ -40,5 +40,25 @@ class TestEngineMemory(unittest.TestCase):
         self.assertIsNotNone(loaded)
         self.assertEqual(loaded['messages'][0]['content'], "Hello")
 
+    def test_chat_path_lookup_skips_directory_walk(self):
+        """Saved chats resolve through the id -> path map without os.walk."""
+        from unittest.mock import patch
+        from engine.memory import Memory
+
+        memory = Memory(base_path=self.test_dir)
+        chat_data = memory.create_chat()
+        chat_data['messages'].append({"role": "user", "content": "Hello"})
+        memory.save_chat(chat_data['id'], chat_data)
+
+        fresh = Memory(base_path=self.test_dir)
+        fresh.list_chats()  # Loads the index
+        with patch('engine.memory.os.walk', side_effect=AssertionError("directory crawl")):
+            self.assertIsNotNone(memory.get_chat(chat_data['id']))
+            self.assertIsNotNone(fresh.get_chat(chat_data['id']))
+            self.assertTrue(fresh.delete_chat(chat_data['id']))
+
+        # Misses still fall back to the filesystem
+        self.assertIsNone(fresh.get_chat(chat_data['id']))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import asyncio
+import os
+import sys
+import time
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+
+try:
+    from interface.controller import Controller, STOPPED_MARKER
+except ImportError:
+    Controller = None
+
+
+class TestGenerationCancel(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        if not Controller: self.skipTest("No Controller")
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.stream_closed = asyncio.Event()
+        self.first_token = asyncio.Event()
+
+        async def endless_stream(*args, **kwargs):
+            try:
+                yield {"message": {"role": "assistant", "content": "The answer is "}}
+                self.first_token.set()
+                await asyncio.sleep(3600)  # The node keeps thinking
+                yield {"message": {"role": "assistant", "content": "never sent"}}
+            finally:
+                self.stream_closed.set()
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=endless_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            self.controller = Controller(brain, self.memory)
+        self.controller.settings['tts_autoplay'] = True
+        self.controller.speech_engine = MagicMock()
+
+        async def noop(*args):
+            pass
+        self.controller.bind_view(noop, noop)
+
+    def tearDown(self):
+        self.controller.store.close()
+        shutil.rmtree(self.test_dir)
+
+    async def test_cancel_stops_stream_and_keeps_partial_reply(self):
+        turn = asyncio.create_task(self.controller.handle_user_input("What is the answer?"))
+        await asyncio.wait_for(self.first_token.wait(), 2)
+        self.assertTrue(self.controller.is_generating)
+
+        started = time.monotonic()
+        self.assertTrue(self.controller.cancel_generation())
+        await asyncio.wait_for(turn, 2)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        self.assertTrue(self.stream_closed.is_set())  # Model stream (and its HTTP request) closed
+        self.assertFalse(self.controller.is_generating)
+        reply = self.controller.chat_history[-1]
+        self.assertEqual(reply['content'], "The answer is " + STOPPED_MARKER)
+        self.controller.speech_engine.stop.assert_called()  # Auto-read stops with the reply
+        self.assertIsNone(self.controller.speaking_msg_id)
+
+        await self.controller.store.flush()
+        saved = self.memory.get_chat(self.controller.current_chat_id)
+        self.assertEqual(saved['messages'][-1]['content'], reply['content'])
+
+    async def test_input_while_streaming_starts_no_second_turn(self):
+        turn = asyncio.create_task(self.controller.handle_user_input("What is the answer?"))
+        await asyncio.wait_for(self.first_token.wait(), 2)
+        task = self.controller._generation_task
+        history = list(self.controller.chat_history)
+
+        # Enter pressed again, then the regenerate buttons: each must return right away
+        await asyncio.wait_for(self.controller.handle_user_input("And another thing?"), 1)
+        await asyncio.wait_for(self.controller.regenerate_last_message(), 1)
+        await asyncio.wait_for(self.controller.regenerate_candidates(2), 1)
+
+        self.assertIs(self.controller._generation_task, task)
+        self.assertEqual(self.controller.chat_history, history)
+        self.assertEqual(self.controller.brain.generate_response.call_count, 1)
+        self.controller.cancel_generation()
+        await asyncio.wait_for(turn, 2)
+
+    async def test_cancel_without_generation_is_a_noop(self):
+        self.assertFalse(self.controller.cancel_generation())
+
+
+if __name__ == '__main__':
+    unittest.main()
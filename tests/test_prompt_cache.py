@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules.prompt_cache import PromptSegmentCache
+from domain.subconscious.reflection_service import ReflectionService
+
+
+def write(path, text, mtime_ns=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestPromptSegmentCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = PromptSegmentCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_reads_once_until_file_changes(self):
+        path = os.path.join(self.test_dir, "system_core.md")
+        write(path, "You are Erika.", mtime_ns=1_000_000_000)
+
+        for _ in range(5):
+            self.assertEqual(self.cache.read(path), "You are Erika.")
+        self.assertEqual(self.cache.reads, 1)
+        tokens = self.cache.tokens(path)
+        self.assertEqual(tokens, self.cache.token_counter.count("You are Erika."))
+
+        write(path, "You are Erika, a companion.", mtime_ns=2_000_000_000)
+        self.assertEqual(self.cache.read(path), "You are Erika, a companion.")
+        self.assertEqual(self.cache.reads, 2)
+        self.assertGreater(self.cache.tokens(path), tokens)
+
+        # Same mtime but a different size still counts as a change
+        write(path, "Short.", mtime_ns=2_000_000_000)
+        self.assertEqual(self.cache.read(path), "Short.")
+
+    def test_missing_file_uses_default(self):
+        path = os.path.join(self.test_dir, "erika_growth.md")
+        self.assertEqual(self.cache.read(path, "fallback"), "fallback")
+        self.assertEqual(self.cache.tokens(path), 0)
+        write(path, "Grown")
+        self.assertEqual(self.cache.read(path), "Grown")
+        os.remove(path)
+        self.assertEqual(self.cache.read(path), "")
+
+    def test_latest_reflection_lists_folder_only_on_change(self):
+        service = ReflectionService(MagicMock(), MagicMock(), MagicMock(), self.cache)
+        service.output_dir = self.test_dir
+        write(os.path.join(self.test_dir, "day_16-01-2026.md"), "Older")
+        write(os.path.join(self.test_dir, "day_17-01-2026.md"), "Newest")
+        os.utime(self.test_dir, ns=(1_000_000_000, 1_000_000_000))
+
+        self.assertEqual(service.get_latest_reflection(), "Newest")
+        with patch('domain.subconscious.reflection_service.os.listdir', side_effect=AssertionError("re-listed")):
+            self.assertEqual(service.get_latest_reflection(), "Newest")
+        self.assertEqual(self.cache.reads, 1)
+
+        write(os.path.join(self.test_dir, "day_18-01-2026.md"), "Today")
+        os.utime(self.test_dir, ns=(2_000_000_000, 2_000_000_000))
+        self.assertEqual(service.get_latest_reflection(), "Today")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from engine.memory import Memory
+from engine.modules.embedder import HashingEmbedder
+from engine.modules.vector_index import VectorIndex
+from domain.subconscious.recall_service import RecallService
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestRecallService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.recall = RecallService(self.memory, router=None, embedder=HashingEmbedder())
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.test_dir)
+
+    def _save(self, *contents):
+        chat = self.memory.create_chat()
+        for i, content in enumerate(contents):
+            chat['messages'].append({"role": "user" if i % 2 == 0 else "assistant", "content": content, "id": f"{chat['id']}-{i}"})
+        self.memory.save_chat(chat['id'], chat)
+        return chat
+
+    async def test_recalls_relevant_snippet(self):
+        self._save("My sister Anna is getting married in Porto next June", "That sounds wonderful!")
+        self._save("I repaired the bicycle chain and greased the gears today")
+        self.assertEqual(await self.recall.refresh(), 2)  # "That sounds wonderful!" is too short
+
+        block = await self.recall.recall("when is Anna getting married")
+        self.assertIn("Porto", block)
+        self.assertNotIn("bicycle", block)
+
+    async def test_refresh_is_incremental_and_persistent(self):
+        chat = self._save("We talked about learning the cello as an adult")
+        await self.recall.refresh()
+        self.assertEqual(await self.recall.refresh(), 0)
+
+        chat['messages'].append({"role": "assistant", "content": "Cello lessons twice a week would be ideal", "id": "x"})
+        self.memory.save_chat(chat['id'], chat)
+        self.assertEqual(await self.recall.refresh(), 1)
+
+        # A new process loads the saved matrix instead of re-embedding
+        fresh = RecallService(self.memory, router=None, embedder=HashingEmbedder())
+        self.assertEqual(await fresh.refresh(), 0)
+        self.assertEqual(len(fresh.index), 2)
+
+        self.memory.delete_chat(chat['id'])
+        await fresh.refresh()
+        self.assertEqual(len(fresh.index), 0)
+
+    async def test_refresh_lists_only_new_entries(self):
+        chat = self._save("We talked about learning the cello as an adult")
+        await self.recall.refresh()
+        with patch.object(self.memory, "search_entries", wraps=self.memory.search_entries) as listing:
+            chat['messages'].append({"role": "assistant", "content": "Cello lessons twice a week would be ideal", "id": "x"})
+            self.memory.save_chat(chat['id'], chat)
+            self.assertEqual(await self.recall.refresh(), 1)
+        # Only the new entry's text was fetched; no listing of every entry
+        self.assertEqual([c.args[0] is None for c in listing.call_args_list], [False])
+
+        # A replaced entry still leads to a full diff that drops the old vector
+        chat['messages'][1]['content'] = "Cello lessons once a week are enough for now"
+        self.memory.save_chat(chat['id'], chat)
+        self.assertEqual(await self.recall.refresh(), 1)
+        self.assertEqual(len(self.recall.index), 2)
+
+    async def test_embed_failure_backs_off(self):
+        self._save("We talked about learning the cello as an adult")
+        with patch.object(self.recall.embedder, "embed", side_effect=ConnectionError("offline")), \
+                self.assertLogs("domain.subconscious.recall", level="ERROR") as logs:
+            self.assertEqual(await self.recall.refresh(), 0)
+        self.assertEqual(len(logs.records), 1)
+
+        self.recall.schedule_refresh()
+        self.assertIsNone(self.recall._refresh_task)  # Backing off
+
+        self.recall.retry()
+        self.recall.schedule_refresh()
+        self.assertEqual(await self.recall._refresh_task, 1)
+
+    async def test_excluded_refs_and_token_budget(self):
+        chat = self._save(*[f"Garden note {i}: tomatoes need more water and sunlight in the garden" for i in range(6)])
+        await self.recall.refresh()
+
+        excluded = {f"{chat['id']}-0", f"{chat['id']}-1"}
+        block = await self.recall.recall("garden tomatoes water", exclude_refs=excluded)
+        self.assertNotIn("Garden note 0:", block)
+        self.assertNotIn("Garden note 1:", block)
+
+        self.recall.token_budget = 40
+        small = await self.recall.recall("garden tomatoes water")
+        self.assertLessEqual(self.recall.token_counter.count(small), 40)
+        self.assertEqual(small.count("Garden note"), 1)
+
+    def test_vector_top_k_orders_by_score(self):
+        index = VectorIndex(self.test_dir, "test")
+        vectors = np.eye(3, dtype=np.float32)
+        index.add([{"key": k} for k in "abc"], vectors)
+        hits = index.top_k(np.array([0.1, 0.9, 0.5]), 2)
+        self.assertEqual([h["key"] for h in hits], ["b", "c"])
+        index.remove({"b"})
+        self.assertEqual([h["key"] for h in index.top_k(np.array([0.1, 0.9, 0.5]), 2)], ["c", "a"])
+
+    async def test_generation_prompt_includes_recall(self):
+        if not Controller: self.skipTest("No Controller")
+        self._save("My favourite tea is smoked lapsang souchong from Fujian")
+
+        captured = {}
+
+        async def fake_stream(*args, **kwargs):
+            captured['messages'] = kwargs.get('messages')
+            yield {"message": {"role": "assistant", "content": "Noted."}}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, self.memory)
+        controller.recall_service = self.recall
+        await self.recall.refresh()
+
+        await controller.handle_user_input("Which tea do I like, lapsang souchong?")
+        controller.store.close()
+
+        system_prompt = captured['messages'][0]['content']
+        self.assertIn("LONG-TERM MEMORY", system_prompt)
+        self.assertIn("Fujian", system_prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
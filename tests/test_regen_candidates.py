@@ -0,0 +1,151 @@
+import unittest
+import asyncio
+import os
+import sys
+import time
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+
+try:
+    from interface.controller import Controller, STOPPED_MARKER
+except ImportError:
+    Controller = None
+
+GENERATION_S = 0.3  # Simulated time for one reply
+
+
+class TestRegenCandidates(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        if not Controller: self.skipTest("No Controller")
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.hosts = []
+        self.streamed = []
+
+        async def slow_stream(model, messages, host, options, **kwargs):
+            self.hosts.append(host)
+            for word in ("Reply ", "from ", model):
+                await asyncio.sleep(GENERATION_S / 3)
+                yield {"message": {"role": "assistant", "content": word}}
+            yield {"done": True, "eval_count": 3 if host == self.controller.brain_router.LOCAL_BRAIN else 7,
+                   "eval_duration": 1_000_000}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=slow_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            self.controller = Controller(brain, self.memory)
+
+        async def noop(*args):
+            pass
+
+        async def on_stream(msg_id, delta):
+            self.streamed.append(msg_id)
+        self.controller.bind_view(noop, on_stream)
+
+    def tearDown(self):
+        self.controller.store.close()
+        shutil.rmtree(self.test_dir)
+
+    async def _chat_with_reply(self):
+        await self.controller.handle_user_input("Tell me something.")
+        self.hosts.clear()
+        self.streamed.clear()
+
+    async def test_candidates_run_in_parallel_on_both_nodes(self):
+        await self._chat_with_reply()
+        router = self.controller.brain_router
+        router.status['remote'] = True
+
+        started = time.monotonic()
+        await self.controller.regenerate_candidates(2)
+        elapsed = time.monotonic() - started
+        self.assertLess(elapsed, GENERATION_S * 1.7)  # One generation's time, not two
+
+        self.assertEqual(sorted(self.hosts), sorted([router.LOCAL_BRAIN, router.REMOTE_BRAIN]))
+        reply = self.controller.chat_history[-1]
+        candidates = reply['candidates']
+        self.assertEqual([c['node'] for c in candidates], ['local', 'remote'])
+        self.assertEqual(candidates[0]['content'], f"Reply from {router.LOCAL_MODEL}")
+        self.assertEqual(candidates[1]['content'], f"Reply from {router.REMOTE_MODEL}")
+        self.assertEqual(set(self.streamed), {c['id'] for c in candidates})  # Each streams into its own bubble
+        self.assertEqual(len(self.controller.chat_history), 2)  # Replaced, not appended
+
+        await self.controller.choose_candidate(reply['id'], candidates[1]['id'])
+        self.assertEqual(reply['content'], f"Reply from {router.REMOTE_MODEL}")
+        self.assertNotIn('candidates', reply)
+        await self.controller.store.flush()
+        saved = self.memory.get_chat(self.controller.current_chat_id)
+        self.assertEqual(saved['messages'][-1]['content'], reply['content'])
+        self.assertNotIn('candidates', saved['messages'][-1])
+
+    async def test_chosen_candidate_stats_are_published(self):
+        await self._chat_with_reply()
+        self.controller.brain_router.status['remote'] = True
+        await self.controller.regenerate_candidates(2)
+        reply = self.controller.chat_history[-1]
+        local, remote = reply['candidates']
+        self.assertEqual(local['stats']['completion_tokens'], 3)
+        self.assertEqual(remote['stats']['completion_tokens'], 7)
+
+        await self.controller.choose_candidate(reply['id'], local['id'])
+        self.assertEqual(self.controller.last_generation_stats['completion_tokens'], 3)  # Not the last to finish
+
+    async def test_remote_offline_regenerates_a_single_reply(self):
+        await self._chat_with_reply()
+        router = self.controller.brain_router
+        router.status['remote'] = False
+        self.assertFalse(self.controller.alternatives_available)
+        await self.controller.regenerate_candidates(3)
+        self.assertEqual(self.hosts, [router.LOCAL_BRAIN])  # Not three in a row on the one node
+        reply = self.controller.chat_history[-1]
+        self.assertEqual(reply['content'], f"Reply from {router.LOCAL_MODEL}")
+        self.assertNotIn('candidates', reply)
+        self.assertEqual(len(self.controller.chat_history), 2)
+
+    async def test_unchosen_candidates_are_not_saved(self):
+        await self._chat_with_reply()
+        self.controller.brain_router.status['remote'] = True
+        await self.controller.regenerate_candidates(2)
+        reply = self.controller.chat_history[-1]
+        self.assertEqual(len(reply['candidates']), 2)
+
+        await self.controller.store.flush()
+        saved = self.memory.get_chat(self.controller.current_chat_id)['messages'][-1]
+        self.assertEqual(saved['content'], reply['candidates'][0]['content'])  # The shown one stands for the reply
+        self.assertNotIn('candidates', saved)
+
+        await self.controller.choose_candidate(reply['id'], reply['candidates'][1]['id'])
+        await self.controller.store.flush()
+        log = self.memory._search_chat_path(self.controller.current_chat_id)
+        with open(log, encoding='utf-8') as f:
+            self.assertNotIn('"candidates"', f.read())  # Not in any record, chosen or not
+
+    async def test_new_message_keeps_the_shown_candidate(self):
+        await self._chat_with_reply()
+        self.controller.brain_router.status['remote'] = True
+        await self.controller.regenerate_candidates(2)
+        shown = self.controller.chat_history[-1]['content']
+        await self.controller.handle_user_input("Next question.")
+        previous = self.controller.chat_history[-3]
+        self.assertEqual(previous['content'], shown)
+        self.assertNotIn('candidates', previous)
+
+    async def test_cancel_stops_all_candidates(self):
+        await self._chat_with_reply()
+        self.controller.brain_router.status['remote'] = True
+        task = asyncio.create_task(self.controller.regenerate_candidates(2))
+        await asyncio.sleep(GENERATION_S / 2)
+        self.assertTrue(self.controller.cancel_generation())
+        await asyncio.wait_for(task, 1)
+        for candidate in self.controller.chat_history[-1]['candidates']:
+            self.assertTrue(candidate['content'].endswith(STOPPED_MARKER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.search_index import SearchIndex, build_match_query
+from tools.safe_tools import SafeTools
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.chats_dir = os.path.join(self.test_dir, "chats")
+        self.reflections_dir = os.path.join(self.test_dir, "reflections")
+        os.makedirs(self.reflections_dir)
+        self.memory = Memory(base_path=self.chats_dir)
+        self.memory.add_search_folder("reflection", self.reflections_dir)
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.test_dir)
+
+    def _save(self, *contents):
+        chat = self.memory.create_chat()
+        for i, content in enumerate(contents):
+            chat['messages'].append({"role": "user" if i % 2 == 0 else "assistant", "content": content, "id": f"m{i}"})
+        self.memory.save_chat(chat['id'], chat)
+        return chat
+
+    def test_save_chat_is_searchable_with_snippet(self):
+        chat = self._save("Let's plan the trip to Lisbon", "Lisbon in spring is lovely.")
+        self._save("Something unrelated about gardening")
+
+        hits = self.memory.search("lisbon")
+        self.assertEqual(len(hits), 2)
+        self.assertEqual({h['chat_id'] for h in hits}, {chat['id']})
+        self.assertIn("[Lisbon]", hits[0]['snippet'])
+        self.assertIsNotNone(hits[0]['date'])
+
+    def test_edits_and_deletes_update_the_index(self):
+        chat = self._save("Original wording about volcanoes")
+        chat['messages'][0]['content'] = "Rewritten wording about glaciers"
+        self.memory.save_chat(chat['id'], chat)
+        self.assertEqual(self.memory.search("volcanoes"), [])
+        self.assertEqual(len(self.memory.search("glaciers")), 1)
+
+        self.memory.delete_chat(chat['id'])
+        self.assertEqual(self.memory.search("glaciers"), [])
+
+    def test_saves_touch_only_changed_rows(self):
+        chat = self._save(*[f"Message about topic {i}" for i in range(200)])
+        self.memory.search("topic")  # Index is ready
+
+        with patch.object(SearchIndex, "_write_row", autospec=True, side_effect=SearchIndex._write_row) as write_row:
+            chat['messages'].append({"role": "assistant", "content": "A reply about comets", "id": "new"})
+            self.memory.save_chat(chat['id'], chat)
+            self.assertEqual(write_row.call_count, 1)
+            chat['messages'][10]['pinned'] = True
+            self.memory.save_chat(chat['id'], chat)
+            self.assertEqual(write_row.call_count, 1)
+
+        # Regenerated reply: the old row goes, the new one is found
+        chat['messages'][-1] = {"role": "assistant", "content": "A reply about meteors", "id": "regen"}
+        self.memory.save_chat(chat['id'], chat)
+        self.assertEqual(self.memory.search("comets"), [])
+        self.assertEqual([h['index'] for h in self.memory.search("meteors")], [200])
+        del chat['messages'][150:]
+        self.memory.save_chat(chat['id'], chat)
+        self.assertEqual(self.memory.search("meteors"), [])
+        self.assertEqual(len(self.memory.search("topic")), 10)  # MAX_RESULTS; rows past 150 are gone
+        self.assertEqual(len(self.memory.search_entries(include_content=False)), 150)
+
+    def test_reflections_are_indexed_by_mtime(self):
+        path = os.path.join(self.reflections_dir, "day_18-01-2026.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# Morning Perspective\n\nWe talked about the orchard and the harvest.")
+
+        hits = self.memory.search("orchard")
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]['kind'], "reflection")
+        self.assertEqual(hits[0]['date'], "18-01-2026")
+
+        # Unchanged files are not re-read
+        with patch('builtins.open', side_effect=AssertionError("reflection re-read")):
+            self.assertEqual(len(self.memory.search("harvest")), 1)
+
+    def test_existing_archive_is_backfilled(self):
+        self._save("An old message about telescopes")
+        self.memory.close()
+        os.remove(os.path.join(self.chats_dir, ".search_index.db"))
+
+        self.memory = Memory(base_path=self.chats_dir)
+        self.assertEqual(len(self.memory.search("telescopes")), 1)
+
+    def test_query_syntax_is_escaped(self):
+        self._save("C++ templates (and \"quotes\")")
+        self.assertEqual(build_match_query('  "AND" -x'), '"AND" "x"*')
+        self.assertEqual(len(self.memory.search('templates AND ("quotes')), 1)
+        self.assertEqual(self.memory.search("!!!"), [])
+
+    def test_safe_tools_uses_index(self):
+        chat = self._save("The password hint is a blue heron")
+        tools = SafeTools(self.test_dir, memory=self.memory)
+        result = tools.search_memory("heron")
+        self.assertIn(chat['id'], result)
+        self.assertIn("[heron]", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules import codec
+from engine.modules.settings_store import SettingsStore
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestSettingsStore(unittest.TestCase):
+    def setUp(self):
+        self.data = {"value": 0}
+        self.written = []
+        self.store = SettingsStore(delay=0.05, max_delay=0.3)
+        self.store.register("doc", lambda: dict(self.data), self.written.append)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_burst_of_changes_is_one_write_of_the_latest_state(self):
+        for i in range(50):
+            self.data["value"] = i
+            self.store.mark_dirty("doc")
+        self.assertTrue(self.store.is_dirty("doc"))
+        self.assertEqual(self.written, [])  # Nothing written synchronously
+        time.sleep(0.2)
+        self.assertEqual(self.written, [{"value": 49}])
+        self.assertFalse(self.store.is_dirty("doc"))
+
+    def test_continuous_changes_are_written_by_max_delay(self):
+        start = time.monotonic()
+        while time.monotonic() - start < 0.5:
+            self.data["value"] += 1
+            self.store.mark_dirty("doc")
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(self.written), 1)  # Still dragging, but saved by max_delay
+        self.assertLess(len(self.written), 5)
+
+    def test_snapshot_is_taken_when_marked(self):
+        self.store.mark_dirty("doc")
+        self.data["value"] = 99  # Change without marking: not part of the pending write
+        self.store.flush()
+        self.assertEqual(self.written, [{"value": 0}])
+
+    def test_close_flushes_pending_changes(self):
+        self.data["value"] = 7
+        self.store.mark_dirty("doc")
+        self.assertTrue(self.store.close(timeout=2.0))
+        self.assertEqual(self.written, [{"value": 7}])
+        self.store.mark_dirty("doc")  # Late change after shutdown is written inline
+        self.assertEqual(len(self.written), 2)
+
+    def test_controller_slider_drag_writes_config_once(self):
+        if not Controller: self.skipTest("No Controller")
+        test_dir = tempfile.mkdtemp()
+        try:
+            with patch('interface.controller.SystemMonitor.start'):
+                controller = Controller(MagicMock(), MagicMock())
+            controller.settings_path = os.path.join(test_dir, "user.json")
+            controller.brain_router.config_path = os.path.join(test_dir, "llm_config.json")
+            with patch('engine.modules.codec.write_json', wraps=codec.write_json) as write_json:
+                for i in range(30):
+                    controller.set_sys_temperature(0.5 + i / 100)
+                    controller.set_tts_volume(i / 30)
+                    controller.update_window_geometry({'x': i, 'y': 0, 'width': 800, 'height': 600})
+                self.assertEqual(write_json.call_count, 0)
+                controller.settings_store.close()
+                self.assertEqual(write_json.call_count, 2)  # One user.json, one llm_config.json
+
+            user = codec.read_json(controller.settings_path)
+            self.assertEqual(user["window_x"], 29)
+            self.assertAlmostEqual(user["tts_volume"], 29 / 30)
+            llm = codec.read_json(controller.brain_router.config_path)
+            self.assertAlmostEqual(llm["consciousness_5070ti"]["options"]["temperature"], 0.79)
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -64,5 +64,45 @@ class TestSpeechEngine(unittest.TestCase):
         self.engine.set_volume(-0.5)
         self.assertEqual(self.engine.volume, 0.0)
 
+    def _mock_model(self, stream):
+        """Fake TTS model and audio output (the real service has no model without pocket_tts)."""
+        model = MagicMock()
+        model.generate_audio_stream.side_effect = stream
+        self.engine._service.tts_model = model
+        patcher = patch('mcp_tools.erika_voice.service.sd')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_enqueued_utterances_play_in_order(self):
+        """Queued sentences play back-to-back; the callback runs after the last one."""
+        played = []
+        done = threading.Event()
+        self._mock_model(lambda state, text: played.append(text) or [])
+
+        self.assertTrue(self.engine.enqueue("First sentence."))
+        self.assertTrue(self.engine.enqueue("Second sentence."))
+        self.assertTrue(self.engine.enqueue("", done.set))
+        self.assertTrue(done.wait(2))
+        self.assertEqual(played, ["First sentence.", "Second sentence."])
+
+    def test_stop_clears_queue(self):
+        """Stopping drops queued sentences."""
+        played = []
+
+        def slow_stream(state, text):
+            played.append(text)
+            for _ in range(3):
+                time.sleep(0.05)
+                yield MagicMock()
+
+        self._mock_model(slow_stream)
+        self.engine.enqueue("One.")
+        self.engine.enqueue("Two.")
+        self.engine.stop()
+        time.sleep(0.2)
+        self.assertFalse(self.engine.is_speaking)
+        self.assertNotIn("Two.", played)
+
+
 if __name__ == '__main__':
     unittest.main()
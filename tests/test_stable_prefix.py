@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestStablePrefix(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        if not Controller: self.skipTest("No Controller")
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.prompts = []
+        self.calls = []
+
+        async def fake_stream(*args, **kwargs):
+            self.prompts.append([dict(m) for m in kwargs['messages']])
+            self.calls.append(kwargs)
+            yield {"message": {"role": "assistant", "content": "A reply with a handful of words in it."}}
+            yield {"done": True, "prompt_eval_count": 12, "prompt_eval_duration": 34_000_000,
+                   "eval_count": 9, "eval_duration": 90_000_000}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            self.controller = Controller(brain, self.memory)
+        self.controller.brain_router.llm_config = {"consciousness_5070ti": {"options": {"num_ctx": 700}}}
+        self.controller.settings['stable_prefix'] = True
+        self.controller.recall_service.schedule_refresh = MagicMock()
+
+        async def noop(*args):
+            pass
+        self.controller.bind_view(noop, noop)
+
+    def tearDown(self):
+        self.controller.store.close()
+        shutil.rmtree(self.test_dir)
+
+    async def _turns(self, count):
+        for i in range(count):
+            await self.controller.handle_user_input(f"Question number {i} about the weather and the garden")
+
+    async def test_prompt_prefix_is_stable_between_block_trims(self):
+        with patch.object(self.controller, 'build_system_sections', wraps=self.controller.build_system_sections) as build:
+            await self._turns(20)
+        self.assertEqual(build.call_count, 1)  # Frozen for the chat
+        self.assertEqual(len({p[0]['content'] for p in self.prompts}), 1)
+
+        # Most turns extend the previous prompt; only block trims rewrite it
+        rewrites = sum(1 for prev, cur in zip(self.prompts, self.prompts[1:]) if cur[:len(prev)] != prev)
+        self.assertGreater(rewrites, 0)
+        self.assertLess(rewrites, len(self.prompts) // 3)
+
+        target = self.controller._calc_context_target(700)
+        for prompt in self.prompts:
+            self.assertLessEqual(self.controller.token_counter.count_messages(prompt), target)
+
+    async def test_keep_alive_and_prefill_stats(self):
+        await self._turns(1)
+        self.assertEqual(self.calls[0]['keep_alive'], "30m")
+        stats = self.controller.last_generation_stats
+        self.assertEqual(stats['mode'], "stable")
+        self.assertAlmostEqual(stats['prefill_ms'], 34.0)
+        self.assertEqual(stats['prefill_tokens'], 12)
+
+    async def test_rolling_mode_leaves_keep_alive_to_the_config(self):
+        self.controller.settings['stable_prefix'] = False
+        await self._turns(1)
+        self.assertNotIn('keep_alive', self.calls[0])  # Ollama's own residency setting applies
+
+        self.controller.brain_router.llm_config["consciousness_5070ti"]["keep_alive"] = "5m"
+        await self._turns(1)
+        self.assertEqual(self.calls[1]['keep_alive'], "5m")
+
+    async def test_regenerating_before_the_cut_resets_it(self):
+        await self._turns(20)
+        state = self.controller._stable_context
+        self.assertGreater(state['cut'], 0)
+        del self.controller.chat_history[state['cut'] - 2:]
+        await self._turns(1)
+        self.assertEqual(self.controller._stable_context['cut'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
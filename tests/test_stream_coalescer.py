@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.stream_coalescer import StreamCoalescer
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestStreamCoalescer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = []
+        self.coalescer = StreamCoalescer(lambda msg_id, text: self.sent.append((msg_id, text)), fps=25)
+
+    async def test_fast_tokens_are_batched_per_frame(self):
+        for i in range(200):
+            self.coalescer.push("m1", f"tok{i} ")
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual("".join(text for _, text in self.sent), "".join(f"tok{i} " for i in range(200)))
+        self.assertEqual(self.sent[0], ("m1", "tok0 "))  # First token is not held back
+        self.assertLess(len(self.sent), 20)
+
+    async def test_discard_drops_queued_text(self):
+        self.coalescer.push("m1", "shown")
+        await asyncio.sleep(0)
+        self.coalescer.push("m1", " re-rendered")
+        self.coalescer.push("m2", " other")
+        self.coalescer.discard("m1")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.sent, [("m1", "shown"), ("m2", " other")])
+
+    async def test_async_sender_errors_do_not_stop_streaming(self):
+        calls = []
+
+        async def send(msg_id, text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise RuntimeError("client gone")
+
+        coalescer = StreamCoalescer(send, fps=100)
+        coalescer.push("m1", "a")
+        await asyncio.sleep(0.005)
+        coalescer.push("m1", "b")
+        await asyncio.sleep(0.05)
+        self.assertEqual(calls, ["a", "b"])
+
+    async def test_controller_streams_appended_text_only(self):
+        if not Controller: self.skipTest("No Controller")
+        test_dir = tempfile.mkdtemp()
+        memory = Memory(base_path=test_dir)
+
+        async def fake_stream(*args, **kwargs):
+            for word in ["Once ", "upon ", "a ", "time."]:
+                yield {"message": {"role": "assistant", "content": word}}
+            yield {"message": {"role": "assistant", "content": ""}, "done": True}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, memory)
+        deltas = []
+
+        async def noop(*args):
+            pass
+        controller.bind_view(noop, lambda msg_id, delta: deltas.append(delta))
+        try:
+            await controller.handle_user_input("Tell me a story")
+        finally:
+            controller.store.close()
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(deltas, ["Once ", "upon ", "a ", "time."])
+        self.assertEqual(controller.chat_history[-1]['content'], "Once upon a time.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.sentence_splitter import SentenceSplitter
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+try:
+    from tools.mcp_tts_client import McpTtsClient
+except ImportError:
+    McpTtsClient = None
+
+REPLY = ("Hmm. Well, that is a hard question to answer! (She pauses. Thinks about it.) "
+         "I think the answer is 3.5 apples, really?! A new line starts here\n"
+         "**Done.** Bye now, friend of mine.")
+
+
+class TestSentenceSplitter(unittest.TestCase):
+    def split(self, text: str, step: int) -> list:
+        splitter = SentenceSplitter()
+        sentences = []
+        for i in range(0, len(text), step):
+            sentences += splitter.feed(text[i:i + step])
+        return sentences + [splitter.flush()]
+
+    def test_same_sentences_for_any_chunking(self):
+        expected = self.split(REPLY, len(REPLY))
+        self.assertEqual(expected, [
+            "Hmm. Well, that is a hard question to answer!",
+            "(She pauses. Thinks about it.) I think the answer is 3.5 apples, really?!",
+            "A new line starts here\n**Done.**",  # Too short to be spoken on its own
+            "Bye now, friend of mine.",
+        ])
+        for step in (1, 2, 5, 13):
+            self.assertEqual(self.split(REPLY, step), expected)
+
+    def test_no_cut_inside_brackets(self):
+        sentences = self.split("[Leans back. Smiles. Looks out of the window.] So that was the plan.", 4)
+        self.assertEqual(sentences, ["[Leans back. Smiles. Looks out of the window.] So that was the plan."])
+
+
+class TestStreamedTts(unittest.IsolatedAsyncioTestCase):
+    async def test_speech_starts_before_generation_ends(self):
+        if not Controller: self.skipTest("No Controller")
+        test_dir = tempfile.mkdtemp()
+        memory = Memory(base_path=test_dir)
+        events = []
+
+        async def fake_stream(*args, **kwargs):
+            for word in REPLY.split(" "):
+                events.append(("token", word))
+                yield {"message": {"role": "assistant", "content": word + " "}}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, memory)
+        controller.settings['tts_autoplay'] = True
+        controller.speech_engine = MagicMock()
+        controller.speech_engine.enqueue.side_effect = lambda text, on_finished=None: events.append(("speak", text))
+
+        async def noop(*args):
+            pass
+        controller.bind_view(noop, noop)
+        try:
+            await controller.handle_user_input("Hard question?")
+        finally:
+            controller.store.close()
+            shutil.rmtree(test_dir)
+
+        spoken = [text for kind, text in events if kind == "speak" and text]
+        first_speech = next(i for i, (kind, _) in enumerate(events) if kind == "speak")
+        self.assertLess(first_speech, 12)  # Right after the first sentence, not after the reply
+        self.assertEqual(spoken[0], ". Hmm. Well, that is a hard question to answer!")
+        self.assertNotIn("pauses", " ".join(spoken))
+        self.assertTrue(spoken[-1].endswith("Bye now, friend of mine."))
+        # The last utterance carries the callback that resets the speaker icon
+        self.assertIsNotNone(controller.speech_engine.enqueue.call_args[0][1])
+        self.assertEqual(controller.speaking_msg_id, controller.chat_history[-1]['id'])
+
+
+class TestMcpTtsClientQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_stop_drops_utterances_still_waiting_to_be_sent(self):
+        if not McpTtsClient: self.skipTest("No MCP client")
+        sent = []
+        release = asyncio.Event()
+
+        async def call_tool(name, arguments):
+            if name == "enqueue":
+                sent.append(arguments["text"])
+                await release.wait()  # Server busy: later utterances wait on the client lock
+            return MagicMock(content=[MagicMock(text='{"is_speaking": false}')])
+
+        client = McpTtsClient()
+        client.session = MagicMock()
+        client.session.call_tool = MagicMock(side_effect=call_tool)
+        await client.start()
+        finished = asyncio.Event()
+        client.enqueue("First sentence.")
+        client.enqueue("Second sentence.")
+        client.enqueue("Third sentence.", on_finished=finished.set)
+        await asyncio.sleep(0.05)
+        client.stop()
+        release.set()
+        await asyncio.wait_for(finished.wait(), 2)
+
+        self.assertEqual(sent, ["First sentence."])
+        client.enqueue("After stop.")
+        await asyncio.sleep(0.05)
+        self.assertEqual(sent, ["First sentence.", "After stop."])
+
+
+if __name__ == '__main__':
+    unittest.main()
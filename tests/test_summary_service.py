@@ -0,0 +1,130 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory, SUMMARY_EXT
+from domain.subconscious import summary_service
+from domain.subconscious.summary_service import SummaryService
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class FakeBrain:
+    """Answers every summarization request with the number of transcript lines it saw."""
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_response(self, model, messages, host=None, options=None):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        part = prompt.split("NEXT PART OF THE CONVERSATION:\n")[1].split("\n\nTASK:")[0]
+        yield {"message": {"content": f"Summary after {len(self.prompts)} folds; last: {part.splitlines()[-1]}"}}
+
+
+class TestSummaryService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.memory = Memory(base_path=self.test_dir)
+        self.router = MagicMock(REMOTE_BRAIN="http://remote", REMOTE_MODEL="gemma2:9b")
+        self.router.status = {'remote': True}
+        self.brain = FakeBrain()
+        self.service = SummaryService(self.brain, self.memory, self.router)
+        self.chat = self.memory.create_chat()
+        for i in range(40):
+            self.chat['messages'].append({"role": "user" if i % 2 == 0 else "assistant",
+                                          "content": f"Turn {i} " + "words " * 30, "id": f"m{i}"})
+        self.memory.save_chat(self.chat['id'], self.chat)
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.test_dir)
+
+    async def test_summary_is_folded_stored_and_extended(self):
+        history = self.chat['messages']
+        summary = await self.service.update(self.chat['id'], history[:10])
+        self.assertEqual((summary['count'], summary['covers']), (10, "m9"))
+        self.assertIn("last: Erika: Turn 9", summary['text'])
+
+        # Stored next to the chat and picked up by a fresh service
+        fresh = SummaryService(self.brain, Memory(base_path=self.test_dir), self.router)
+        self.assertEqual((await fresh.load(self.chat['id']))['text'], summary['text'])
+
+        # Only the newly evicted messages are sent on the next update
+        folds = len(self.brain.prompts)
+        extended = await self.service.update(self.chat['id'], history[:14])
+        self.assertEqual(extended['count'], 14)
+        self.assertEqual(len(self.brain.prompts), folds + 1)
+        self.assertNotIn("Turn 9 ", self.brain.prompts[-1].split("NEXT PART")[1])
+        self.assertIn("SUMMARY SO FAR:\n" + summary['text'], self.brain.prompts[-1])
+
+    async def test_long_prefix_is_folded_in_chunks(self):
+        with patch.object(summary_service, 'SUMMARY_CHUNK_TOKENS', 200):
+            summary = await self.service.update(self.chat['id'], self.chat['messages'][:30])
+        self.assertGreater(len(self.brain.prompts), 1)
+        self.assertEqual(summary['count'], 30)
+
+    async def test_update_reads_evicted_messages_before_the_loaded_tail(self):
+        # The caller holds messages 20.. only; 0-19 come from memory
+        summary = await self.service.update(self.chat['id'], self.chat['messages'][20:24], 20)
+        self.assertEqual((summary['count'], summary['covers']), (24, "m23"))
+        self.assertIn("Turn 0 ", self.brain.prompts[0])
+        self.assertTrue(self.service.is_valid(summary, self.chat['messages'][20:], 20))
+        self.assertFalse(self.service.is_valid(summary, [{"id": "other"}] * 20, 20))
+
+    async def test_edited_prefix_invalidates_summary(self):
+        history = [dict(m) for m in self.chat['messages']]
+        summary = await self.service.update(self.chat['id'], history[:10])
+        self.assertTrue(self.service.is_valid(summary, history))
+        history[9]['id'] = "regenerated"
+        self.assertFalse(self.service.is_valid(summary, history))
+
+    async def test_offline_subconscious_is_not_used(self):
+        self.router.status = {'remote': False}
+        self.service.schedule_update(self.chat['id'], self.chat['messages'][:10])
+        self.assertEqual(self.brain.prompts, [])
+
+    async def test_summary_file_follows_chat_lifecycle(self):
+        await self.service.update(self.chat['id'], self.chat['messages'][:10])
+        day_folder = os.path.dirname(self.memory._find_chat_path(self.chat['id']))
+        self.assertTrue(os.path.exists(os.path.join(day_folder, self.chat['id'] + SUMMARY_EXT)))
+        self.assertEqual(self.memory.rebuild_index(), 1)  # Not mistaken for a chat
+
+        self.memory.delete_chat(self.chat['id'])
+        self.assertEqual(os.listdir(day_folder), [])
+
+    async def test_controller_injects_summary_for_evicted_turns(self):
+        if not Controller: self.skipTest("No Controller")
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(self.brain, self.memory)
+        controller.summary_service = self.service
+        controller.current_chat_id = self.chat['id']
+        history = self.chat['messages']
+        await self.service.update(self.chat['id'], history[:5])
+
+        system = {"role": "system", "content": "System prompt"}
+        budget = controller.token_counter.count_messages([system] + history) // 2
+        trimmed, was_trimmed = controller._trim_context_messages([system] + history, budget)
+        self.assertTrue(was_trimmed)
+        with patch.object(self.service, 'schedule_update') as schedule:
+            messages, injected = await controller._apply_history_summary(history, trimmed, budget)
+
+        self.assertTrue(injected)
+        self.assertEqual(messages[0], system)
+        self.assertIn("EARLIER IN THIS CONVERSATION", messages[1]['content'])
+        self.assertLessEqual(controller.token_counter.count_messages(messages), budget)
+        # The summary lags behind what was evicted, so it is asked to catch up
+        evicted = schedule.call_args[0][1]
+        self.assertEqual(evicted[-1]['id'], history[history.index(messages[2]) - 1]['id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
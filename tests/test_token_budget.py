@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.token_budget import plan_budget, merge_shares, DEFAULT_SHARES
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestTokenBudget(unittest.IsolatedAsyncioTestCase):
+    def test_sections_are_capped_and_recent_turns_get_the_rest(self):
+        plan = plan_budget(10000, {"core": 300, "soul": 5000, "growth": 0, "recall": 400})
+        sections = plan["sections"]
+        self.assertEqual(sections["headroom"]["budget"], 625)
+        self.assertEqual(plan["target"], 10000 - 625)
+        self.assertEqual(sections["core"]["granted"], 300)  # Under its share: what it needs
+        self.assertEqual(sections["soul"]["granted"], 1000)  # Over its share: capped
+        self.assertEqual(sections["growth"]["granted"], 0)
+        self.assertEqual(sections["recent"]["budget"], plan["target"] - 300 - 1000 - 400)
+
+    def test_overrides_are_merged_and_scaled(self):
+        shares = merge_shares({"growth": 0.0, "headroom": 0.1})
+        self.assertEqual(shares["growth"], 0.0)
+        self.assertEqual(shares["soul"], DEFAULT_SHARES["soul"])
+        too_much = merge_shares({"recent": 2.0})
+        self.assertAlmostEqual(sum(too_much.values()), 1.0)
+
+    async def test_controller_caps_long_growth_text_and_reports_plan(self):
+        if not Controller: self.skipTest("No Controller")
+        test_dir = tempfile.mkdtemp()
+        memory = Memory(base_path=test_dir)
+        captured = {}
+
+        async def fake_stream(*args, **kwargs):
+            captured['messages'] = kwargs['messages']
+            yield {"message": {"role": "assistant", "content": "Sure."}}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, memory)
+        controller.brain_router.llm_config = {"consciousness_5070ti": {"options": {"num_ctx": 2000}}}
+        sections = [
+            {"name": "core", "text": "You are a helpful assistant.", "priority": 4},
+            {"name": "growth", "text": "I grew. " * 2000, "priority": 2, "prefix": "\n\n"},
+            {"name": "user", "text": "CURRENT USER: Sam", "priority": 5, "prefix": "\n\n"},
+        ]
+        controller.build_system_sections = lambda: [dict(s) for s in sections]
+
+        async def noop(*args):
+            pass
+        controller.bind_view(noop, noop)
+        try:
+            for i in range(3):
+                await controller.handle_user_input(f"Message {i}: tell me about the garden.")
+        finally:
+            controller.store.close()
+            shutil.rmtree(test_dir)
+
+        plan = controller.get_extended_status()['context_plan']
+        growth = plan['sections']['growth']
+        self.assertEqual(growth['budget'], int(2000 * DEFAULT_SHARES['growth']))
+        self.assertLessEqual(growth['used'], growth['budget'])
+        self.assertGreater(growth['wanted'], growth['budget'])
+        system_prompt = captured['messages'][0]['content']
+        self.assertIn("CURRENT USER: Sam", system_prompt)  # The long section did not push out the rest
+        self.assertEqual(len(captured['messages']), 1 + 5)  # Whole conversation still fits
+        self.assertEqual(plan['prompt_tokens'], controller.token_counter.count_messages(captured['messages']))
+        self.assertLessEqual(plan['prompt_tokens'], plan['target'])
+
+
+if __name__ == '__main__':
+    unittest.main()
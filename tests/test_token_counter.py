@@ -1,6 +1,7 @@
 
 import unittest
-from engine.modules.token_counter import TokenCounter
+from unittest.mock import patch
+from engine.modules.token_counter import TokenCounter, TOKENS_FIELD
 
 class TestTokenCounter(unittest.TestCase):
     def setUp(self):
@@ -24,5 +25,34 @@ class TestTokenCounter(unittest.TestCase):
         content_tokens = self.counter.count("You are a helpful assistant.") + self.counter.count("Hello!")
         self.assertGreater(count, content_tokens)
 
+    def test_message_counts_are_cached(self):
+        messages = [{"role": "user", "content": "A message that is counted once " * 5}]
+        first = self.counter.count_messages(messages)
+        with patch.object(self.counter, 'count', side_effect=AssertionError("re-tokenized")):
+            self.assertEqual(self.counter.count_messages(messages), first)
+    def test_counts_are_stored_on_chat_messages(self):
+        msg = {"role": "user", "content": "Stored with the message " * 4, "id": "a"}
+        system = {"role": "system", "content": "Not a chat message"}
+        first = self.counter.count_messages([msg])
+        self.counter.count_messages([system])
+        self.assertEqual(msg[TOKENS_FIELD]["n"], self.counter.count(msg["content"]))
+        self.assertTrue(msg[TOKENS_FIELD]["key"].startswith(self.counter.tokenizer_id + ":"))
+        self.assertNotIn(TOKENS_FIELD, system)
+
+        # After a restart (empty in-memory cache) the persisted count is trusted
+        reloaded = dict(msg)
+        with patch.dict(TokenCounter._content_counts, clear=True), \
+                patch.object(self.counter, 'count', side_effect=AssertionError("re-tokenized")):
+            self.assertEqual(self.counter.count_messages([reloaded]), first)
+
+    def test_stale_stored_counts_are_recounted(self):
+        edited = {"role": "user", "content": "Edited content", "id": "a", TOKENS_FIELD: {"n": 999, "key": "x"}}
+        self.assertEqual(self.counter.count_message(edited), self.counter.count("Edited content"))
+        self.assertEqual(edited[TOKENS_FIELD]["n"], self.counter.count("Edited content"))
+
+        other_tokenizer = {"role": "user", "content": "Other tokenizer", "id": "b",
+                           TOKENS_FIELD: {"n": 999, "key": "gpt2:" + self.counter.content_key("Other tokenizer").split(":")[1]}}
+        self.assertEqual(self.counter.count_message(other_tokenizer), self.counter.count("Other tokenizer"))
+
 if __name__ == '__main__':
     unittest.main()
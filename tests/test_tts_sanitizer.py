@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import random
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.modules.tts_sanitizer import TtsSanitizer
+from engine.modules.sentence_splitter import SentenceSplitter
+from scripts.bench_sanitize import legacy_sanitize, synthetic_reply
+
+SAMPLES = [
+    "",
+    "Hello there.",
+    "**Hmm.** That's a “good” question -- and honestly... (She leans back.) Yes — mostly.",
+    "Wait.... what?! [laughs] Sure -- 3.5 is fine - really… ok.",
+    "Open (never closed, so it stays. Right?",
+    "Nested (outer (inner) tail) and [a (b] c) done.",
+    "snake_case and *emphasis* and __bold__ 📏 emoji\n\n- list item\n- another",
+    "---- -.- .-. ..-- ---... (x",
+    "   ",
+    "(only a parenthetical)",
+]
+
+
+def chunked(text: str, rng: random.Random) -> list:
+    pieces, i = [], 0
+    while i < len(text):
+        step = rng.randint(1, 6)
+        pieces.append(text[i:i + step])
+        i += step
+    return pieces
+
+
+class TestTtsSanitizer(unittest.TestCase):
+    def test_matches_legacy_cleanup(self):
+        for text in SAMPLES + [synthetic_reply(3000)]:
+            self.assertEqual(TtsSanitizer.sanitize(text), legacy_sanitize(text), text)
+
+    def test_chunked_feed_matches_whole_text(self):
+        rng = random.Random(7)
+        for text in SAMPLES + [synthetic_reply(3000)]:
+            for _ in range(5):
+                sanitizer = TtsSanitizer()
+                out = "".join(sanitizer.feed(piece) for piece in chunked(text, rng)) + sanitizer.finish()
+                self.assertEqual(out, legacy_sanitize(text), text)
+
+    def test_open_parenthesis_is_held_until_closed_or_finished(self):
+        sanitizer = TtsSanitizer(lead="")
+        self.assertEqual(sanitizer.feed("Yes (maybe"), "Yes")
+        self.assertEqual(sanitizer.feed(" not."), "")
+        self.assertEqual(sanitizer.finish(), " maybe not.")
+
+        sanitizer = TtsSanitizer(lead="")
+        self.assertEqual(sanitizer.feed("Yes (maybe"), "Yes")
+        self.assertEqual(sanitizer.feed(") no."), " no")  # The dot waits for the next character
+        self.assertEqual(sanitizer.finish(), ".")
+
+    def test_dashes_and_dots_across_chunks(self):
+        sanitizer = TtsSanitizer(lead="")
+        out = sanitizer.feed("well -") + sanitizer.feed("- and .") + sanitizer.feed("..") + sanitizer.finish()
+        self.assertEqual(out, legacy_sanitize("well -- and ...")[2:])
+
+    def test_pending_space_lets_the_splitter_cut_early(self):
+        sanitizer = TtsSanitizer(lead="")
+        splitter = SentenceSplitter(min_chars=5)
+        clean = sanitizer.feed("That is a hard one! (She pauses")
+        self.assertTrue(sanitizer.at_space)
+        self.assertEqual(splitter.feed(clean, at_space=sanitizer.at_space), ["That is a hard one!"])
+
+
+if __name__ == '__main__':
+    unittest.main()
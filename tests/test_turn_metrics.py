@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.memory import Memory
+from engine.modules.turn_metrics import TurnMetrics, percentile
+
+try:
+    from interface.controller import Controller
+except ImportError:
+    Controller = None
+
+
+class TestTurnMetrics(unittest.IsolatedAsyncioTestCase):
+    def test_nearest_rank_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_window_rolls_and_missing_metrics_are_skipped(self):
+        metrics = TurnMetrics(window=10)
+        for i in range(30):
+            metrics.record({"ttft_ms": float(i), "tts_first_ms": None})
+        summary = metrics.summary()
+        self.assertEqual(summary["ttft_ms"]["n"], 10)
+        self.assertEqual(summary["ttft_ms"]["p50"], 24.0)  # Only the last 10 turns count
+        self.assertEqual(summary["ttft_ms"]["last"], 29.0)
+        self.assertNotIn("tts_first_ms", summary)
+
+    async def test_controller_records_each_turn(self):
+        if not Controller: self.skipTest("No Controller")
+        test_dir = tempfile.mkdtemp()
+        memory = Memory(base_path=test_dir)
+
+        async def fake_stream(*args, **kwargs):
+            yield {"message": {"role": "assistant", "content": "Fine, thanks."}}
+            yield {"done": True, "prompt_eval_count": 40, "prompt_eval_duration": 20_000_000,
+                   "eval_count": 50, "eval_duration": 500_000_000}
+
+        brain = MagicMock()
+        brain.generate_response = MagicMock(side_effect=fake_stream)
+        with patch('interface.controller.SystemMonitor.start'):
+            controller = Controller(brain, memory)
+
+        async def noop(*args):
+            pass
+        controller.bind_view(noop, noop)
+        try:
+            await controller.handle_user_input("How are you?")
+        finally:
+            controller.store.close()
+            shutil.rmtree(test_dir)
+
+        telemetry = controller.turn_metrics.summary()
+        self.assertAlmostEqual(telemetry["tokens_per_s"]["last"], 100.0)
+        self.assertAlmostEqual(telemetry["prefill_ms"]["last"], 20.0)
+        for name in ("context_ms", "tokenize_ms", "ttft_ms", "persist_ms", "total_ms"):
+            self.assertGreaterEqual(telemetry[name]["last"], 0.0, name)
+        self.assertNotIn("tts_first_ms", telemetry)  # Auto-read is off
+        self.assertLessEqual(telemetry["ttft_ms"]["last"], telemetry["total_ms"]["last"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,11 @@ import asyncio
 import sys
 import logging
 import os
-import json
 from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from typing import Optional, Callable
+from engine.modules import codec
 
 logger = logging.getLogger("TOOLS.McpTtsClient")
 
@@ -23,6 +23,8 @@ class McpTtsClient:
         self.decode_steps = 1
         self.eos_threshold = -4.0
         self.stop_event = asyncio.Event() 
+        self._enqueue_lock: Optional[asyncio.Lock] = None  # Keeps queued utterances in order
+        self._generation = 0  # Bumped by stop(); utterances queued before it are not sent
         
     def set_session(self, session: ClientSession):
         """Injects an existing MCP session."""
@@ -84,6 +86,7 @@ class McpTtsClient:
              asyncio.run_coroutine_threadsafe(self.session.call_tool("set_eos_threshold", arguments={"threshold": threshold}), self._loop)
 
     def stop(self):
+         self._generation += 1
          if self.session:
              asyncio.run_coroutine_threadsafe(self.session.call_tool("stop", arguments={}), self._loop)
 
@@ -106,28 +109,7 @@ class McpTtsClient:
                      "autoplay": True
                  }
                  await self.session.call_tool("speak", arguments=args)
-                 
-                 # Poll for completion
-                 # The server uses a thread, so is_speaking remains true for a duration.
-                 while True:
-                     try:
-                         result = await self.session.call_tool("status", arguments={})
-                         # result.content is a list of TextContent
-                         if result.content:
-                              data = json.loads(result.content[0].text) # Wait, status returns dict? 
-                              # MCP implementation: @mcp.tool() def status() -> dict. 
-                              # mcp SDK wraps return into TextContent containing JSON string usually?
-                              # Or does it return EmbeddedResource?
-                              # FastMCP defaults to JSON text content.
-                              # Let's verify structure. FastMCP tools returning dicts are serialized to string.
-                              
-                              # Actually, checking 'is_speaking' in data
-                              if not data.get("is_speaking", False):
-                                  break
-                     except Exception:
-                          break
-                     await asyncio.sleep(0.5)
-                     
+                 await self._wait_until_silent()
              except Exception as e:
                  logger.error(f"MCP Speak task error: {e}")
              finally:
@@ -138,7 +120,63 @@ class McpTtsClient:
 
          asyncio.run_coroutine_threadsafe(_speak_task(), self._loop)
          return True
-     
+
+    def enqueue(self, text: str, on_finished: Optional[Callable[[], None]] = None) -> bool:
+         """
+         Queues an utterance on the server behind the ones already queued (played back-to-back).
+         `on_finished` runs once the server has gone quiet, so pass it with the last utterance.
+         """
+         if not self.session:
+             logger.warning("MCP Session not active. Dropping TTS request.")
+             return False
+
+         generation = self._generation
+
+         async def _enqueue_task():
+             if self._enqueue_lock is None:
+                 self._enqueue_lock = asyncio.Lock()
+             try:
+                 async with self._enqueue_lock:
+                     if generation != self._generation:
+                         logger.debug("MCP Enqueue: Dropped an utterance queued before stop.")
+                     elif text:
+                         self.is_speaking = True
+                         await self.session.call_tool("enqueue", arguments={
+                             "text": text,
+                             "voice": self.current_voice,
+                             "volume": self.volume,
+                             "temperature": self.temperature,
+                             "decode_steps": self.decode_steps,
+                             "eos_threshold": self.eos_threshold,
+                         })
+                 if on_finished:
+                     await self._wait_until_silent()
+             except Exception as e:
+                 logger.error(f"MCP Enqueue task error: {e}")
+             finally:
+                 if on_finished:
+                     self.is_speaking = False
+                     on_finished()
+
+         asyncio.run_coroutine_threadsafe(_enqueue_task(), self._loop)
+         return True
+
+    async def _wait_until_silent(self):
+         """Polls the server until it has nothing left to play."""
+         # The server uses a thread, so is_speaking remains true for a duration.
+         while True:
+             try:
+                 result = await self.session.call_tool("status", arguments={})
+                 # result.content is a list of TextContent
+                 if result.content:
+                      # FastMCP serializes the status dict as JSON text
+                      data = codec.loads(result.content[0].text)
+                      if not data.get("is_speaking", False):
+                          break
+             except Exception:
+                  break
+             await asyncio.sleep(0.5)
+
     # Properties for compatibility
     @property
     def tts_model(self):
@@ -1,7 +1,7 @@
 import os
 import datetime
 import logging
-from typing import List, Optional, Callable
+from typing import Any, List, Optional, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +10,16 @@ class SafeTools:
     The 'Action Space' exposed to the Recursive Brain.
     All methods here are accessible via the `tools` object in the REPL.
     """
-    def __init__(self, context_root: str, delegate_callback: Optional[Callable] = None):
+    def __init__(self, context_root: str, delegate_callback: Optional[Callable] = None, memory: Optional[Any] = None):
         """
         Args:
             context_root: The root directory where files can be read (Erika's workspace).
             delegate_callback: A function `fn(prompt, context) -> str` to call for recursion.
+            memory: Optional Memory instance; enables indexed search over chats and reflections.
         """
         self.context_root = os.path.abspath(context_root)
         self.delegate_callback = delegate_callback
+        self.memory = memory
 
     def _is_safe_path(self, path: str) -> bool:
         """Ensures path is within context_root."""
@@ -94,15 +96,33 @@ class SafeTools:
         except Exception as e:
             return f"Error reading file: {e}"
 
-    def search_memory(self, query: str) -> str:
+    def search_memory(self, query: str, limit: int = 5) -> str:
         """
-        Phase 1: Simple Keyword Search.
-        Searches .txt and .md files in workspace for the query string.
+        Searches past conversations and reflections.
+        Uses the Memory full-text index when available (ranked, with snippets);
+        otherwise falls back to a keyword scan of the workspace files.
         """
-        # TODO: This is a naive implementation. 
-        # In a real scenario, this should query the Memory module.
-        # For Phase 1, we will implement a basic grep.
-        
+        if self.memory is not None and getattr(self.memory, "search_index", None):
+            try:
+                hits = self.memory.search(query, limit=limit)
+            except Exception as e:
+                logger.error(f"SafeTools: Indexed search failed: {e}")
+                return f"Error: {e}"
+            if not hits:
+                return "No matches found."
+            lines = []
+            for hit in hits:
+                if hit["kind"] == "chat":
+                    label = f"chat {hit['chat_id']} ({hit.get('date') or 'undated'}, {hit.get('role')})"
+                else:
+                    label = f"{hit['kind']} {hit.get('source')}"
+                lines.append(f"[{label}] {hit['snippet']}")
+            return "\n".join(lines)
+
+        return self._scan_files(query)
+
+    def _scan_files(self, query: str) -> str:
+        """Keyword scan of .md/.txt/.py/.json files in the workspace (first 5 files)."""
         results = []
         MAX_RESULTS = 5
         
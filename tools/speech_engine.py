@@ -66,3 +66,6 @@ class SpeechEngine:
     def speak(self, text: str, on_finished: Optional[Callable[[], None]] = None) -> bool:
         return self._service.speak(text, on_finished)
 
+    def enqueue(self, text: str, on_finished: Optional[Callable[[], None]] = None) -> bool:
+        return self._service.enqueue(text, on_finished)
+